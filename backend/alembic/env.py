@@ -10,13 +10,25 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from app.core.config import settings
 from app.db.base import Base
-from app.models import AuditLog, AuthCode, DemoItem, RefreshToken, User  # noqa: F401
+from app.models import (  # noqa: F401
+    AuditLog,
+    AuditRollup,
+    AuthCode,
+    DemoItem,
+    RefreshToken,
+    User,
+    UserTokenEpoch,
+)
 
 # this is the Alembic Config object
 config = context.config
 
-# Set the database URL from settings
-config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
+# Set the database URL from settings. `alembic -x db=audit upgrade head`
+# migrates a separate audit database (AUDIT_DATABASE_URL) instead.
+if context.get_x_argument(as_dictionary=True).get("db") == "audit":
+    config.set_main_option("sqlalchemy.url", settings.AUDIT_DATABASE_URL or settings.DATABASE_URL)
+else:
+    config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 
 # Interpret the config file for Python logging.
 if config.config_file_name is not None:
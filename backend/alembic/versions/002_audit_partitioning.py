@@ -0,0 +1,159 @@
+"""Range-partition audit_logs on created_at
+
+Revision ID: 002_audit_partitioning
+Revises: 001_initial
+Create Date: 2026-10-16
+
+The existing table is kept as-is and attached as the partition
+``audit_logs_legacy`` covering everything before the start of the next
+period, so no rows are copied. New periods get their own partitions
+(created ahead of time by ``audit_partition_service``), and a DEFAULT
+partition catches rows if maintenance ever falls behind.
+
+The rows are not rewritten or scanned under a blocking lock either: NULL
+``created_at`` values are backfilled in small batches, and a CHECK
+constraint matching the legacy range is added NOT VALID and validated
+under SHARE UPDATE EXCLUSIVE (inserts keep running). With it in place,
+SET NOT NULL and ATTACH PARTITION skip their full-table scans (PostgreSQL
+12+), and the (id, created_at) primary key index is built concurrently,
+so the final switch only holds its exclusive locks for catalog updates.
+
+PostgreSQL only; other databases are left unpartitioned.
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "002_audit_partitioning"
+down_revision: Union[str, None] = "001_initial"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows per transaction when backfilling NULL created_at values
+BACKFILL_BATCH_SIZE = 10000
+
+
+def _next_month_start(now: datetime) -> datetime:
+    """Return the start of the UTC month following ``now``.
+
+    Kept local (rather than using the app's partition helpers and settings)
+    so this migration does not change with the application. Monthly is the
+    default partition interval; with daily partitions, maintenance simply
+    skips the days the legacy partition already covers.
+    """
+    start = now.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    boundary = _next_month_start(datetime.now(timezone.utc))
+
+    # Prepare the live table without blocking audit writes; each statement
+    # commits on its own
+    with op.get_context().autocommit_block():
+        # Enforced for new rows at once; existing rows are checked below
+        op.execute(
+            "ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_legacy_bound "
+            f"CHECK (created_at IS NOT NULL AND created_at < '{boundary.isoformat()}') NOT VALID"
+        )
+        # The partition key must be NOT NULL
+        bind = op.get_bind()
+        while True:
+            result = bind.execute(
+                sa.text(
+                    "UPDATE audit_logs SET created_at = now() WHERE id IN "
+                    "(SELECT id FROM audit_logs WHERE created_at IS NULL LIMIT :limit)"
+                ),
+                {"limit": BACKFILL_BATCH_SIZE},
+            )
+            if not result.rowcount:
+                break
+        op.execute("ALTER TABLE audit_logs VALIDATE CONSTRAINT audit_logs_legacy_bound")
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY audit_logs_legacy_id_created_at "
+            "ON audit_logs (id, created_at)"
+        )
+
+    # Move the current table (and its index names) out of the way
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_legacy")
+    op.execute("ALTER INDEX ix_audit_logs_request_id RENAME TO ix_audit_logs_legacy_request_id")
+    op.execute("ALTER INDEX ix_audit_logs_created_at RENAME TO ix_audit_logs_legacy_created_at")
+
+    # No scan: the validated CHECK constraint already proves it
+    op.execute("ALTER TABLE audit_logs_legacy ALTER COLUMN created_at SET NOT NULL")
+    # Swap in the prebuilt index so ATTACH does not build the parent's primary key
+    op.execute(
+        "ALTER TABLE audit_logs_legacy DROP CONSTRAINT audit_logs_pkey, "
+        "ADD CONSTRAINT audit_logs_legacy_pkey "
+        "PRIMARY KEY USING INDEX audit_logs_legacy_id_created_at"
+    )
+
+    # Partitioned parent; the primary key has to include the partition key
+    op.execute(
+        """
+        CREATE TABLE audit_logs (
+            id UUID NOT NULL,
+            request_id VARCHAR(36) NOT NULL,
+            user_id UUID REFERENCES users (id) ON DELETE SET NULL,
+            method VARCHAR(10) NOT NULL,
+            path VARCHAR(2048) NOT NULL,
+            status_code INTEGER NOT NULL,
+            duration_ms INTEGER NOT NULL,
+            ip VARCHAR(45),
+            user_agent VARCHAR(512),
+            request_body TEXT,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            CONSTRAINT audit_logs_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.create_index("ix_audit_logs_request_id", "audit_logs", ["request_id"])
+    op.create_index("ix_audit_logs_created_at", "audit_logs", ["created_at"])
+
+    # No scan either: audit_logs_legacy_bound implies the partition constraint,
+    # and the legacy table's own user_id foreign key matches the parent's
+    op.execute(
+        "ALTER TABLE audit_logs ATTACH PARTITION audit_logs_legacy "
+        f"FOR VALUES FROM (MINVALUE) TO ('{boundary.isoformat()}')"
+    )
+    op.execute("ALTER TABLE audit_logs_legacy DROP CONSTRAINT audit_logs_legacy_bound")
+    op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute(
+        """
+        CREATE TABLE audit_logs_unpartitioned (
+            id UUID PRIMARY KEY,
+            request_id VARCHAR(36) NOT NULL,
+            user_id UUID REFERENCES users (id) ON DELETE SET NULL,
+            method VARCHAR(10) NOT NULL,
+            path VARCHAR(2048) NOT NULL,
+            status_code INTEGER NOT NULL,
+            duration_ms INTEGER NOT NULL,
+            ip VARCHAR(45),
+            user_agent VARCHAR(512),
+            request_body TEXT,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+        )
+        """
+    )
+    op.execute("INSERT INTO audit_logs_unpartitioned SELECT * FROM audit_logs")
+    op.execute("DROP TABLE audit_logs CASCADE")
+    op.execute("ALTER TABLE audit_logs_unpartitioned RENAME TO audit_logs")
+    op.execute(
+        "ALTER TABLE audit_logs RENAME CONSTRAINT audit_logs_unpartitioned_pkey TO audit_logs_pkey"
+    )
+    op.create_index("ix_audit_logs_request_id", "audit_logs", ["request_id"])
+    op.create_index("ix_audit_logs_created_at", "audit_logs", ["created_at"])
@@ -0,0 +1,73 @@
+"""Composite (created_at, id) indexes for keyset pagination
+
+Revision ID: 003_keyset_pagination_indexes
+Revises: 002_audit_partitioning
+Create Date: 2026-10-16
+
+ix_audit_logs_created_at is replaced by the composite index, which serves
+the same range filters. On PostgreSQL the new indexes are built
+concurrently so audit inserts and user writes continue during the build.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "003_keyset_pagination_indexes"
+down_revision: Union[str, None] = "002_audit_partitioning"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create_index_concurrently(name: str, table: str, definition: str) -> None:
+    """Build an index without blocking writes to ``table`` (PostgreSQL).
+
+    CREATE INDEX CONCURRENTLY is not supported on a partitioned table, so
+    there the index is created ON ONLY the parent (no build), built
+    concurrently on each partition and attached; the parent index becomes
+    valid once every partition has been attached.
+    """
+    bind = op.get_bind()
+    relkind = bind.execute(
+        sa.text("SELECT relkind FROM pg_class WHERE relname = :table AND pg_table_is_visible(oid)"),
+        {"table": table},
+    ).scalar()
+    partitions = bind.execute(
+        sa.text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table AND pg_table_is_visible(p.oid)"
+        ),
+        {"table": table},
+    ).scalars().all()
+
+    with op.get_context().autocommit_block():
+        if relkind != "p":
+            op.execute(f"CREATE INDEX CONCURRENTLY {name} ON {table} {definition}")
+            return
+        op.execute(f"CREATE INDEX {name} ON ONLY {table} {definition}")
+        for partition in partitions:
+            child = name.replace(table, partition, 1)
+            op.execute(f"CREATE INDEX CONCURRENTLY {child} ON {partition} {definition}")
+            op.execute(f"ALTER INDEX {name} ATTACH PARTITION {child}")
+
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        op.create_index("ix_audit_logs_created_at_id", "audit_logs", ["created_at", "id"])
+        op.drop_index("ix_audit_logs_created_at", table_name="audit_logs")
+        op.create_index("ix_users_created_at_id", "users", ["created_at", "id"])
+        return
+
+    _create_index_concurrently("ix_audit_logs_created_at_id", "audit_logs", "(created_at, id)")
+    op.drop_index("ix_audit_logs_created_at", table_name="audit_logs")
+    _create_index_concurrently("ix_users_created_at_id", "users", "(created_at, id)")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_created_at_id", table_name="users")
+    op.create_index("ix_audit_logs_created_at", "audit_logs", ["created_at"])
+    op.drop_index("ix_audit_logs_created_at_id", table_name="audit_logs")
@@ -0,0 +1,84 @@
+"""pg_trgm GIN indexes for audit path and user email substring search
+
+Revision ID: 004_trigram_search_indexes
+Revises: 003_keyset_pagination_indexes
+Create Date: 2026-10-16
+
+Leading-wildcard ILIKE cannot use b-tree indexes; trigram GIN indexes
+serve ILIKE '%...%' for patterns of three or more characters. Also adds
+(user_id, created_at) for the user-email filter, which is applied as a
+semi-join on audit_logs.user_id.
+
+The trigram indexes are PostgreSQL only. There every index is built
+concurrently so audit inserts and user writes continue during the build.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "004_trigram_search_indexes"
+down_revision: Union[str, None] = "003_keyset_pagination_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create_index_concurrently(name: str, table: str, definition: str) -> None:
+    """Build an index without blocking writes to ``table`` (PostgreSQL).
+
+    CREATE INDEX CONCURRENTLY is not supported on a partitioned table, so
+    there the index is created ON ONLY the parent (no build), built
+    concurrently on each partition and attached; the parent index becomes
+    valid once every partition has been attached.
+    """
+    bind = op.get_bind()
+    relkind = bind.execute(
+        sa.text("SELECT relkind FROM pg_class WHERE relname = :table AND pg_table_is_visible(oid)"),
+        {"table": table},
+    ).scalar()
+    partitions = bind.execute(
+        sa.text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table AND pg_table_is_visible(p.oid)"
+        ),
+        {"table": table},
+    ).scalars().all()
+
+    with op.get_context().autocommit_block():
+        if relkind != "p":
+            op.execute(f"CREATE INDEX CONCURRENTLY {name} ON {table} {definition}")
+            return
+        op.execute(f"CREATE INDEX {name} ON ONLY {table} {definition}")
+        for partition in partitions:
+            child = name.replace(table, partition, 1)
+            op.execute(f"CREATE INDEX CONCURRENTLY {child} ON {partition} {definition}")
+            op.execute(f"ALTER INDEX {name} ATTACH PARTITION {child}")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        op.create_index(
+            "ix_audit_logs_user_id_created_at", "audit_logs", ["user_id", "created_at"]
+        )
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Built concurrently: a plain CREATE INDEX would block audit inserts and
+    # user writes for the whole (GIN) build
+    _create_index_concurrently(
+        "ix_audit_logs_user_id_created_at", "audit_logs", "(user_id, created_at)"
+    )
+    _create_index_concurrently(
+        "ix_audit_logs_path_trgm", "audit_logs", "USING gin (path gin_trgm_ops)"
+    )
+    _create_index_concurrently("ix_users_email_trgm", "users", "USING gin (email gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_users_email_trgm", table_name="users")
+        op.drop_index("ix_audit_logs_path_trgm", table_name="audit_logs")
+    op.drop_index("ix_audit_logs_user_id_created_at", table_name="audit_logs")
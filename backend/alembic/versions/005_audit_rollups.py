@@ -0,0 +1,42 @@
+"""Per-minute audit rollups
+
+Revision ID: 005_audit_rollups
+Revises: 004_trigram_search_indexes
+Create Date: 2026-10-16
+
+Rollups are maintained by the audit writer from this revision onwards;
+existing audit_logs rows are not backfilled.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "005_audit_rollups"
+down_revision: Union[str, None] = "004_trigram_search_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+HISTOGRAM_COLUMNS = ("le_5", "le_10", "le_25", "le_50", "le_100", "le_250", "le_500",
+                     "le_1000", "le_2500", "le_inf")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "audit_rollups_minute",
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("method", sa.String(10), nullable=False),
+        sa.Column("route", sa.String(2048), nullable=False),
+        sa.Column("status_class", sa.SmallInteger(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("duration_sum", sa.BigInteger(), nullable=False),
+        sa.Column("duration_min", sa.Integer(), nullable=False),
+        sa.Column("duration_max", sa.Integer(), nullable=False),
+        *(sa.Column(name, sa.Integer(), nullable=False) for name in HISTOGRAM_COLUMNS),
+        sa.PrimaryKeyConstraint("bucket_start", "method", "route", "status_class"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("audit_rollups_minute")
@@ -0,0 +1,71 @@
+"""Route template column on audit_logs
+
+Revision ID: 006_audit_route_template
+Revises: 005_audit_rollups
+Create Date: 2026-10-16
+
+Existing rows keep route = NULL; only the raw path was recorded for them.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "006_audit_route_template"
+down_revision: Union[str, None] = "005_audit_rollups"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create_index_concurrently(name: str, table: str, definition: str) -> None:
+    """Build an index without blocking writes to ``table`` (PostgreSQL).
+
+    CREATE INDEX CONCURRENTLY is not supported on a partitioned table, so
+    there the index is created ON ONLY the parent (no build), built
+    concurrently on each partition and attached; the parent index becomes
+    valid once every partition has been attached.
+    """
+    bind = op.get_bind()
+    relkind = bind.execute(
+        sa.text("SELECT relkind FROM pg_class WHERE relname = :table AND pg_table_is_visible(oid)"),
+        {"table": table},
+    ).scalar()
+    partitions = bind.execute(
+        sa.text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table AND pg_table_is_visible(p.oid)"
+        ),
+        {"table": table},
+    ).scalars().all()
+
+    with op.get_context().autocommit_block():
+        if relkind != "p":
+            op.execute(f"CREATE INDEX CONCURRENTLY {name} ON {table} {definition}")
+            return
+        op.execute(f"CREATE INDEX {name} ON ONLY {table} {definition}")
+        for partition in partitions:
+            child = name.replace(table, partition, 1)
+            op.execute(f"CREATE INDEX CONCURRENTLY {child} ON {partition} {definition}")
+            op.execute(f"ALTER INDEX {name} ATTACH PARTITION {child}")
+
+
+
+def upgrade() -> None:
+    op.add_column("audit_logs", sa.Column("route", sa.String(255), nullable=True))
+    if op.get_bind().dialect.name != "postgresql":
+        op.create_index(
+            "ix_audit_logs_route_created_at", "audit_logs", ["route", "created_at"]
+        )
+        return
+    # Built concurrently so audit inserts continue during the build
+    _create_index_concurrently(
+        "ix_audit_logs_route_created_at", "audit_logs", "(route, created_at)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_audit_logs_route_created_at", table_name="audit_logs")
+    op.drop_column("audit_logs", "route")
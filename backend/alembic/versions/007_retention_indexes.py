@@ -0,0 +1,68 @@
+"""Indexes walked by the batched retention purge
+
+Revision ID: 007_retention_indexes
+Revises: 006_audit_route_template
+Create Date: 2026-10-16
+
+audit_logs already has (created_at, id) from revision 003.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "007_retention_indexes"
+down_revision: Union[str, None] = "006_audit_route_template"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create_index_concurrently(name: str, table: str, definition: str) -> None:
+    """Build an index without blocking writes to ``table`` (PostgreSQL).
+
+    CREATE INDEX CONCURRENTLY is not supported on a partitioned table, so
+    there the index is created ON ONLY the parent (no build), built
+    concurrently on each partition and attached; the parent index becomes
+    valid once every partition has been attached.
+    """
+    bind = op.get_bind()
+    relkind = bind.execute(
+        sa.text("SELECT relkind FROM pg_class WHERE relname = :table AND pg_table_is_visible(oid)"),
+        {"table": table},
+    ).scalar()
+    partitions = bind.execute(
+        sa.text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table AND pg_table_is_visible(p.oid)"
+        ),
+        {"table": table},
+    ).scalars().all()
+
+    with op.get_context().autocommit_block():
+        if relkind != "p":
+            op.execute(f"CREATE INDEX CONCURRENTLY {name} ON {table} {definition}")
+            return
+        op.execute(f"CREATE INDEX {name} ON ONLY {table} {definition}")
+        for partition in partitions:
+            child = name.replace(table, partition, 1)
+            op.execute(f"CREATE INDEX CONCURRENTLY {child} ON {partition} {definition}")
+            op.execute(f"ALTER INDEX {name} ATTACH PARTITION {child}")
+
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        op.create_index("ix_auth_codes_created_at", "auth_codes", ["created_at"])
+        op.create_index("ix_refresh_tokens_expires_at", "refresh_tokens", ["expires_at"])
+        return
+    # Built concurrently so sign-ins keep writing codes and tokens during the build
+    _create_index_concurrently("ix_auth_codes_created_at", "auth_codes", "(created_at)")
+    _create_index_concurrently("ix_refresh_tokens_expires_at", "refresh_tokens", "(expires_at)")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_refresh_tokens_expires_at", table_name="refresh_tokens")
+    op.drop_index("ix_auth_codes_created_at", table_name="auth_codes")
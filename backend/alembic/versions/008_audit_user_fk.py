@@ -0,0 +1,44 @@
+"""Drop the audit_logs.user_id foreign key
+
+Revision ID: 008_audit_user_fk
+Revises: 007_retention_indexes
+Create Date: 2026-10-17
+
+Audit logs may be stored in a separate database (AUDIT_DATABASE_URL), so
+user_id becomes a plain reference resolved by the application. Audit rows
+outlive their users anyway; the key only cost a lookup per insert.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "008_audit_user_fk"
+down_revision: Union[str, None] = "007_retention_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # SQLite cannot drop constraints in place; the key is not enforced there by default
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("ALTER TABLE audit_logs DROP CONSTRAINT IF EXISTS audit_logs_user_id_fkey")
+    op.execute(
+        "ALTER TABLE IF EXISTS audit_logs_legacy "
+        "DROP CONSTRAINT IF EXISTS audit_logs_user_id_fkey"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    # Rows pointing at deleted users would violate the key
+    op.execute(
+        "UPDATE audit_logs SET user_id = NULL "
+        "WHERE user_id IS NOT NULL AND user_id NOT IN (SELECT id FROM users)"
+    )
+    op.execute(
+        "ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_user_id_fkey "
+        "FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE SET NULL"
+    )
@@ -0,0 +1,34 @@
+"""Per-stage timing breakdown on audit_logs
+
+Revision ID: 009_audit_timings
+Revises: 008_audit_user_fk
+Create Date: 2026-10-17
+
+Existing rows keep timings = NULL.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "009_audit_timings"
+down_revision: Union[str, None] = "008_audit_user_fk"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "audit_logs",
+        sa.Column(
+            "timings",
+            sa.JSON().with_variant(postgresql.JSONB(), "postgresql"),
+            nullable=True,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("audit_logs", "timings")
@@ -0,0 +1,39 @@
+"""Token revocation epochs for stateless access tokens
+
+Revision ID: 010_user_token_epochs
+Revises: 009_audit_timings
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "010_user_token_epochs"
+down_revision: Union[str, None] = "009_audit_timings"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_token_epochs",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("epoch", sa.Integer(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+    op.create_index(
+        "ix_user_token_epochs_updated_at", "user_token_epochs", ["updated_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_token_epochs_updated_at", table_name="user_token_epochs")
+    op.drop_table("user_token_epochs")
@@ -0,0 +1,59 @@
+"""Store refresh tokens by SHA-256 digest
+
+Revision ID: 011_refresh_token_digest
+Revises: 010_user_token_epochs
+Create Date: 2026-10-17
+
+refresh_tokens.token held the whole signed JWT (up to 512 bytes) under a
+unique index. It is replaced by token_digest, the 32-byte SHA-256 of the
+token: the index shrinks several times over and raw tokens no longer sit
+in the database. Existing rows are backfilled, so sessions survive.
+"""
+import hashlib
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "011_refresh_token_digest"
+down_revision: Union[str, None] = "010_user_token_epochs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "refresh_tokens", sa.Column("token_digest", sa.LargeBinary(32), nullable=True)
+    )
+
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute(
+            "UPDATE refresh_tokens SET token_digest = sha256(convert_to(token, 'UTF8'))"
+        )
+    else:
+        rows = bind.execute(sa.text("SELECT id, token FROM refresh_tokens")).all()
+        for row_id, token in rows:
+            bind.execute(
+                sa.text("UPDATE refresh_tokens SET token_digest = :digest WHERE id = :id"),
+                {"digest": hashlib.sha256(token.encode("utf-8")).digest(), "id": row_id},
+            )
+
+    # Dropping the column also drops its unique constraint
+    with op.batch_alter_table("refresh_tokens") as batch_op:
+        batch_op.alter_column("token_digest", existing_type=sa.LargeBinary(32), nullable=False)
+        batch_op.drop_column("token")
+    op.create_index(
+        "ix_refresh_tokens_token_digest", "refresh_tokens", ["token_digest"], unique=True
+    )
+
+
+def downgrade() -> None:
+    # Digests cannot be turned back into tokens: existing sessions must sign in again
+    op.execute("DELETE FROM refresh_tokens")
+    op.drop_index("ix_refresh_tokens_token_digest", table_name="refresh_tokens")
+    with op.batch_alter_table("refresh_tokens") as batch_op:
+        batch_op.add_column(sa.Column("token", sa.String(512), nullable=False))
+        batch_op.create_unique_constraint("refresh_tokens_token_key", ["token"])
+        batch_op.drop_column("token_digest")
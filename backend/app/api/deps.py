@@ -1,16 +1,21 @@
 """API dependencies for dependency injection."""
 
+import hmac
 from typing import Optional
 from uuid import UUID
 
-from fastapi import Cookie, Depends, HTTPException, Request, status
+from fastapi import Cookie, Depends, Header, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.security import decode_access_token, decode_refresh_token
+from app.core.timing import stage
 from app.db.session import get_db
 from app.models.user import User
 from app.services.auth_service import auth_service
+from app.services.principal_cache import Principal, principal_cache
+from app.services.token_epoch_service import token_epoch_service
 
 security = HTTPBearer(auto_error=False)
 
@@ -19,8 +24,23 @@ async def get_current_user(
     request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     db: AsyncSession = Depends(get_db),
-) -> User:
-    """Get the current authenticated user from the access token."""
+) -> Principal:
+    """Get the current authenticated user from the access token.
+
+    Returns a cached ``Principal`` snapshot; endpoints needing the ORM
+    object load it by ``id``.
+    """
+    # Token checks and the user lookup count as auth time (minus DB time)
+    with stage("auth"):
+        return await _authenticate(request, credentials, db)
+
+
+async def _authenticate(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials],
+    db: AsyncSession,
+) -> Principal:
+    """Validate the bearer token and resolve its principal."""
     if not credentials:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -46,26 +66,48 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = await auth_service.get_user_by_id(db, UUID(user_id))
-
-    if not user or not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found or inactive",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    # Stateless tokens are authorized from their claims, without the users table
+    if (
+        settings.STATELESS_ACCESS_TOKENS
+        and "token_epoch" in payload
+        and token_epoch_service.ready
+    ):
+        principal = Principal.from_claims(UUID(user_id), payload)
+        if not principal.is_active or not token_epoch_service.is_current(
+            principal.id, payload["token_epoch"]
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+    else:
+        principal = principal_cache.get(UUID(user_id))
+
+    if principal is None:
+        user = await auth_service.get_user_by_id(db, UUID(user_id))
+
+        if not user or not user.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found or inactive",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        principal = Principal.from_user(user)
+        principal_cache.put(principal)
 
     # Store user_id in request state for audit logging
-    request.state.user_id = user.id
+    request.state.user_id = principal.id
 
-    return user
+    return principal
 
 
 async def get_current_user_optional(
     request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     db: AsyncSession = Depends(get_db),
-) -> Optional[User]:
+) -> Optional[Principal]:
     """Get the current user if authenticated, otherwise return None."""
     if not credentials:
         return None
@@ -77,8 +119,8 @@ async def get_current_user_optional(
 
 
 async def get_current_admin(
-    user: User = Depends(get_current_user),
-) -> User:
+    user: Principal = Depends(get_current_user),
+) -> Principal:
     """Get the current user and verify they are an admin."""
     if not user.is_admin:
         raise HTTPException(
@@ -116,3 +158,19 @@ async def get_refresh_token_user(
         )
 
     return user
+
+
+async def require_service_token(
+    x_service_token: Optional[str] = Header(None),
+) -> None:
+    """Require a service-to-service credential (INTROSPECTION_SERVICE_TOKENS)."""
+    presented = (x_service_token or "").encode("utf-8")
+    valid = any(
+        hmac.compare_digest(presented, token.encode("utf-8"))
+        for token in settings.INTROSPECTION_SERVICE_TOKENS
+    )
+    if not x_service_token or not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid service credentials",
+        )
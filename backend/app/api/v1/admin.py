@@ -1,19 +1,33 @@
 """Admin API endpoints."""
 
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import Literal, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_admin
-from app.db.session import get_db
-from app.models.user import User
-from app.schemas.audit import AuditLogFilter, AuditLogListResponse
+from app.core.exceptions import ValidationException
+from app.core.security import password_hasher, verified_token_cache
+from app.db.session import (
+    async_session_maker,
+    audit_engine,
+    audit_session_maker,
+    engine,
+    get_audit_db,
+    get_db,
+)
+from app.models.audit_rollup import LATENCY_BUCKETS_MS
+from app.schemas.audit import AuditLogFilter, AuditLogListResponse, AuditRollupResponse
 from app.schemas.user import AdminUserCreate, AdminUserUpdate, UserListResponse, UserResponse
+from app.services.audit_rollup_service import DIMENSIONS, audit_rollup_service
 from app.services.audit_service import audit_service
+from app.services.audit_writer import audit_writer
 from app.services.auth_service import auth_service
+from app.services.principal_cache import Principal, principal_cache
+from app.services.token_epoch_service import token_epoch_service
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -24,23 +38,25 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 async def list_users(
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(50, ge=1, le=100, description="Items per page"),
-    current_user: User = Depends(get_current_admin),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous next_cursor"),
+    current_user: Principal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """Get all users with pagination. Admin only."""
-    users, total = await auth_service.get_all_users(db, page, limit)
+    users, total, next_cursor = await auth_service.get_all_users(db, page, limit, cursor)
     return UserListResponse(
         items=[UserResponse.model_validate(u) for u in users],
         total=total,
         page=page,
         limit=limit,
+        next_cursor=next_cursor,
     )
 
 
 @router.post("/users", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def create_user(
     request: AdminUserCreate,
-    current_user: User = Depends(get_current_admin),
+    current_user: Principal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new user (optionally as admin). Admin only."""
@@ -62,7 +78,7 @@ async def create_user(
 async def update_user(
     user_id: UUID,
     request: AdminUserUpdate,
-    current_user: User = Depends(get_current_admin),
+    current_user: Principal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """Update user attributes. Admin only."""
@@ -94,22 +110,157 @@ async def list_audit_logs(
     user_email: Optional[str] = Query(None, description="Filter by user email"),
     method: Optional[str] = Query(None, description="Filter by HTTP method"),
     path: Optional[str] = Query(None, description="Filter by path"),
+    route: Optional[str] = Query(
+        None, description="Filter by route template, e.g. /api/v1/demo/items/{item_id}"
+    ),
     from_date: Optional[datetime] = Query(None, alias="from", description="Filter from date"),
     to_date: Optional[datetime] = Query(None, alias="to", description="Filter to date"),
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(50, ge=1, le=100, description="Items per page"),
-    current_user: User = Depends(get_current_admin),
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous next_cursor"),
+    count: Optional[Literal["exact", "estimated", "cached"]] = Query(
+        None, description="Total count strategy (defaults to AUDIT_COUNT_STRATEGY)"
+    ),
+    current_user: Principal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_audit_db),
+    users_db: AsyncSession = Depends(get_db),
 ):
-    """Get audit logs with filtering and pagination. Admin only."""
+    """Get audit logs with filtering and pagination. Admin only.
+
+    Pass ``cursor`` (the previous response's ``next_cursor``) for constant-time
+    deep paging; ``page`` is ignored when a cursor is given.
+    """
     filter_params = AuditLogFilter(
         user_email=user_email,
         method=method,
         path=path,
+        route=route,
         from_date=from_date,
         to_date=to_date,
         page=page,
         limit=limit,
+        cursor=cursor,
+        count_strategy=count,
     )
 
-    return await audit_service.get_audit_logs(db, filter_params)
+    return await audit_service.get_audit_logs(db, filter_params, users_db)
+
+
+@router.get("/audit-logs/export")
+async def export_audit_logs(
+    user_email: Optional[str] = Query(None, description="Filter by user email"),
+    method: Optional[str] = Query(None, description="Filter by HTTP method"),
+    path: Optional[str] = Query(None, description="Filter by path"),
+    route: Optional[str] = Query(
+        None, description="Filter by route template, e.g. /api/v1/demo/items/{item_id}"
+    ),
+    from_date: Optional[datetime] = Query(None, alias="from", description="Filter from date"),
+    to_date: Optional[datetime] = Query(None, alias="to", description="Filter to date"),
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Output format"),
+    gzip: bool = Query(False, description="Gzip the output"),
+    current_user: Principal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_audit_db),
+    users_db: AsyncSession = Depends(get_db),
+):
+    """Stream all matching audit logs as NDJSON or CSV. Admin only."""
+    filter_params = AuditLogFilter(
+        user_email=user_email,
+        method=method,
+        path=path,
+        route=route,
+        from_date=from_date,
+        to_date=to_date,
+    )
+
+    # Resolved up front: once streaming starts the 200 status is already sent
+    conditions = await audit_service.filter_conditions(db, filter_params, users_db)
+
+    async def body():
+        # The response outlives the request's dependencies, so the stream
+        # owns its sessions
+        async with audit_session_maker() as stream_db, async_session_maker() as stream_users_db:
+            async for chunk in audit_service.export_audit_logs(
+                stream_db, conditions, fmt=format, compress=gzip, users_db=stream_users_db
+            ):
+                yield chunk
+
+    filename = f"audit-logs.{format}"
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/audit-rollups", response_model=AuditRollupResponse)
+async def get_audit_rollups(
+    from_date: Optional[datetime] = Query(
+        None, alias="from", description="Start time (defaults to one hour ago)"
+    ),
+    to_date: Optional[datetime] = Query(None, alias="to", description="End time (defaults to now)"),
+    interval: int = Query(1, ge=1, le=1440, description="Bucket size in minutes"),
+    group_by: str = Query(
+        ",".join(DIMENSIONS),
+        description="Comma-separated dimensions to keep (method, route, status_class); "
+        "empty for totals",
+    ),
+    method: Optional[str] = Query(None, description="Filter by HTTP method"),
+    route: Optional[str] = Query(None, description="Filter by route"),
+    status_class: Optional[int] = Query(None, ge=1, le=5, description="Filter by status class"),
+    current_user: Principal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_audit_db),
+):
+    """Get request volume and latency time series from per-minute rollups. Admin only."""
+    dimensions = [name.strip() for name in group_by.split(",") if name.strip()]
+    unknown = set(dimensions) - set(DIMENSIONS)
+    if unknown:
+        raise ValidationException(
+            detail=f"Unknown group_by dimension: {', '.join(sorted(unknown))}"
+        )
+
+    to_date = to_date or datetime.now(timezone.utc)
+    from_date = from_date or to_date - timedelta(hours=1)
+
+    items = await audit_rollup_service.get_series(
+        db,
+        from_date,
+        to_date,
+        interval_minutes=interval,
+        group_by=dimensions,
+        method=method,
+        route=route,
+        status_class=status_class,
+    )
+    return AuditRollupResponse(
+        interval_minutes=interval,
+        bucket_bounds_ms=list(LATENCY_BUCKETS_MS),
+        items=items,
+    )
+
+
+# ============== Metrics ==============
+
+
+@router.get("/metrics")
+async def get_metrics(
+    current_user: Principal = Depends(get_current_admin),
+):
+    """Get in-process runtime counters for this worker. Admin only."""
+    return {
+        "audit_writer": audit_writer.stats(),
+        "audit_spool": audit_writer.spool_stats(),
+        "principal_cache": principal_cache.stats(),
+        "jwt_cache": verified_token_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "password_rehash": auth_service.rehash_stats(),
+        "token_epochs": token_epoch_service.stats(),
+        "db_pools": {
+            "main": engine.pool.status(),
+            "audit": audit_engine.pool.status(),
+        },
+    }
@@ -2,19 +2,21 @@
 
 from typing import Optional
 
-from fastapi import APIRouter, Cookie, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Cookie, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, get_refresh_token_user
+from app.api.deps import get_current_user, get_refresh_token_user, require_service_token
 from app.core.config import settings
 from app.core.exceptions import ConflictException, ValidationException
-from app.core.security import create_access_token, create_refresh_token
-from app.db.session import get_db
+from app.core.security import create_refresh_token
+from app.db.session import get_audit_db, get_db
 from app.models.user import User
 from app.schemas.auth import (
     AuthMethodsResponse,
     CodeRequestPayload,
     CodeVerifyPayload,
+    IntrospectBatchRequest,
+    IntrospectBatchResponse,
     LoginRequest,
     OAuthAuthorizeResponse,
     OAuthCallbackRequest,
@@ -25,6 +27,7 @@ from app.schemas.user import UserResponse
 from app.services.auth_service import auth_service
 from app.services.code_auth_service import code_auth_service
 from app.services.oauth_service import oauth_service
+from app.services.principal_cache import Principal
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -86,7 +89,7 @@ async def login(
         )
 
     # Create tokens
-    access_token = create_access_token(user.id)
+    access_token = await auth_service.issue_access_token(db, user)
     refresh_token_str = create_refresh_token(user.id)
 
     # Store refresh token in database
@@ -113,7 +116,7 @@ async def logout(
     response: Response,
     refresh_token: Optional[str] = Cookie(None),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     """Logout the current user."""
     # Revoke refresh token if present
@@ -139,7 +142,7 @@ async def refresh(
         await auth_service.revoke_refresh_token(db, refresh_token)
 
     # Create new tokens
-    access_token = create_access_token(user.id)
+    access_token = await auth_service.issue_access_token(db, user)
     new_refresh_token = create_refresh_token(user.id)
 
     # Store new refresh token
@@ -161,27 +164,54 @@ async def refresh(
     )
 
 
+@router.post(
+    "/introspect/batch",
+    response_model=IntrospectBatchResponse,
+    response_model_exclude_none=True,
+    dependencies=[Depends(require_service_token)],
+)
+async def introspect_batch(
+    request: IntrospectBatchRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """Validate many access tokens in one call. Requires X-Service-Token."""
+    if len(request.tokens) > settings.INTROSPECTION_BATCH_MAX_TOKENS:
+        raise ValidationException(
+            detail=f"At most {settings.INTROSPECTION_BATCH_MAX_TOKENS} tokens per request"
+        )
+    results = await auth_service.introspect_tokens(db, request.tokens)
+    return IntrospectBatchResponse(results=results)
+
+
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get the current user's information."""
+    # Principals from stateless tokens carry no profile fields
+    if current_user.created_at is None:
+        return await auth_service.get_user_by_id(db, current_user.id)
     return current_user
 
 
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_account(
+    request: Request,
     response: Response,
     refresh_token: Optional[str] = Cookie(None),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    audit_db: AsyncSession = Depends(get_audit_db),
 ):
     """Delete the current user's account and all associated data (GDPR right to erasure)."""
     # Revoke all refresh tokens
     await auth_service.revoke_all_user_tokens(db, current_user.id)
 
     # Delete user (cascade will handle related data)
-    await auth_service.delete_user(db, current_user.id)
+    await auth_service.delete_user(db, current_user.id, audit_db)
+    # Keep this request's own audit record anonymous
+    request.state.user_id = None
 
     # Clear refresh token cookie
     response.delete_cookie(key="refresh_token")
@@ -191,11 +221,12 @@ async def delete_account(
 
 @router.get("/me/export")
 async def export_user_data(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    audit_db: AsyncSession = Depends(get_audit_db),
 ):
     """Export all user data (GDPR right to data portability)."""
-    data = await auth_service.export_user_data(db, current_user.id)
+    data = await auth_service.export_user_data(db, current_user.id, audit_db)
     return data
 
 
@@ -243,7 +274,7 @@ async def verify_code(
         )
 
     # Create tokens
-    access_token = create_access_token(user.id)
+    access_token = await auth_service.issue_access_token(db, user)
     refresh_token_str = create_refresh_token(user.id)
 
     # Store refresh token
@@ -338,7 +369,7 @@ async def oauth_callback(
         user = await auth_service.create_user_oauth(db, email)
 
     # Create tokens
-    access_token = create_access_token(user.id)
+    access_token = await auth_service.issue_access_token(db, user)
     refresh_token_str = create_refresh_token(user.id)
 
     # Store refresh token
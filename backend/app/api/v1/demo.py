@@ -9,16 +9,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_current_user
 from app.core.exceptions import NotFoundException
 from app.db.session import get_db
-from app.models.user import User
 from app.schemas.demo import DemoItemCreate, DemoItemResponse, DemoItemUpdate
 from app.services.demo_service import demo_service
+from app.services.principal_cache import Principal
 
 router = APIRouter(prefix="/demo", tags=["demo"])
 
 
 @router.get("/items", response_model=List[DemoItemResponse])
 async def list_items(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Get all items for the current user."""
@@ -29,7 +29,7 @@ async def list_items(
 @router.post("/items", response_model=DemoItemResponse, status_code=status.HTTP_201_CREATED)
 async def create_item(
     request: DemoItemCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new item."""
@@ -40,7 +40,7 @@ async def create_item(
 @router.get("/items/{item_id}", response_model=DemoItemResponse)
 async def get_item(
     item_id: UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Get a specific item by ID."""
@@ -59,7 +59,7 @@ async def get_item(
 async def update_item(
     item_id: UUID,
     request: DemoItemUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Update an existing item."""
@@ -79,7 +79,7 @@ async def update_item(
 @router.delete("/items/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_item(
     item_id: UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Delete an item."""
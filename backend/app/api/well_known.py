@@ -0,0 +1,24 @@
+"""Well-known discovery endpoints (served outside /api/v1)."""
+
+from fastapi import APIRouter, Request, Response
+
+from app.core import security
+from app.core.config import settings
+
+router = APIRouter(prefix="/.well-known", tags=["well-known"])
+
+
+@router.get("/jwks.json")
+async def get_jwks(request: Request) -> Response:
+    """Public keys for verifying access tokens locally (RFC 7517 JWK Set).
+
+    Empty when tokens are signed with a shared HS* secret.
+    """
+    key_ring = security.key_ring
+    headers = {
+        "Cache-Control": f"public, max-age={settings.JWKS_CACHE_MAX_AGE_SECONDS}",
+        "ETag": key_ring.jwks_etag,
+    }
+    if request.headers.get("if-none-match") == key_ring.jwks_etag:
+        return Response(status_code=304, headers=headers)
+    return Response(key_ring.jwks(), media_type="application/jwk-set+json", headers=headers)
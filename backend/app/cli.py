@@ -0,0 +1,130 @@
+"""Command-line maintenance tasks.
+
+Usage (from backend/):
+    python -m app.cli retention [--dry-run] [--table audit_logs] [--batch-size 1000]
+    python -m app.cli generate-signing-key --kid 2026-10
+    python -m app.cli calibrate-hash [--target-ms 250] [--write-env .env]
+"""
+
+import argparse
+import asyncio
+import logging
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.keys import generate_private_key
+from app.core.security import MAX_BCRYPT_ROUNDS, calibrate_bcrypt_rounds, measure_bcrypt_ms
+from app.db.session import audit_engine, engine
+from app.services.retention_service import RETENTION_POLICIES, RetentionResult, retention_service
+
+
+def _print_progress(result: RetentionResult) -> None:
+    action = "would delete" if result.dry_run else "deleted"
+    print(
+        f"{result.table}: batch {result.batches}, {action} {result.rows} rows "
+        f"({result.elapsed_seconds:.1f}s)",
+        flush=True,
+    )
+
+
+async def _retention(args: argparse.Namespace) -> None:
+    results = await retention_service.run(
+        tables=args.table,
+        dry_run=args.dry_run,
+        progress=_print_progress,
+        batch_size=args.batch_size,
+        sleep_seconds=args.sleep,
+    )
+    for result in results:
+        if not result.enabled:
+            print(f"{result.table}: retention disabled")
+            continue
+        if result.partitioned:
+            print(f"{result.table}: partitioned, expired partitions are dropped instead")
+            continue
+        action = "would delete" if result.dry_run else "deleted"
+        print(f"{result.table}: {action} {result.rows} rows in {result.batches} batches")
+
+
+async def _generate_signing_key(args: argparse.Namespace) -> None:
+    path = generate_private_key(args.dir, args.kid, args.algorithm)
+    print(f"Wrote {args.algorithm} key {args.kid!r} to {path}")
+    print("It is published in the JWKS after a restart; set JWT_ACTIVE_KID to sign with it.")
+
+
+async def _calibrate_hash(args: argparse.Namespace) -> None:
+    rounds, elapsed_ms = calibrate_bcrypt_rounds(args.target_ms)
+    for cost in range(max(rounds - 1, 4), min(rounds + 1, MAX_BCRYPT_ROUNDS) + 1):
+        marker = "  <- selected" if cost == rounds else ""
+        print(f"cost {cost:2d}: {measure_bcrypt_ms(cost, samples=1):8.1f}ms{marker}")
+    print(f"Target {args.target_ms:.0f}ms: BCRYPT_ROUNDS={rounds} ({elapsed_ms:.0f}ms per hash)")
+    if rounds != settings.BCRYPT_ROUNDS:
+        print(
+            f"Currently {settings.BCRYPT_ROUNDS}; "
+            "existing hashes are rehashed at each user's next login."
+        )
+
+    if args.write_env:
+        path = Path(args.write_env)
+        line = f"BCRYPT_ROUNDS={rounds}"
+        text = path.read_text() if path.exists() else ""
+        if re.search(r"^BCRYPT_ROUNDS=.*$", text, flags=re.MULTILINE):
+            text = re.sub(r"^BCRYPT_ROUNDS=.*$", line, text, flags=re.MULTILINE)
+        else:
+            text += ("" if not text or text.endswith("\n") else "\n") + line + "\n"
+        path.write_text(text)
+        print(f"Wrote {line} to {path}")
+
+
+async def _main(args: argparse.Namespace) -> None:
+    try:
+        await args.func(args)
+    finally:
+        await engine.dispose()
+        await audit_engine.dispose()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Maintenance tasks")
+    subparsers = parser.add_subparsers(required=True)
+
+    retention = subparsers.add_parser("retention", help="Purge expired rows in batches")
+    retention.add_argument("--dry-run", action="store_true", help="Count rows without deleting")
+    retention.add_argument(
+        "--table",
+        action="append",
+        choices=list(RETENTION_POLICIES),
+        help="Table to purge (repeatable; default: all)",
+    )
+    retention.add_argument("--batch-size", type=int, default=None)
+    retention.add_argument("--sleep", type=float, default=None, help="Seconds between batches")
+    retention.set_defaults(func=_retention)
+
+    signing_key = subparsers.add_parser(
+        "generate-signing-key", help="Create a JWT signing key for RS*/ES* algorithms"
+    )
+    signing_key.add_argument(
+        "--kid",
+        default=datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S"),
+        help="Key ID (default: current UTC timestamp, so newer keys sort last)",
+    )
+    signing_key.add_argument("--algorithm", default=settings.JWT_ALGORITHM)
+    signing_key.add_argument("--dir", default=settings.JWT_KEYS_DIR)
+    signing_key.set_defaults(func=_generate_signing_key)
+
+    calibrate = subparsers.add_parser(
+        "calibrate-hash", help="Pick BCRYPT_ROUNDS for a target hash latency on this host"
+    )
+    calibrate.add_argument("--target-ms", type=float, default=settings.PASSWORD_HASH_TARGET_MS)
+    calibrate.add_argument("--write-env", metavar="FILE", help="Set BCRYPT_ROUNDS in this env file")
+    calibrate.set_defaults(func=_calibrate_hash)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
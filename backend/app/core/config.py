@@ -15,9 +15,23 @@ class Settings(BaseSettings):
 
     # JWT
     JWT_SECRET_KEY: str = "your-secret-key-here-change-in-production"
-    JWT_ALGORITHM: str = "HS256"
+    JWT_ALGORITHM: str = "HS256"  # HS256 | RS256 | ES256 (RS*/ES* publish a JWKS)
+    JWT_KEYS_DIR: str = "jwt-keys"  # <kid>.pem private keys for RS*/ES*
+    JWT_ACTIVE_KID: str = ""  # required for RS*/ES* once JWT_KEYS_DIR holds several keys
+    JWKS_CACHE_MAX_AGE_SECONDS: int = 300
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    JWT_CACHE_MAX_SIZE: int = 10000  # verified access tokens kept in memory; 0 = disabled
+
+    # Password hashing (bcrypt runs on a worker pool, off the event loop)
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # thread | process
+    PASSWORD_HASH_WORKERS: int = 0  # 0 = number of CPUs
+    PASSWORD_HASH_MAX_PENDING: int = 64  # operations submitted to the pool at once
+    PASSWORD_HASH_MAX_QUEUE: int = 256  # callers waiting for a slot; beyond that 503
+    PASSWORD_HASH_MAX_WAIT_MS: int = 2000  # longest wait for a slot before 503
+    BCRYPT_ROUNDS: int = 12  # cost factor; older hashes are upgraded on login
+    PASSWORD_HASH_TARGET_MS: float = 250  # per-hash latency budget for calibration
+    PASSWORD_HASH_CALIBRATE_ON_STARTUP: bool = False  # pick BCRYPT_ROUNDS per host at startup
 
     # Feature Flags
     AUTH_EMAIL_ENABLED: bool = True
@@ -35,6 +49,19 @@ class Settings(BaseSettings):
     OAUTH_TENANT_ID: str = ""
     OAUTH_REDIRECT_URI: str = ""
 
+    # Principal cache (get_current_user)
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0  # max staleness for deactivation; 0 = disabled
+
+    # Stateless access tokens: is_admin / is_active / token_epoch claims are
+    # trusted without a users lookup; revocation epochs are polled from the DB
+    STATELESS_ACCESS_TOKENS: bool = False
+    TOKEN_EPOCH_REFRESH_SECONDS: float = 5.0
+
+    # Token introspection for internal services (X-Service-Token; empty = disabled)
+    INTROSPECTION_SERVICE_TOKENS: List[str] = []
+    INTROSPECTION_BATCH_MAX_TOKENS: int = 100
+
     # CORS
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:5173"]
 
@@ -42,6 +69,41 @@ class Settings(BaseSettings):
     INITIAL_ADMIN_EMAIL: str = ""
     INITIAL_ADMIN_PASSWORD: str = ""
 
+    # Audit
+    AUDIT_DATABASE_URL: str = ""  # empty = DATABASE_URL (still a separate pool)
+    AUDIT_DB_POOL_SIZE: int = 5
+    AUDIT_DB_MAX_OVERFLOW: int = 5
+    AUDIT_QUEUE_MAX_SIZE: int = 10000
+    AUDIT_BATCH_MAX_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_INGEST_ENGINE: str = "insert"  # orm | insert | copy
+    AUDIT_WRITE_TIMEOUT_SECONDS: float = 5.0
+    AUDIT_SPOOL_DIR: str = "audit-spool"  # empty = disabled
+    AUDIT_SPOOL_MAX_BYTES: int = 1024 * 1024 * 1024
+    AUDIT_SPOOL_SEGMENT_BYTES: int = 16 * 1024 * 1024
+    AUDIT_SPOOL_REPLAY_INTERVAL_SECONDS: int = 5
+    AUDIT_PARTITION_INTERVAL: str = "month"  # month | day
+    AUDIT_PARTITION_PREMAKE: int = 3
+    AUDIT_PARTITION_MAINTENANCE_INTERVAL_SECONDS: int = 3600
+    AUDIT_RETENTION_DAYS: int = 0  # 0 = keep forever
+    AUDIT_COUNT_STRATEGY: str = "exact"  # exact | estimated | cached
+    AUDIT_COUNT_CACHE_TTL_SECONDS: int = 30
+    AUDIT_ROLLUPS_ENABLED: bool = True
+    AUDIT_POLICY_FILE: str = ""  # JSON list of rules, see app/middleware/audit_policy.py
+    AUDIT_POLICY_DEFAULT_ACTION: str = "metadata"  # skip | metadata | body
+    AUDIT_BODY_CAPTURE_ENABLED: bool = False
+    AUDIT_BODY_MAX_BYTES: int = 4096
+    AUDIT_BODY_MASK_KEYS: List[str] = ["password", "code", "token"]
+    AUDIT_TIMINGS_ENABLED: bool = True  # per-stage breakdown (db/auth/handler)
+    SERVER_TIMING_ENABLED: bool = False  # expose the breakdown as Server-Timing
+
+    # Retention (batched purge; AUDIT_RETENTION_DAYS above applies to audit_logs)
+    AUTH_CODE_RETENTION_DAYS: int = 1
+    REFRESH_TOKEN_RETENTION_DAYS: int = 0  # 0 = purge as soon as expired
+    RETENTION_BATCH_SIZE: int = 1000
+    RETENTION_BATCH_SLEEP_SECONDS: float = 0.1
+    RETENTION_INTERVAL_SECONDS: int = 3600  # 0 = CLI only
+
     # App
     DEBUG: bool = False
 
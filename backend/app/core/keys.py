@@ -0,0 +1,144 @@
+"""JWT signing keys: a shared HMAC secret or a rotating set of asymmetric keys."""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from jose import jwk
+from jose.backends.base import Key
+
+from app.core.config import settings
+
+ASYMMETRIC_ALGORITHMS = ("RS256", "RS384", "RS512", "ES256", "ES384", "ES512")
+KEY_SUFFIX = ".pem"
+
+
+@dataclass(frozen=True, slots=True)
+class SigningKey:
+    """One asymmetric key pair, identified by ``kid``."""
+
+    kid: str
+    private_key: Key
+    public_key: Key
+
+    def public_jwk(self, algorithm: str) -> dict:
+        """Return the public half as a JWK."""
+        data = self.public_key.to_dict()
+        data.update({"kid": self.kid, "use": "sig", "alg": algorithm})
+        return data
+
+
+class KeyRing:
+    """Keys used to sign and verify JWTs.
+
+    With an HS* algorithm the ring holds only ``JWT_SECRET_KEY`` and tokens
+    carry no ``kid``. With RS*/ES* every ``<kid>.pem`` private key in
+    ``JWT_KEYS_DIR`` is published in the JWKS and accepted for
+    verification, while only ``JWT_ACTIVE_KID`` signs new tokens. It may be
+    left empty only while the directory holds a single key.
+
+    Rotation without invalidating tokens: add the new key file (published,
+    not yet signing) and restart; once downstream JWKS caches have expired
+    (``JWKS_CACHE_MAX_AGE_SECONDS``), switch ``JWT_ACTIVE_KID``; remove the
+    old file after the longest token lifetime has passed.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        secret: Optional[str] = None,
+        keys: Optional[dict[str, SigningKey]] = None,
+        active_kid: Optional[str] = None,
+    ):
+        self.algorithm = algorithm
+        self._secret = secret
+        self._keys = keys or {}
+        self._active_kid = active_kid
+        if self.asymmetric and active_kid not in self._keys:
+            raise ValueError(f"JWT_ACTIVE_KID {active_kid!r} not found among signing keys")
+        self._jwks = json.dumps(
+            {"keys": [key.public_jwk(algorithm) for key in self._keys.values()]},
+            separators=(",", ":"),
+        ).encode("utf-8")
+        self.jwks_etag = f'"{hashlib.sha256(self._jwks).hexdigest()[:32]}"'
+
+    @property
+    def asymmetric(self) -> bool:
+        """Whether tokens are signed with a private key (and published via JWKS)."""
+        return self.algorithm in ASYMMETRIC_ALGORITHMS
+
+    @classmethod
+    def from_directory(cls, directory: str, algorithm: str, active_kid: str) -> "KeyRing":
+        """Load every ``<kid>.pem`` private key in ``directory``."""
+        keys = {}
+        for path in sorted(Path(directory).glob(f"*{KEY_SUFFIX}")):
+            kid = path.name[: -len(KEY_SUFFIX)]
+            private_key = jwk.construct(path.read_text(), algorithm)
+            keys[kid] = SigningKey(kid, private_key, private_key.public_key())
+        if not keys:
+            raise ValueError(f"No {KEY_SUFFIX} signing keys found in {directory!r}")
+        if not active_kid:
+            # Never pick a key implicitly during rotation: a newly added key
+            # would start signing before verifiers have fetched it
+            if len(keys) > 1:
+                raise ValueError(
+                    f"JWT_ACTIVE_KID must be set when {directory!r} holds several keys"
+                )
+            active_kid = next(iter(keys))
+        return cls(algorithm, keys=keys, active_kid=active_kid)
+
+    def signing_key(self) -> tuple[object, Optional[dict]]:
+        """Return (key, extra JWT headers) for signing a new token."""
+        if not self.asymmetric:
+            return self._secret, None
+        return self._keys[self._active_kid].private_key, {"kid": self._active_kid}
+
+    def verification_key(self, kid: Optional[str]) -> Optional[object]:
+        """Return the key for a token's ``kid`` header, or None if unknown."""
+        if not self.asymmetric:
+            return self._secret
+        key = self._keys.get(kid) if kid else None
+        return key.public_key if key else None
+
+    def jwks(self) -> bytes:
+        """Return the serialized JWK Set of public keys (empty for HS*)."""
+        return self._jwks
+
+
+def load_key_ring() -> KeyRing:
+    """Build the key ring from settings."""
+    algorithm = settings.JWT_ALGORITHM
+    if algorithm in ASYMMETRIC_ALGORITHMS:
+        return KeyRing.from_directory(settings.JWT_KEYS_DIR, algorithm, settings.JWT_ACTIVE_KID)
+    if not algorithm.startswith("HS"):
+        raise ValueError(f"Unsupported JWT_ALGORITHM: {algorithm}")
+    return KeyRing(algorithm, secret=settings.JWT_SECRET_KEY)
+
+
+def generate_private_key(directory: str, kid: str, algorithm: str) -> Path:
+    """Write a new private key for ``algorithm`` as ``<directory>/<kid>.pem`` (mode 0600)."""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+    curves = {"ES256": ec.SECP256R1(), "ES384": ec.SECP384R1(), "ES512": ec.SECP521R1()}
+    if algorithm in curves:
+        private_key = ec.generate_private_key(curves[algorithm])
+    elif algorithm in ASYMMETRIC_ALGORITHMS:
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        raise ValueError(f"{algorithm} does not use key pairs")
+
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    path = Path(directory) / f"{kid}{KEY_SUFFIX}"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(pem)
+    return path
@@ -0,0 +1,24 @@
+"""Opaque keyset pagination cursors."""
+
+import base64
+from datetime import datetime
+from uuid import UUID
+
+from app.core.exceptions import ValidationException
+
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    """Encode the (created_at, id) position of the last row of a page."""
+    raw = f"{created_at.isoformat()}|{id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Decode a cursor produced by ``encode_cursor``."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        created_at, id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), UUID(id)
+    except (ValueError, UnicodeError):
+        raise ValidationException(detail="Invalid cursor") from None
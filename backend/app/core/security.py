@@ -1,5 +1,15 @@
 """Security utilities for JWT and password hashing."""
 
+import asyncio
+import hashlib
+import math
+import os
+import re
+import statistics
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from uuid import UUID
@@ -8,8 +18,101 @@ import bcrypt
 from jose import JWTError, jwt
 
 from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableException
+from app.core.keys import load_key_ring
+from app.core.timing import stage, timed_stage
 
 
+class VerifiedTokenCache:
+    """Thread-safe LRU of verified token payloads, valid until their ``exp``.
+
+    Keys are keyed BLAKE2b digests of the token string, so raw tokens are
+    not held in memory and colliding keys cannot be crafted from outside.
+    Only successfully verified tokens are stored; failures are never cached.
+    """
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._key = os.urandom(16)
+        self._lock = threading.Lock()
+        # digest -> (exp unix time, payload), least recently used first
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+
+        # Counters
+        self._hits = 0
+        self._misses = 0
+
+    def _digest(self, token: str) -> bytes:
+        return hashlib.blake2b(token.encode("utf-8"), key=self._key, digest_size=16).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        """Return a copy of the cached payload, or None if missing or expired."""
+        if self._max_size <= 0:
+            return None
+        digest = self._digest(token)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._entries[digest]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self._hits += 1
+            return dict(entry[1])
+
+    def put(self, token: str, payload: dict) -> None:
+        """Cache a verified payload until its ``exp`` claim."""
+        exp = payload.get("exp")
+        if self._max_size <= 0 or not isinstance(exp, (int, float)):
+            return
+        digest = self._digest(token)
+        with self._lock:
+            self._entries[digest] = (exp, dict(payload))
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every entry, e.g. after a signing key change."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return cache counters for monitoring."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_size": self._max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+verified_token_cache = VerifiedTokenCache(settings.JWT_CACHE_MAX_SIZE)
+
+# Signing/verification keys (JWT_ALGORITHM, JWT_KEYS_DIR, JWT_ACTIVE_KID)
+key_ring = load_key_ring()
+
+
+def _sign(payload: dict) -> str:
+    """Sign claims with the active key (adds a ``kid`` header for RS*/ES*)."""
+    key, headers = key_ring.signing_key()
+    return jwt.encode(payload, key, algorithm=key_ring.algorithm, headers=headers)
+
+
+def _verify(token: str) -> dict:
+    """Verify a token against the key named by its ``kid``. Raises JWTError."""
+    kid = jwt.get_unverified_header(token).get("kid") if key_ring.asymmetric else None
+    key = key_ring.verification_key(kid)
+    if key is None:
+        raise JWTError(f"Unknown signing key: {kid}")
+    return jwt.decode(token, key, algorithms=[key_ring.algorithm])
+
+
+@timed_stage("auth")
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
     return bcrypt.checkpw(
@@ -18,14 +121,224 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     )
 
 
+@timed_stage("auth")
 def get_password_hash(password: str) -> str:
     """Hash a password."""
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(settings.BCRYPT_ROUNDS)
     return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
 
 
-def create_access_token(user_id: UUID, expires_delta: Optional[timedelta] = None) -> str:
-    """Create a new access token."""
+# Calibration never picks a cost outside this range, whatever the target
+MIN_BCRYPT_ROUNDS = 10
+MAX_BCRYPT_ROUNDS = 16
+
+_BCRYPT_COST = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
+
+
+def bcrypt_rounds(hashed_password: str) -> Optional[int]:
+    """Return the cost factor of a bcrypt hash, or None if it is not one."""
+    match = _BCRYPT_COST.match(hashed_password)
+    return int(match.group(1)) if match else None
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Whether a hash was made with a cost other than ``BCRYPT_ROUNDS``."""
+    return bcrypt_rounds(hashed_password) != settings.BCRYPT_ROUNDS
+
+
+def measure_bcrypt_ms(rounds: int, samples: int = 3) -> float:
+    """Return the median time in milliseconds to hash at ``rounds`` on this host."""
+    salt = bcrypt.gensalt(rounds)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.hashpw(b"calibration-password", salt)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate_bcrypt_rounds(target_ms: float) -> tuple[int, float]:
+    """Pick the highest cost whose hash time on this host stays within ``target_ms``.
+
+    Each extra round doubles the work, so the time measured at
+    ``MIN_BCRYPT_ROUNDS`` is extrapolated and the pick then re-measured.
+    Never goes below ``MIN_BCRYPT_ROUNDS``. Returns (rounds, measured ms).
+    """
+    base_ms = measure_bcrypt_ms(MIN_BCRYPT_ROUNDS)
+    rounds = MIN_BCRYPT_ROUNDS
+    while rounds < MAX_BCRYPT_ROUNDS:
+        if base_ms * 2 ** (rounds + 1 - MIN_BCRYPT_ROUNDS) > target_ms:
+            break
+        rounds += 1
+    elapsed_ms = base_ms * 2 ** (rounds - MIN_BCRYPT_ROUNDS)
+    if rounds > MIN_BCRYPT_ROUNDS:
+        elapsed_ms = measure_bcrypt_ms(rounds, samples=1)
+        while elapsed_ms > target_ms and rounds > MIN_BCRYPT_ROUNDS:
+            rounds -= 1
+            elapsed_ms = measure_bcrypt_ms(rounds, samples=1)
+    return rounds, elapsed_ms
+
+
+class PasswordHasher:
+    """Runs bcrypt on a worker pool so hashing never blocks the event loop.
+
+    ``kind`` is ``thread`` (bcrypt releases the GIL) or ``process``.
+
+    Admission control keeps a burst of logins from taking the whole service
+    down with it: at most ``max_pending`` operations run at once, at most
+    ``max_queue`` callers wait for a slot, and none waits longer than
+    ``max_wait`` seconds. Callers that cannot be admitted get a 503 with
+    ``Retry-After`` right away instead of piling up.
+    """
+
+    def __init__(
+        self, kind: str, workers: int, max_pending: int, max_queue: int, max_wait: float
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown password hash executor: {kind}")
+        self._kind = kind
+        self._workers = workers or os.cpu_count() or 1
+        self._max_pending = max(max_pending, self._workers)
+        self._max_queue = max_queue
+        self._max_wait = max_wait
+        self._slots = asyncio.Semaphore(self._max_pending)
+        self._executor: Optional[Executor] = None
+        # Moving average of one operation, used to estimate Retry-After
+        self._op_seconds: Optional[float] = None
+
+        # Counters
+        self._pending = 0
+        self._waiting = 0
+        self._completed = 0
+        self._queued = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+        self._rejected_queue_full = 0
+        self._rejected_timeout = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self._kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self._workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._workers, thread_name_prefix="password-hash"
+                )
+        return self._executor
+
+    def _overloaded(self) -> ServiceUnavailableException:
+        # Time for the pool to work through everything ahead of a new caller
+        backlog = self._pending + self._waiting
+        estimate = backlog / self._workers * (self._op_seconds or self._max_wait)
+        return ServiceUnavailableException(
+            detail="Too many concurrent sign-in requests, please retry",
+            retry_after=max(1, math.ceil(estimate)),
+        )
+
+    async def _admit(self) -> None:
+        """Take a pool slot, or raise ServiceUnavailableException."""
+        if not self._slots.locked():
+            await self._slots.acquire()
+            return
+        if self._waiting >= self._max_queue:
+            self._rejected_queue_full += 1
+            raise self._overloaded()
+
+        self._waiting += 1
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self._max_wait)
+        except asyncio.TimeoutError:
+            self._rejected_timeout += 1
+            raise self._overloaded() from None
+        finally:
+            self._waiting -= 1
+        waited = time.perf_counter() - start
+        self._queued += 1
+        self._wait_seconds_total += waited
+        self._wait_seconds_max = max(self._wait_seconds_max, waited)
+
+    async def _run(self, func, *args):
+        await self._admit()
+        self._pending += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._op_seconds = (
+                elapsed if self._op_seconds is None else 0.9 * self._op_seconds + 0.1 * elapsed
+            )
+            self._pending -= 1
+            self._completed += 1
+            self._slots.release()
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against a hash on the pool."""
+        return await self._run(
+            bcrypt.checkpw, plain_password.encode("utf-8"), hashed_password.encode("utf-8")
+        )
+
+    async def hash(self, password: str) -> str:
+        """Hash a password on the pool."""
+        salt = bcrypt.gensalt(settings.BCRYPT_ROUNDS)
+        hashed = await self._run(bcrypt.hashpw, password.encode("utf-8"), salt)
+        return hashed.decode("utf-8")
+
+    def shutdown(self) -> None:
+        """Stop the worker pool (it is recreated on next use)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        """Return pool and admission counters for monitoring."""
+        return {
+            "executor": self._kind,
+            "workers": self._workers,
+            "max_pending": self._max_pending,
+            "max_queue": self._max_queue,
+            "max_wait_ms": round(self._max_wait * 1000),
+            "pending": self._pending,
+            "waiting": self._waiting,
+            "completed": self._completed,
+            "queued": self._queued,
+            "wait_ms_avg": (
+                round(self._wait_seconds_total / self._queued * 1000, 3) if self._queued else 0.0
+            ),
+            "wait_ms_max": round(self._wait_seconds_max * 1000, 3),
+            "rejected_queue_full": self._rejected_queue_full,
+            "rejected_timeout": self._rejected_timeout,
+        }
+
+
+password_hasher = PasswordHasher(
+    settings.PASSWORD_HASH_EXECUTOR,
+    settings.PASSWORD_HASH_WORKERS,
+    settings.PASSWORD_HASH_MAX_PENDING,
+    settings.PASSWORD_HASH_MAX_QUEUE,
+    settings.PASSWORD_HASH_MAX_WAIT_MS / 1000,
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash without blocking the event loop."""
+    with stage("auth"):
+        return await password_hasher.verify(plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password without blocking the event loop."""
+    with stage("auth"):
+        return await password_hasher.hash(password)
+
+
+@timed_stage("auth")
+def create_access_token(
+    user_id: UUID, expires_delta: Optional[timedelta] = None, claims: Optional[dict] = None
+) -> str:
+    """Create a new access token, with optional extra ``claims``."""
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
     else:
@@ -39,9 +352,12 @@ def create_access_token(user_id: UUID, expires_delta: Optional[timedelta] = None
         "type": "access",
         "iat": datetime.now(timezone.utc),
     }
-    return jwt.encode(payload, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    if claims:
+        payload.update(claims)
+    return _sign(payload)
 
 
+@timed_stage("auth")
 def create_refresh_token(user_id: UUID) -> str:
     """Create a new refresh token."""
     expire = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
@@ -52,28 +368,38 @@ def create_refresh_token(user_id: UUID) -> str:
         "type": "refresh",
         "iat": datetime.now(timezone.utc),
     }
-    return jwt.encode(payload, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    return _sign(payload)
+
 
+def hash_refresh_token(token: str) -> bytes:
+    """Return the SHA-256 digest under which a refresh token is stored."""
+    return hashlib.sha256(token.encode("utf-8")).digest()
 
+
+@timed_stage("auth")
 def decode_access_token(token: str) -> Optional[dict]:
-    """Decode and validate an access token."""
+    """Decode and validate an access token.
+
+    Verified payloads are served from ``verified_token_cache`` until they expire.
+    """
+    payload = verified_token_cache.get(token)
+    if payload is not None:
+        return payload
     try:
-        payload = jwt.decode(
-            token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-        )
+        payload = _verify(token)
         if payload.get("type") != "access":
             return None
+        verified_token_cache.put(token, payload)
         return payload
     except JWTError:
         return None
 
 
+@timed_stage("auth")
 def decode_refresh_token(token: str) -> Optional[dict]:
     """Decode and validate a refresh token."""
     try:
-        payload = jwt.decode(
-            token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-        )
+        payload = _verify(token)
         if payload.get("type") != "refresh":
             return None
         return payload
@@ -0,0 +1,60 @@
+"""Periodic background tasks run inside the application lifespan."""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Run an async callable every ``interval`` seconds until stopped.
+
+    Errors are logged and the task keeps running, so one failed run (e.g. a
+    database blip) does not stop the schedule.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[object]],
+        interval: float,
+        initial_delay: float = 0.0,
+    ):
+        self.name = name
+        self._func = func
+        self._interval = interval
+        self._initial_delay = initial_delay
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the task is scheduled."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Schedule the task on the running event loop."""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        """Cancel the task and wait for it to finish."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        if self._initial_delay:
+            await asyncio.sleep(self._initial_delay)
+        while True:
+            try:
+                await self._func()
+            except Exception as e:
+                logger.error(f"Periodic task {self.name} failed: {e}")
+            await asyncio.sleep(self._interval)
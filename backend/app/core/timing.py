@@ -0,0 +1,149 @@
+"""Request-scoped timing breakdown (DB, auth, handler)."""
+
+import time
+from contextvars import ContextVar, Token
+from functools import wraps
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_NS_PER_MS = 1_000_000
+
+
+class RequestTimings:
+    """Per-request stage timings in nanoseconds (``perf_counter_ns``).
+
+    ``db_ns`` and ``db_queries`` are filled by SQLAlchemy cursor events,
+    named stages (e.g. ``auth``) by ``stage`` blocks. Stages are exclusive:
+    DB time spent inside a stage is counted as DB time only, and whatever
+    is left of the total is attributed to the handler.
+    """
+
+    __slots__ = ("start_ns", "db_ns", "db_queries", "stages", "_open")
+
+    def __init__(self) -> None:
+        self.start_ns = time.perf_counter_ns()
+        self.db_ns = 0
+        self.db_queries = 0
+        self.stages: dict[str, int] = {}
+        self._open: set[str] = set()
+
+    def breakdown(self, end_ns: Optional[int] = None) -> dict:
+        """Return the compact per-stage summary in milliseconds."""
+        total_ns = (end_ns or time.perf_counter_ns()) - self.start_ns
+        stages_ns = sum(self.stages.values())
+        result = {
+            "total_ms": round(total_ns / _NS_PER_MS, 3),
+            "db_ms": round(self.db_ns / _NS_PER_MS, 3),
+            "db_queries": self.db_queries,
+        }
+        for name, ns in self.stages.items():
+            result[f"{name}_ms"] = round(ns / _NS_PER_MS, 3)
+        handler_ns = max(total_ns - self.db_ns - stages_ns, 0)
+        result["handler_ms"] = round(handler_ns / _NS_PER_MS, 3)
+        return result
+
+    def server_timing(self, end_ns: Optional[int] = None) -> str:
+        """Format the breakdown as a ``Server-Timing`` header value."""
+        breakdown = self.breakdown(end_ns)
+        metrics = [f'db;dur={breakdown["db_ms"]};desc="{self.db_queries} queries"']
+        metrics.extend(f"{name};dur={breakdown[f'{name}_ms']}" for name in self.stages)
+        metrics.append(f'handler;dur={breakdown["handler_ms"]}')
+        metrics.append(f'total;dur={breakdown["total_ms"]}')
+        return ", ".join(metrics)
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def start_request_timings() -> tuple[RequestTimings, Token]:
+    """Begin timing the current request. Pass the token to ``end_request_timings``."""
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def end_request_timings(token: Token) -> None:
+    """Stop attributing work to the request started with ``token``."""
+    _current.reset(token)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """Return the timings of the request being handled, if any."""
+    return _current.get()
+
+
+class stage:
+    """Context manager adding its elapsed time to a named stage of the current request.
+
+    Nested blocks of the same stage are counted once, by the outermost one.
+    Outside a timed request it does nothing.
+    """
+
+    __slots__ = ("_name", "_timings", "_start_ns", "_db_start_ns")
+
+    def __init__(self, name: str):
+        self._name = name
+        self._timings: Optional[RequestTimings] = None
+
+    def __enter__(self) -> "stage":
+        timings = _current.get()
+        if timings is not None and self._name not in timings._open:
+            timings._open.add(self._name)
+            self._timings = timings
+            self._db_start_ns = timings.db_ns
+            self._start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        timings = self._timings
+        if timings is None:
+            return
+        elapsed = time.perf_counter_ns() - self._start_ns
+        elapsed -= timings.db_ns - self._db_start_ns
+        timings.stages[self._name] = timings.stages.get(self._name, 0) + max(elapsed, 0)
+        timings._open.discard(self._name)
+        self._timings = None
+
+
+def timed_stage(name: str):
+    """Decorator timing every call of a (sync) function as ``name``."""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start_ns", []).append(time.perf_counter_ns())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = _current.get()
+    starts = conn.info.get("query_start_ns")
+    if timings is None or not starts:
+        return
+    timings.db_ns += time.perf_counter_ns() - starts.pop()
+    timings.db_queries += 1
+
+
+def _handle_error(context) -> None:
+    # A failed statement never reaches after_cursor_execute
+    starts = context.connection.info.get("query_start_ns") if context.connection else None
+    if starts:
+        starts.pop()
+
+
+def install_query_timing() -> None:
+    """Time every SQL statement against the request that issued it (all engines)."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
@@ -5,6 +5,10 @@ from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core.config import settings
+from app.core.timing import install_query_timing
+
+# Attribute SQL time and query counts to the request being handled
+install_query_timing()
 
 engine = create_async_engine(
     settings.DATABASE_URL,
@@ -20,6 +24,32 @@ async_session_maker = async_sessionmaker(
     autoflush=False,
 )
 
+# Audit writes and admin audit reads get their own pool (and optionally their
+# own database) so they never compete with request handlers for connections
+AUDIT_DATABASE_URL = settings.AUDIT_DATABASE_URL or settings.DATABASE_URL
+
+audit_engine = create_async_engine(
+    AUDIT_DATABASE_URL,
+    echo=settings.DEBUG,
+    pool_pre_ping=True,
+    **(
+        {}
+        if AUDIT_DATABASE_URL.startswith("sqlite")
+        else {
+            "pool_size": settings.AUDIT_DB_POOL_SIZE,
+            "max_overflow": settings.AUDIT_DB_MAX_OVERFLOW,
+        }
+    ),
+)
+
+audit_session_maker = async_sessionmaker(
+    audit_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Get database session."""
@@ -32,3 +62,16 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             raise
         finally:
             await session.close()
+
+
+async def get_audit_db() -> AsyncGenerator[AsyncSession, None]:
+    """Get audit database session."""
+    async with audit_session_maker() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
@@ -1,5 +1,6 @@
 """FastAPI application entry point."""
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
@@ -8,11 +9,17 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.api.v1.router import router as api_router
+from app.api.well_known import router as well_known_router
 from app.core.config import settings
+from app.core.security import calibrate_bcrypt_rounds, password_hasher
+from app.core.tasks import PeriodicTask
 from app.db.session import async_session_maker
 from app.middleware.audit import AuditMiddleware
-from app.middleware.request_id import RequestIdMiddleware
+from app.services.audit_partition_service import audit_partition_service
+from app.services.audit_writer import audit_writer
 from app.services.auth_service import auth_service
+from app.services.retention_service import retention_service
+from app.services.token_epoch_service import token_epoch_service
 
 logger = logging.getLogger(__name__)
 
@@ -36,13 +43,63 @@ async def create_initial_admin():
             await db.rollback()
 
 
+async def calibrate_password_hashing():
+    """Pick BCRYPT_ROUNDS for this host from PASSWORD_HASH_TARGET_MS."""
+    rounds, elapsed_ms = await asyncio.to_thread(
+        calibrate_bcrypt_rounds, settings.PASSWORD_HASH_TARGET_MS
+    )
+    if rounds != settings.BCRYPT_ROUNDS:
+        logger.info(
+            f"bcrypt cost calibrated: {settings.BCRYPT_ROUNDS} -> {rounds} ({elapsed_ms:.0f}ms)"
+        )
+    settings.BCRYPT_ROUNDS = rounds
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
+    if settings.PASSWORD_HASH_CALIBRATE_ON_STARTUP:
+        await calibrate_password_hashing()
     await create_initial_admin()
+    await audit_writer.start()
+    background_tasks = [
+        PeriodicTask(
+            "audit-partition-maintenance",
+            audit_partition_service.run_maintenance,
+            settings.AUDIT_PARTITION_MAINTENANCE_INTERVAL_SECONDS,
+        ),
+        PeriodicTask(
+            "audit-spool-replay",
+            audit_writer.replay_spool,
+            settings.AUDIT_SPOOL_REPLAY_INTERVAL_SECONDS,
+        ),
+    ]
+    if settings.STATELESS_ACCESS_TOKENS:
+        background_tasks.append(
+            PeriodicTask(
+                "token-epoch-refresh",
+                token_epoch_service.refresh,
+                settings.TOKEN_EPOCH_REFRESH_SECONDS,
+            )
+        )
+    if settings.RETENTION_INTERVAL_SECONDS > 0:
+        background_tasks.append(
+            PeriodicTask(
+                "retention",
+                retention_service.run,
+                settings.RETENTION_INTERVAL_SECONDS,
+                initial_delay=60,
+            )
+        )
+    for task in background_tasks:
+        task.start()
     yield
     # Shutdown
+    for task in background_tasks:
+        await task.stop()
+    await audit_writer.stop()
+    password_hasher.shutdown()
 
 
 app = FastAPI(
@@ -54,9 +111,9 @@ app = FastAPI(
     redoc_url="/redoc" if settings.DEBUG else None,
 )
 
-# Add middlewares (order matters - first added is outermost)
+# Add middlewares (order matters - last added is outermost)
+# AuditMiddleware also assigns the request ID (X-Request-Id)
 app.add_middleware(AuditMiddleware)
-app.add_middleware(RequestIdMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
@@ -67,6 +124,7 @@ app.add_middleware(
 
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
+app.include_router(well_known_router)
 
 
 @app.get("/health")
@@ -1,6 +1,7 @@
 """Middleware module initialization."""
 
 from app.middleware.audit import AuditMiddleware
+from app.middleware.audit_policy import AuditPolicy
 from app.middleware.request_id import RequestIdMiddleware
 
-__all__ = ["RequestIdMiddleware", "AuditMiddleware"]
+__all__ = ["RequestIdMiddleware", "AuditMiddleware", "AuditPolicy"]
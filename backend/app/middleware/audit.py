@@ -1,70 +1,172 @@
 """Audit logging middleware."""
 
 import time
-from typing import Callable, Optional
+import uuid
+from typing import Optional
 from uuid import UUID
 
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from app.db.session import async_session_maker
-from app.services.audit_service import audit_service
+from app.core.config import settings
+from app.core.timing import RequestTimings, end_request_timings, start_request_timings
+from app.middleware.audit_policy import BODY, SKIP, AuditPolicy, load_audit_policy
+from app.middleware.body_capture import BodyCapture, is_json_content_type
+from app.services.audit_service import AuditRecord
+from app.services.audit_writer import audit_writer
 
+# id(route) -> (route, template). Holding the route keeps its id from being
+# reused; the cache is bounded by the number of routes in the app.
+_route_templates: dict[int, tuple[object, str]] = {}
 
-class AuditMiddleware(BaseHTTPMiddleware):
-    """Middleware to log all API requests for auditing."""
 
-    # Paths to exclude from audit logging
-    EXCLUDE_PATHS = [
-        "/health",
-        "/docs",
-        "/redoc",
-        "/openapi.json",
-        "/favicon.ico",
-    ]
+def resolve_route_template(scope: Scope) -> Optional[str]:
+    """Return the matched route template, e.g. ``/api/v1/demo/items/{item_id}``.
 
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
-        # Skip excluded paths
-        if any(request.url.path.startswith(p) for p in self.EXCLUDE_PATHS):
-            return await call_next(request)
+    Newer FastAPI versions resolve included routers lazily and keep the full
+    (prefixed) template on the effective route context; otherwise the matched
+    route carries it. Returns None when no route matched (e.g. 404).
+    """
+    route = scope.get("fastapi", {}).get("effective_route_context") or scope.get("route")
+    if route is None:
+        return None
 
-        start_time = time.time()
+    cached = _route_templates.get(id(route))
+    if cached is not None and cached[0] is route:
+        return cached[1]
 
-        # Execute the request
-        response = await call_next(request)
+    template = getattr(route, "path", None)
+    if template is not None:
+        _route_templates[id(route)] = (route, template)
+    return template
 
-        duration_ms = int((time.time() - start_time) * 1000)
 
-        # Get user_id from request state (set by auth dependency)
-        user_id: Optional[UUID] = getattr(request.state, "user_id", None)
+class AuditMiddleware:
+    """Pure ASGI middleware that assigns a request ID and logs every API request.
 
-        # Get request ID
-        request_id = getattr(request.state, "request_id", "unknown")
+    Status code and timing are taken from the ``send`` messages, so the
+    response body is streamed through untouched. The request ID is stored in
+    ``request.state.request_id`` and returned as ``X-Request-Id``; the user ID
+    set on ``request.state.user_id`` by the auth dependency and the matched
+    route template are read back once the response has been sent.
 
-        # Get client info
-        client_host = request.client.host if request.client else None
-        user_agent = request.headers.get("user-agent")
+    Whether a request is recorded is decided by the compiled ``AuditPolicy``
+    (see ``AUDIT_POLICY_FILE``) from its method, path, route and status.
+    With ``AUDIT_BODY_CAPTURE_ENABLED``, JSON bodies of requests that may hit
+    a ``body`` rule are teed from ``receive`` (capped and masked) and stored
+    when the final decision is ``body``.
+
+    Each request gets a ``RequestTimings`` context; its DB/auth/handler
+    breakdown is stored on the record (``AUDIT_TIMINGS_ENABLED``) and sent
+    as ``Server-Timing`` (``SERVER_TIMING_ENABLED``).
+    """
+
+    def __init__(self, app: ASGIApp, policy: Optional[AuditPolicy] = None) -> None:
+        self.app = app
+        self.policy = policy or load_audit_policy()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = str(uuid.uuid4())
+        # request.state is backed by this dict
+        state = scope.setdefault("state", {})
+        state["request_id"] = request_id
+
+        status_code = 500
+        timings: Optional[RequestTimings] = None
+        if settings.AUDIT_TIMINGS_ENABLED or settings.SERVER_TIMING_ENABLED:
+            timings, timings_token = start_request_timings()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Request-Id", request_id)
+                if timings is not None and settings.SERVER_TIMING_ENABLED:
+                    headers.append("Server-Timing", timings.server_timing())
+            await send(message)
 
-        # Log asynchronously (don't block the response)
+        path: str = scope["path"]
+        method: str = scope["method"]
+        capture = self._body_capture(scope, method, path)
+        if capture is not None:
+            receive = capture.wrap(receive)
+
+        start_ns = time.perf_counter_ns()
         try:
-            async with async_session_maker() as db:
-                await audit_service.log(
-                    db=db,
-                    request_id=request_id,
-                    user_id=user_id,
-                    method=request.method,
-                    path=str(request.url.path),
-                    status_code=response.status_code,
-                    duration_ms=duration_ms,
-                    ip=client_host,
-                    user_agent=user_agent,
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            end_ns = time.perf_counter_ns()
+            if timings is not None:
+                end_request_timings(timings_token)
+            duration_ms = round((end_ns - start_ns) / 1_000_000)
+            route = resolve_route_template(scope)
+            action = self.policy.decide(method, path, route, status_code)
+            if action != SKIP:
+                request_body = capture.result() if capture and action == BODY else None
+                breakdown = (
+                    timings.breakdown(end_ns)
+                    if timings is not None and settings.AUDIT_TIMINGS_ENABLED
+                    else None
+                )
+                self._enqueue(
+                    scope, request_id, route, status_code, duration_ms, request_body, breakdown
                 )
-                await db.commit()
-        except Exception:
-            # Don't fail the request if audit logging fails
-            pass
 
-        return response
+    def _body_capture(self, scope: Scope, method: str, path: str) -> Optional[BodyCapture]:
+        """Start body capture if enabled, the body is JSON and the policy may want it."""
+        if not settings.AUDIT_BODY_CAPTURE_ENABLED:
+            return None
+        if not self.policy.may_capture_body(method, path):
+            return None
+        for key, value in scope["headers"]:
+            if key == b"content-type":
+                if is_json_content_type(value.decode("latin-1")):
+                    return BodyCapture(
+                        settings.AUDIT_BODY_MAX_BYTES, settings.AUDIT_BODY_MASK_KEYS
+                    )
+                break
+        return None
+
+    def _enqueue(
+        self,
+        scope: Scope,
+        request_id: str,
+        route: Optional[str],
+        status_code: int,
+        duration_ms: int,
+        request_body: Optional[str] = None,
+        timings: Optional[dict] = None,
+    ) -> None:
+        """Build the audit record and hand it to the background writer."""
+        # Get user_id from request state (set by auth dependency)
+        user_id: Optional[UUID] = scope["state"].get("user_id")
+
+        # Get client info
+        client = scope.get("client")
+        user_agent = None
+        for key, value in scope["headers"]:
+            if key == b"user-agent":
+                user_agent = value.decode("latin-1")
+                break
+
+        # Never blocks the response
+        audit_writer.enqueue(
+            AuditRecord(
+                request_id=request_id,
+                user_id=user_id,
+                method=scope["method"],
+                path=scope["path"],
+                route=route,
+                status_code=status_code,
+                duration_ms=duration_ms,
+                ip=client[0] if client else None,
+                user_agent=user_agent,
+                request_body=request_body,
+                timings=timings,
+            )
+        )
@@ -0,0 +1,181 @@
+"""Declarative audit policy compiled into lookup tables."""
+
+import json
+import random
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from app.core.config import settings
+
+SKIP = "skip"
+SAMPLE = "sample"
+METADATA = "metadata"
+BODY = "body"
+ACTIONS = (SKIP, SAMPLE, METADATA, BODY)
+
+# Built-in rules; rules from AUDIT_POLICY_FILE take precedence over these
+DEFAULT_AUDIT_POLICY = [
+    {"prefix": "/health", "action": SKIP},
+    {"prefix": "/docs", "action": SKIP},
+    {"prefix": "/redoc", "action": SKIP},
+    {"prefix": "/openapi.json", "action": SKIP},
+    {"prefix": "/favicon.ico", "action": SKIP},
+    {"prefix": "/.well-known", "action": SKIP},
+    # Admin writes are always captured in full
+    {"prefix": "/api/v1/admin", "methods": ["POST", "PUT", "PATCH", "DELETE"], "action": BODY},
+]
+
+
+def _segments(path: str) -> list[str]:
+    return [segment for segment in path.split("/") if segment]
+
+
+@dataclass(frozen=True, slots=True)
+class AuditRule:
+    """One policy rule: a path prefix or route template, optional filters and an action."""
+
+    action: str
+    prefix: Optional[str] = None
+    route: Optional[str] = None
+    methods: frozenset[str] = frozenset()
+    status_classes: frozenset[int] = frozenset()
+    rate: float = 1.0
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "AuditRule":
+        """Validate and build a rule from its config mapping."""
+        unknown = set(data) - {"action", "prefix", "route", "methods", "status_classes", "rate"}
+        if unknown:
+            raise ValueError(f"Unknown audit rule keys: {', '.join(sorted(unknown))}")
+        action = data.get("action")
+        if action not in ACTIONS:
+            raise ValueError(f"Audit rule action must be one of {ACTIONS}: {data}")
+        if bool(data.get("prefix")) == bool(data.get("route")):
+            raise ValueError(f"Audit rule needs exactly one of prefix or route: {data}")
+        rate = float(data.get("rate", 1.0))
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError(f"Audit rule rate must be between 0 and 1: {data}")
+        return cls(
+            action=action,
+            prefix=data.get("prefix"),
+            route=data.get("route"),
+            methods=frozenset(method.upper() for method in data.get("methods", ())),
+            status_classes=frozenset(int(c) for c in data.get("status_classes", ())),
+            rate=rate,
+        )
+
+    def matches(self, method: str, status_code: int) -> bool:
+        """Check the method and status class filters."""
+        if self.methods and method not in self.methods:
+            return False
+        if self.status_classes and status_code // 100 not in self.status_classes:
+            return False
+        return True
+
+
+class _PrefixNode:
+    __slots__ = ("children", "rules")
+
+    def __init__(self):
+        self.children: dict[str, "_PrefixNode"] = {}
+        self.rules: list[AuditRule] = []
+
+
+class AuditPolicy:
+    """Audit policy compiled into a route-template table and a path-segment trie.
+
+    Precedence: a rule on the matched route template, then rules on the
+    longest matching path prefix (whole segments), then ``default_action``.
+    Within one key, rules are tried in order and the first whose method and
+    status filters match decides. ``sample`` resolves to ``metadata`` for
+    ``rate`` of requests and to ``skip`` otherwise.
+    """
+
+    def __init__(self, rules: Iterable[AuditRule], default_action: str = METADATA):
+        self.default_action = default_action
+        self._routes: dict[str, list[AuditRule]] = {}
+        self._root = _PrefixNode()
+
+        # Methods for which some route rule captures bodies
+        self._route_body_methods: set[Optional[str]] = set()
+
+        for rule in rules:
+            if rule.route:
+                if rule.action == BODY:
+                    self._route_body_methods.update(rule.methods or {None})
+                self._routes.setdefault(rule.route, []).append(rule)
+                continue
+            node = self._root
+            for segment in _segments(rule.prefix):
+                node = node.children.setdefault(segment, _PrefixNode())
+            node.rules.append(rule)
+
+    @classmethod
+    def from_config(cls, rules: Iterable[dict], default_action: str = METADATA) -> "AuditPolicy":
+        """Compile a policy from config mappings."""
+        if default_action not in (SKIP, METADATA, BODY):
+            raise ValueError(f"Invalid default audit action: {default_action}")
+        return cls([AuditRule.from_dict(rule) for rule in rules], default_action)
+
+    def _prefix_rules(self, path: str) -> list[list[AuditRule]]:
+        """Rule lists along the path, deepest (most specific) first."""
+        matched = []
+        node = self._root
+        if node.rules:
+            matched.append(node.rules)
+        for segment in _segments(path):
+            node = node.children.get(segment)
+            if node is None:
+                break
+            if node.rules:
+                matched.append(node.rules)
+        matched.reverse()
+        return matched
+
+    def _match(
+        self, method: str, path: str, route: Optional[str], status_code: int
+    ) -> Optional[AuditRule]:
+        if route is not None:
+            for rule in self._routes.get(route, ()):
+                if rule.matches(method, status_code):
+                    return rule
+        for rules in self._prefix_rules(path):
+            for rule in rules:
+                if rule.matches(method, status_code):
+                    return rule
+        return None
+
+    def decide(self, method: str, path: str, route: Optional[str], status_code: int) -> str:
+        """Return the action for a finished request: skip, metadata or body."""
+        rule = self._match(method, path, route, status_code)
+        if rule is None:
+            return self.default_action
+        if rule.action == SAMPLE:
+            return METADATA if random.random() < rule.rate else SKIP
+        return rule.action
+
+    def may_capture_body(self, method: str, path: str) -> bool:
+        """Whether the request could end up with ``body``, judged before it runs.
+
+        The route and status are unknown at this point, so this is
+        conservative; ``decide`` makes the final call once the response is sent.
+        """
+        if self.default_action == BODY:
+            return True
+        if None in self._route_body_methods or method in self._route_body_methods:
+            return True
+        for rules in self._prefix_rules(path):
+            for rule in rules:
+                if rule.action == BODY and (not rule.methods or method in rule.methods):
+                    return True
+        return False
+
+
+def load_audit_policy() -> AuditPolicy:
+    """Compile the built-in rules plus any from ``AUDIT_POLICY_FILE``."""
+    rules = []
+    if settings.AUDIT_POLICY_FILE:
+        with open(settings.AUDIT_POLICY_FILE, encoding="utf-8") as f:
+            rules.extend(json.load(f))
+    rules.extend(DEFAULT_AUDIT_POLICY)
+    return AuditPolicy.from_config(rules, settings.AUDIT_POLICY_DEFAULT_ACTION)
@@ -0,0 +1,194 @@
+"""Bounded request-body capture with incremental JSON masking."""
+
+import json
+from typing import Iterable, Optional
+
+from starlette.types import Message, Receive
+
+MASK = b'"***"'
+TRUNCATED_MARKER = "...[truncated]"
+
+_QUOTE = ord('"')
+_BACKSLASH = ord("\\")
+_COLON = ord(":")
+_OPEN = frozenset(b"{[")
+_CLOSE = frozenset(b"}]")
+_WHITESPACE = frozenset(b" \t\r\n")
+_SCALAR_END = frozenset(b",}]") | _WHITESPACE
+
+# Longest key kept for the sensitive-key check
+_KEY_MAX_BYTES = 128
+
+
+def _decode_key(raw: bytes) -> str:
+    """Decode the contents of a JSON string token (escapes included), lower-cased.
+
+    ``"pass\\u0077ord"`` must be recognized as ``password``.
+    """
+    if _BACKSLASH in raw:
+        try:
+            return json.loads(b'"' + raw + b'"').lower()
+        except ValueError:
+            # Cut off mid-escape at _KEY_MAX_BYTES, or malformed
+            pass
+    return raw.decode("utf-8", "replace").lower()
+
+
+def is_json_content_type(content_type: str) -> bool:
+    """Whether a Content-Type header denotes JSON (application/json, */*+json)."""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type == "application/json" or media_type.endswith("+json")
+
+
+class JsonMasker:
+    """Streaming JSON scanner that replaces values of sensitive keys with ``"***"``.
+
+    Input may be split at any byte; state carries over between ``feed``
+    calls, so each byte is scanned once. A key is sensitive if it contains
+    any of ``mask_keys`` (case-insensitive), which also covers names like
+    ``refresh_token`` or ``new_password``. Nested values under a sensitive
+    key are masked as a whole. Malformed JSON passes through unmasked except
+    for any values already recognized.
+    """
+
+    def __init__(self, mask_keys: Iterable[str]):
+        self._mask_keys = tuple(key.lower() for key in mask_keys)
+        self._out = bytearray()
+        self._in_string = False
+        self._escape = False
+        self._string = bytearray()
+        self._last_string: Optional[str] = None  # candidate key awaiting ':'
+        self._pending = False  # next value belongs to a sensitive key
+        self._skip: Optional[str] = None  # "string" | "scalar" | "nested"
+        self._depth = 0
+
+    def _is_sensitive(self, key: str) -> bool:
+        return any(mask_key in key for mask_key in self._mask_keys)
+
+    def _skip_byte(self, b: int) -> bool:
+        """Advance over a masked value. Returns False if ``b`` ends a scalar unconsumed."""
+        if self._skip == "scalar":
+            if b in _SCALAR_END:
+                self._skip = None
+                return False
+            return True
+
+        # Strings, and strings inside masked objects/arrays
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif b == _BACKSLASH:
+                self._escape = True
+            elif b == _QUOTE:
+                self._in_string = False
+                if self._skip == "string":
+                    self._skip = None
+            return True
+
+        if b == _QUOTE:
+            self._in_string = True
+        elif b in _OPEN:
+            self._depth += 1
+        elif b in _CLOSE:
+            self._depth -= 1
+            if self._depth == 0:
+                self._skip = None
+        return True
+
+    def feed(self, chunk: Iterable[int]) -> None:
+        """Scan the next piece of the document."""
+        out = self._out
+        for b in chunk:
+            if self._skip is not None and self._skip_byte(b):
+                continue
+
+            if self._in_string:
+                out.append(b)
+                if self._escape:
+                    self._escape = False
+                elif b == _BACKSLASH:
+                    self._escape = True
+                elif b == _QUOTE:
+                    self._in_string = False
+                    self._last_string = _decode_key(bytes(self._string))
+                    continue
+                if len(self._string) < _KEY_MAX_BYTES:
+                    self._string.append(b)
+                continue
+
+            if b in _WHITESPACE:
+                out.append(b)
+                continue
+
+            if self._pending:
+                self._pending = False
+                out += MASK
+                if b == _QUOTE:
+                    self._skip = "string"
+                    self._in_string = True
+                elif b in _OPEN:
+                    self._skip = "nested"
+                    self._depth = 1
+                else:
+                    self._skip = "scalar"
+                continue
+
+            out.append(b)
+            if b == _QUOTE:
+                self._in_string = True
+                self._string.clear()
+                continue
+            if b == _COLON and self._last_string is not None:
+                self._pending = self._is_sensitive(self._last_string)
+            self._last_string = None
+
+    def getvalue(self) -> bytes:
+        """Return the masked output so far."""
+        return bytes(self._out)
+
+
+class BodyCapture:
+    """Tees the ASGI ``receive`` stream, keeping at most ``max_bytes`` of the body.
+
+    Chunks pass through to the application unchanged; only the first
+    ``max_bytes`` are scanned (and masked) as they arrive, so capture costs
+    O(max_bytes) regardless of the upload size and nothing beyond the cap
+    is buffered.
+    """
+
+    def __init__(self, max_bytes: int, mask_keys: Iterable[str]):
+        self._remaining = max_bytes
+        self._masker = JsonMasker(mask_keys)
+        self.received_bytes = 0
+        self.truncated = False
+
+    def feed(self, chunk: bytes) -> None:
+        """Capture the next body chunk, up to the remaining cap."""
+        self.received_bytes += len(chunk)
+        if len(chunk) > self._remaining:
+            self.truncated = True
+        if self._remaining <= 0:
+            return
+        view = memoryview(chunk)[: self._remaining]
+        self._remaining -= len(view)
+        self._masker.feed(view)
+
+    def wrap(self, receive: Receive) -> Receive:
+        """Return a ``receive`` callable that feeds request bodies to this capture."""
+
+        async def receive_wrapper() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                self.feed(message.get("body", b""))
+            return message
+
+        return receive_wrapper
+
+    def result(self) -> Optional[str]:
+        """Return the masked (and possibly truncated) body, or None if empty."""
+        if not self.received_bytes:
+            return None
+        text = self._masker.getvalue().decode("utf-8", "replace")
+        if self.truncated:
+            text += TRUNCATED_MARKER
+        return text
@@ -2,21 +2,31 @@
 
 import uuid
 
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 
-class RequestIdMiddleware(BaseHTTPMiddleware):
-    """Middleware to add a unique request ID to each request."""
+class RequestIdMiddleware:
+    """Pure ASGI middleware to add a unique request ID to each request.
+
+    ``AuditMiddleware`` already assigns request IDs; use this one only when
+    audit logging is not installed.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
         request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
+        scope.setdefault("state", {})["request_id"] = request_id
 
-        response = await call_next(request)
-        response.headers["X-Request-Id"] = request_id
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Request-Id", request_id)
+            await send(message)
 
-        return response
+        await self.app(scope, receive, send_wrapper)
@@ -1,9 +1,19 @@
 """Models module initialization."""
 
 from app.models.audit_log import AuditLog
+from app.models.audit_rollup import AuditRollup
 from app.models.auth_code import AuthCode
 from app.models.demo_item import DemoItem
 from app.models.refresh_token import RefreshToken
+from app.models.token_epoch import UserTokenEpoch
 from app.models.user import User
 
-__all__ = ["User", "RefreshToken", "AuthCode", "AuditLog", "DemoItem"]
+__all__ = [
+    "User",
+    "RefreshToken",
+    "UserTokenEpoch",
+    "AuthCode",
+    "AuditLog",
+    "AuditRollup",
+    "DemoItem",
+]
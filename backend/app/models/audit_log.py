@@ -3,8 +3,8 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import JSON, DateTime, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 
@@ -15,16 +15,32 @@ class AuditLog(Base):
     """Audit log model for tracking all API requests."""
 
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        # Keyset pagination: ORDER BY created_at DESC, id DESC
+        Index("ix_audit_logs_created_at_id", "created_at", "id"),
+        # User filter (semi-join on user_id)
+        Index("ix_audit_logs_user_id_created_at", "user_id", "created_at"),
+        # Route template filter / grouping
+        Index("ix_audit_logs_route_created_at", "route", "created_at"),
+        # Substring search on path (pg_trgm, migration 004)
+        Index(
+            "ix_audit_logs_path_trgm",
+            "path",
+            postgresql_using="gin",
+            postgresql_ops={"path": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     request_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
-    user_id: Mapped[uuid.UUID | None] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True
-    )
+    # No foreign key: audit storage may live in another database (AUDIT_DATABASE_URL)
+    user_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
     method: Mapped[str] = mapped_column(String(10), nullable=False)
     path: Mapped[str] = mapped_column(String(2048), nullable=False)
+    # Matched route template, e.g. /api/v1/demo/items/{item_id} (None if unmatched)
+    route: Mapped[str | None] = mapped_column(String(255), nullable=True)
     status_code: Mapped[int] = mapped_column(Integer, nullable=False)
     duration_ms: Mapped[int] = mapped_column(Integer, nullable=False)
     ip: Mapped[str | None] = mapped_column(String(45), nullable=True)
@@ -32,6 +48,11 @@ class AuditLog(Base):
     request_body: Mapped[str | None] = mapped_column(
         Text, nullable=True
     )  # センシティブ情報はマスク
+    # Per-stage breakdown, e.g. {"db_ms": 1.2, "db_queries": 3, "auth_ms": 0.4, ...}
+    timings: Mapped[dict | None] = mapped_column(
+        JSON().with_variant(JSONB(), "postgresql"), nullable=True
+    )
+    # Partition key on PostgreSQL (see migration 002_audit_partitioning)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(), index=True
+        DateTime(timezone=True), nullable=False, server_default=func.now()
     )
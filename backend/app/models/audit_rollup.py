@@ -0,0 +1,47 @@
+"""Per-minute audit rollup model."""
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Integer, SmallInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+# Upper bounds (ms, inclusive) of the latency histogram buckets. Requests
+# slower than the last bound land in the overflow bucket.
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class AuditRollup(Base):
+    """Request counts and latency stats per (minute, method, route, status class).
+
+    Maintained incrementally by the audit pipeline so dashboards read
+    O(minutes) rows instead of scanning audit_logs.
+    """
+
+    __tablename__ = "audit_rollups_minute"
+
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    method: Mapped[str] = mapped_column(String(10), primary_key=True)
+    route: Mapped[str] = mapped_column(String(2048), primary_key=True)
+    status_class: Mapped[int] = mapped_column(SmallInteger, primary_key=True)  # 2 = 2xx, ...
+
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    duration_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    duration_min: Mapped[int] = mapped_column(Integer, nullable=False)
+    duration_max: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    # Latency histogram, one column per LATENCY_BUCKETS_MS bound + overflow
+    le_5: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    le_10: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    le_25: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    le_50: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    le_100: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    le_250: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    le_500: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    le_1000: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    le_2500: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    le_inf: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+HISTOGRAM_COLUMNS = tuple(f"le_{bound}" for bound in LATENCY_BUCKETS_MS) + ("le_inf",)
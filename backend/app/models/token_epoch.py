@@ -0,0 +1,30 @@
+"""Token epoch model."""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class UserTokenEpoch(Base):
+    """Revocation epoch of a user's access tokens.
+
+    Stateless access tokens carry the epoch they were issued at; bumping it
+    revokes every older token. Only users whose tokens were ever revoked
+    have a row. There is no foreign key so the epoch outlives a deleted
+    user and keeps that user's tokens revoked.
+    """
+
+    __tablename__ = "user_token_epochs"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    epoch: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Workers poll for rows changed since their last refresh
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), index=True
+    )
@@ -1,7 +1,7 @@
 """Audit log schemas."""
 
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -16,10 +16,12 @@ class AuditLogResponse(BaseModel):
     user_email: Optional[str] = None
     method: str
     path: str
+    route: Optional[str] = None
     status_code: int
     duration_ms: int
     ip: Optional[str] = None
     user_agent: Optional[str] = None
+    timings: Optional[dict] = None
     created_at: datetime
 
     model_config = {"from_attributes": True}
@@ -30,8 +32,10 @@ class AuditLogListResponse(BaseModel):
 
     items: List[AuditLogResponse]
     total: int
+    total_is_estimate: bool = False
     page: int
     limit: int
+    next_cursor: Optional[str] = None
 
 
 class AuditLogFilter(BaseModel):
@@ -40,7 +44,38 @@ class AuditLogFilter(BaseModel):
     user_email: Optional[str] = None
     method: Optional[str] = None
     path: Optional[str] = None
+    route: Optional[str] = None
     from_date: Optional[datetime] = None
     to_date: Optional[datetime] = None
     page: int = 1
     limit: int = 50
+    cursor: Optional[str] = None
+    count_strategy: Optional[Literal["exact", "estimated", "cached"]] = None
+
+
+class AuditRollupPoint(BaseModel):
+    """One time bucket of aggregated request stats.
+
+    Dimensions not requested in ``group_by`` are None.
+    """
+
+    bucket_start: datetime
+    method: Optional[str] = None
+    route: Optional[str] = None
+    status_class: Optional[int] = None
+    count: int
+    duration_avg: float
+    duration_min: int
+    duration_max: int
+    p50: int
+    p95: int
+    p99: int
+    histogram: List[int]
+
+
+class AuditRollupResponse(BaseModel):
+    """Audit rollup time series."""
+
+    interval_minutes: int
+    bucket_bounds_ms: List[int]  # histogram upper bounds; the last bucket is overflow
+    items: List[AuditRollupPoint]
@@ -2,7 +2,7 @@
 
 from typing import List, Optional
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 
 
 class AuthMethodsResponse(BaseModel):
@@ -58,3 +58,24 @@ class OAuthAuthorizeResponse(BaseModel):
     """Response containing OAuth authorize URL."""
 
     authorize_url: str
+
+
+class IntrospectBatchRequest(BaseModel):
+    """Request for batch access-token introspection."""
+
+    tokens: List[str] = Field(..., min_length=1)
+
+
+class TokenIntrospection(BaseModel):
+    """Introspection result for one token; only ``active`` is set when inactive."""
+
+    active: bool
+    sub: Optional[str] = None
+    is_admin: Optional[bool] = None
+    exp: Optional[int] = None
+
+
+class IntrospectBatchResponse(BaseModel):
+    """Introspection results in request order."""
+
+    results: List[TokenIntrospection]
@@ -51,3 +51,4 @@ class UserListResponse(BaseModel):
     total: int
     page: int
     limit: int
+    next_cursor: str | None = None
@@ -1,10 +1,16 @@
 """Services module initialization."""
 
+from app.services.audit_partition_service import audit_partition_service
+from app.services.audit_rollup_service import audit_rollup_service
 from app.services.audit_service import audit_service
+from app.services.audit_writer import audit_writer
 from app.services.auth_service import auth_service
 from app.services.code_auth_service import code_auth_service
 from app.services.demo_service import demo_service
 from app.services.oauth_service import oauth_service
+from app.services.principal_cache import principal_cache
+from app.services.retention_service import retention_service
+from app.services.token_epoch_service import token_epoch_service
 
 __all__ = [
     "auth_service",
@@ -12,4 +18,10 @@ __all__ = [
     "oauth_service",
     "demo_service",
     "audit_service",
+    "audit_partition_service",
+    "audit_rollup_service",
+    "audit_writer",
+    "principal_cache",
+    "retention_service",
+    "token_epoch_service",
 ]
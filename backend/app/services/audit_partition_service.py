@@ -0,0 +1,227 @@
+"""Audit log partition maintenance (PostgreSQL only)."""
+
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import audit_session_maker
+
+logger = logging.getLogger(__name__)
+
+TABLE_NAME = "audit_logs"
+
+_BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+def period_start(ts: datetime, interval: str) -> datetime:
+    """Return the start of the partition period containing ``ts`` (UTC)."""
+    ts = ts.astimezone(timezone.utc)
+    if interval == "day":
+        return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "month":
+        return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown partition interval: {interval}")
+
+
+def next_period(start: datetime, interval: str) -> datetime:
+    """Return the start of the period following ``start``."""
+    if interval == "day":
+        return start + timedelta(days=1)
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+def partition_name(start: datetime, interval: str) -> str:
+    """Return the partition table name for the period starting at ``start``."""
+    suffix = start.strftime("%Y%m%d" if interval == "day" else "%Y%m")
+    return f"{TABLE_NAME}_p{suffix}"
+
+
+def _parse_bound(value: str) -> Optional[datetime]:
+    """Parse one side of a range bound; MINVALUE/MAXVALUE become None."""
+    value = value.strip()
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    return datetime.fromisoformat(value.strip("'")).astimezone(timezone.utc)
+
+
+@dataclass
+class AuditPartition:
+    """An attached partition of audit_logs and its range."""
+
+    name: str
+    lower: Optional[datetime]
+    upper: Optional[datetime]
+    is_default: bool = False
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        if self.is_default:
+            return False
+        return (self.lower is None or self.lower < end) and (
+            self.upper is None or self.upper > start
+        )
+
+
+class AuditPartitionService:
+    """Creates future partitions and drops expired ones.
+
+    ``audit_logs`` is range-partitioned on ``created_at`` by migration
+    ``002_audit_partitioning``. Retention is enforced by dropping partitions
+    whose upper bound is older than ``AUDIT_RETENTION_DAYS``, which avoids
+    large DELETEs entirely. On other databases every method is a no-op.
+    """
+
+    async def is_partitioned(self, db: AsyncSession) -> bool:
+        """Check whether audit_logs is a partitioned table."""
+        if db.get_bind().dialect.name != "postgresql":
+            return False
+        result = await db.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table pt "
+                "JOIN pg_class c ON c.oid = pt.partrelid "
+                "WHERE c.relname = :table AND pg_table_is_visible(c.oid)"
+            ),
+            {"table": TABLE_NAME},
+        )
+        return result.scalar() is not None
+
+    async def list_partitions(self, db: AsyncSession) -> list[AuditPartition]:
+        """List attached partitions with their bounds."""
+        result = await db.execute(
+            text(
+                "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+                "FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = :table AND pg_table_is_visible(p.oid) "
+                "ORDER BY c.relname"
+            ),
+            {"table": TABLE_NAME},
+        )
+        partitions = []
+        for name, bound in result.all():
+            if bound == "DEFAULT":
+                partitions.append(AuditPartition(name, None, None, is_default=True))
+                continue
+            match = _BOUND_RE.search(bound)
+            if not match:
+                continue
+            partitions.append(
+                AuditPartition(name, _parse_bound(match.group(1)), _parse_bound(match.group(2)))
+            )
+        return partitions
+
+    async def create_future_partitions(
+        self,
+        db: AsyncSession,
+        now: Optional[datetime] = None,
+        interval: Optional[str] = None,
+        premake: Optional[int] = None,
+    ) -> list[str]:
+        """Create partitions for the current period and ``premake`` periods ahead.
+
+        A period that cannot be created is logged and skipped, so one failure
+        does not stop later periods (or the expiry pass) on every run.
+        """
+        if not await self.is_partitioned(db):
+            return []
+
+        interval = interval or settings.AUDIT_PARTITION_INTERVAL
+        premake = settings.AUDIT_PARTITION_PREMAKE if premake is None else premake
+        existing = await self.list_partitions(db)
+
+        default = next((p.name for p in existing if p.is_default), None)
+
+        created = []
+        start = period_start(now or datetime.now(timezone.utc), interval)
+        for _ in range(premake + 1):
+            end = next_period(start, interval)
+            if not any(p.overlaps(start, end) for p in existing):
+                name = partition_name(start, interval)
+                try:
+                    async with db.begin_nested():
+                        await self._create_partition(db, name, start, end, default)
+                except Exception as e:
+                    # Keep going: later periods and expiry do not depend on this one
+                    logger.error(f"Failed to create audit partition {name}: {e!r}")
+                else:
+                    existing.append(AuditPartition(name, start, end))
+                    created.append(name)
+            start = end
+        return created
+
+    async def _create_partition(
+        self, db: AsyncSession, name: str, start: datetime, end: datetime, default: Optional[str]
+    ) -> None:
+        """Create one partition, moving rows for its range out of the default partition.
+
+        PostgreSQL refuses to add a partition while the default partition holds
+        rows in its range, so those rows (normally few) are moved with the
+        default partition briefly detached.
+        """
+        bounds = f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        in_range = f"created_at >= '{start.isoformat()}' AND created_at < '{end.isoformat()}'"
+        stranded = default is not None and (
+            await db.execute(text(f'SELECT 1 FROM "{default}" WHERE {in_range} LIMIT 1'))
+        ).scalar() is not None
+        if not stranded:
+            await db.execute(
+                text(f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF {TABLE_NAME} {bounds}')
+            )
+            return
+
+        logger.warning(f"Moving audit rows for {name} out of the default partition {default}")
+        await db.execute(text(f'ALTER TABLE {TABLE_NAME} DETACH PARTITION "{default}"'))
+        await db.execute(text(f'CREATE TABLE "{name}" PARTITION OF {TABLE_NAME} {bounds}'))
+        await db.execute(text(f'INSERT INTO "{name}" SELECT * FROM "{default}" WHERE {in_range}'))
+        await db.execute(text(f'DELETE FROM "{default}" WHERE {in_range}'))
+        await db.execute(text(f'ALTER TABLE {TABLE_NAME} ATTACH PARTITION "{default}" DEFAULT'))
+
+    async def drop_expired_partitions(
+        self,
+        db: AsyncSession,
+        retention_days: Optional[int] = None,
+        now: Optional[datetime] = None,
+        dry_run: bool = False,
+    ) -> list[str]:
+        """Drop partitions that only contain rows older than the retention period."""
+        retention_days = (
+            settings.AUDIT_RETENTION_DAYS if retention_days is None else retention_days
+        )
+        if retention_days <= 0 or not await self.is_partitioned(db):
+            return []
+
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=retention_days)
+        expired = [
+            p.name
+            for p in await self.list_partitions(db)
+            if not p.is_default and p.upper is not None and p.upper <= cutoff
+        ]
+        if dry_run:
+            return expired
+
+        for name in expired:
+            await db.execute(text(f'ALTER TABLE {TABLE_NAME} DETACH PARTITION "{name}"'))
+            await db.execute(text(f'DROP TABLE "{name}"'))
+        return expired
+
+    async def run_maintenance(self) -> dict:
+        """Create upcoming partitions and drop expired ones."""
+        async with audit_session_maker() as db:
+            created = await self.create_future_partitions(db)
+            dropped = await self.drop_expired_partitions(db)
+            await db.commit()
+
+        if created or dropped:
+            logger.info(f"Audit partitions created={created} dropped={dropped}")
+        return {"created": created, "dropped": dropped}
+
+
+audit_partition_service = AuditPartitionService()
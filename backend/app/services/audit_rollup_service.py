@@ -0,0 +1,206 @@
+"""Per-minute audit rollups for dashboards."""
+
+import logging
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Optional, Sequence
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.audit_rollup import HISTOGRAM_COLUMNS, LATENCY_BUCKETS_MS, AuditRollup
+
+if TYPE_CHECKING:
+    from app.services.audit_service import AuditRecord
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = ("method", "route", "status_class")
+
+# Requests that matched no route (404s, scanners probing arbitrary paths)
+# share one key, so rollup cardinality stays bounded by the route table
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Dialect-specific INSERT ... ON CONFLICT and two-argument min/max
+_UPSERT = {
+    "postgresql": (postgresql.insert, func.least, func.greatest),
+    "sqlite": (sqlite.insert, func.min, func.max),
+}
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def minute_start(ts: datetime) -> datetime:
+    """Floor a timestamp to the start of its UTC minute."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(timezone.utc).replace(second=0, microsecond=0)
+
+
+def interval_start(ts: datetime, interval_minutes: int) -> datetime:
+    """Floor a minute bucket to the start of its ``interval_minutes`` window."""
+    ts = minute_start(ts)
+    minutes = int((ts - _EPOCH).total_seconds()) // 60
+    return ts - timedelta(minutes=minutes % interval_minutes)
+
+
+def histogram_percentile(histogram: Sequence[int], total: int, max_ms: int, q: float) -> int:
+    """Approximate a latency percentile as the upper bound of its histogram bucket."""
+    if total == 0:
+        return 0
+    rank = q * total
+    seen = 0
+    # The last bucket counts everything above the largest bound
+    for bound, count in zip((*LATENCY_BUCKETS_MS, max_ms), histogram, strict=True):
+        seen += count
+        if seen >= rank:
+            return min(bound, max_ms)
+    return max_ms
+
+
+class AuditRollupService:
+    """Service maintaining and querying audit_rollups_minute."""
+
+    def aggregate(self, records: Sequence["AuditRecord"]) -> list[dict]:
+        """Fold audit records into rollup rows, ordered by key."""
+        rows: dict[tuple, dict] = {}
+        for record in records:
+            key = (
+                minute_start(record.created_at),
+                record.method,
+                record.route or UNMATCHED_ROUTE,
+                record.status_code // 100,
+            )
+            duration = record.duration_ms
+            row = rows.get(key)
+            if row is None:
+                row = rows[key] = {
+                    "bucket_start": key[0],
+                    "method": key[1],
+                    "route": key[2],
+                    "status_class": key[3],
+                    "count": 0,
+                    "duration_sum": 0,
+                    "duration_min": duration,
+                    "duration_max": duration,
+                    **dict.fromkeys(HISTOGRAM_COLUMNS, 0),
+                }
+            row["count"] += 1
+            row["duration_sum"] += duration
+            row["duration_min"] = min(row["duration_min"], duration)
+            row["duration_max"] = max(row["duration_max"], duration)
+            row[HISTOGRAM_COLUMNS[bisect_left(LATENCY_BUCKETS_MS, duration)]] += 1
+
+        # Sorted keys give concurrent writers the same row lock order
+        return [rows[key] for key in sorted(rows)]
+
+    async def apply(self, db: AsyncSession, records: Sequence["AuditRecord"]) -> int:
+        """Merge a batch of audit records into the rollups. Returns rows upserted."""
+        rows = self.aggregate(records)
+        if not rows:
+            return 0
+
+        dialect = db.get_bind().dialect.name
+        if dialect not in _UPSERT:
+            logger.warning(f"Audit rollups are not supported on {dialect}")
+            return 0
+        insert, least, greatest = _UPSERT[dialect]
+
+        table = AuditRollup.__table__
+        stmt = insert(table)
+        excluded = stmt.excluded
+        additive = ("count", "duration_sum") + HISTOGRAM_COLUMNS
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.bucket_start, *(table.c[name] for name in DIMENSIONS)],
+            set_={
+                **{name: table.c[name] + excluded[name] for name in additive},
+                "duration_min": least(table.c.duration_min, excluded["duration_min"]),
+                "duration_max": greatest(table.c.duration_max, excluded["duration_max"]),
+            },
+        )
+        await db.execute(stmt, rows)
+        return len(rows)
+
+    async def get_series(
+        self,
+        db: AsyncSession,
+        from_date: datetime,
+        to_date: datetime,
+        interval_minutes: int = 1,
+        group_by: Sequence[str] = DIMENSIONS,
+        method: Optional[str] = None,
+        route: Optional[str] = None,
+        status_class: Optional[int] = None,
+    ) -> list[dict]:
+        """Return rollup points between two times, re-bucketed to ``interval_minutes``.
+
+        Dimensions not listed in ``group_by`` are merged, e.g. an empty
+        ``group_by`` yields total traffic per interval.
+        """
+        table = AuditRollup.__table__
+        dims = [table.c[name] for name in DIMENSIONS if name in group_by]
+
+        conditions = [
+            table.c.bucket_start >= minute_start(from_date),
+            table.c.bucket_start <= minute_start(to_date),
+        ]
+        if method:
+            conditions.append(table.c.method == method.upper())
+        if route:
+            conditions.append(table.c.route == route)
+        if status_class is not None:
+            conditions.append(table.c.status_class == status_class)
+
+        query = (
+            select(
+                table.c.bucket_start,
+                *dims,
+                func.sum(table.c["count"]).label("count"),
+                func.sum(table.c.duration_sum).label("duration_sum"),
+                func.min(table.c.duration_min).label("duration_min"),
+                func.max(table.c.duration_max).label("duration_max"),
+                *(func.sum(table.c[name]).label(name) for name in HISTOGRAM_COLUMNS),
+            )
+            .where(*conditions)
+            .group_by(table.c.bucket_start, *dims)
+            .order_by(table.c.bucket_start)
+        )
+        result = await db.execute(query)
+
+        points: dict[tuple, dict] = {}
+        for row in result.mappings():
+            bucket = interval_start(row["bucket_start"], interval_minutes)
+            key = (bucket,) + tuple(row[dim.key] for dim in dims)
+            point = points.get(key)
+            if point is None:
+                point = points[key] = {
+                    "bucket_start": bucket,
+                    **{dim.key: row[dim.key] for dim in dims},
+                    "count": 0,
+                    "duration_sum": 0,
+                    "duration_min": row["duration_min"],
+                    "duration_max": row["duration_max"],
+                    "histogram": [0] * len(HISTOGRAM_COLUMNS),
+                }
+            point["count"] += int(row["count"])
+            point["duration_sum"] += int(row["duration_sum"])
+            point["duration_min"] = min(point["duration_min"], row["duration_min"])
+            point["duration_max"] = max(point["duration_max"], row["duration_max"])
+            for i, name in enumerate(HISTOGRAM_COLUMNS):
+                point["histogram"][i] += int(row[name])
+
+        for point in points.values():
+            count, histogram, max_ms = point["count"], point["histogram"], point["duration_max"]
+            point["duration_avg"] = round(point.pop("duration_sum") / count, 3)
+            point["p50"] = histogram_percentile(histogram, count, max_ms, 0.50)
+            point["p95"] = histogram_percentile(histogram, count, max_ms, 0.95)
+            point["p99"] = histogram_percentile(histogram, count, max_ms, 0.99)
+
+        return sorted(
+            points.values(),
+            key=lambda p: (p["bucket_start"],) + tuple(str(p[dim.key]) for dim in dims),
+        )
+
+
+audit_rollup_service = AuditRollupService()
@@ -0,0 +1,232 @@
+"""Disk-backed spool for audit records that could not be written to the database."""
+
+import asyncio
+import json
+import logging
+import os
+import struct
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Sequence
+from uuid import UUID
+
+from app.services.audit_service import AuditRecord
+
+logger = logging.getLogger(__name__)
+
+# Each record is framed as <length:uint32><crc32:uint32><json payload>
+_HEADER = struct.Struct("!II")
+SEGMENT_PREFIX = "audit-"
+SEGMENT_SUFFIX = ".spool"
+# Records the database rejected on replay; kept for inspection, never replayed
+QUARANTINE_NAME = "quarantine.spool"
+
+
+def encode_record(record: AuditRecord) -> bytes:
+    """Serialize a record as a length-prefixed, checksummed frame."""
+    payload = json.dumps(
+        {
+            "request_id": record.request_id,
+            "user_id": str(record.user_id) if record.user_id else None,
+            "method": record.method,
+            "path": record.path,
+            "route": record.route,
+            "status_code": record.status_code,
+            "duration_ms": record.duration_ms,
+            "ip": record.ip,
+            "user_agent": record.user_agent,
+            "request_body": record.request_body,
+            "timings": record.timings,
+            "created_at": record.created_at.isoformat(),
+        },
+        separators=(",", ":"),
+    ).encode("utf-8")
+    return _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_record(payload: bytes) -> AuditRecord:
+    """Deserialize a frame payload produced by ``encode_record``."""
+    data = json.loads(payload)
+    data["user_id"] = UUID(data["user_id"]) if data["user_id"] else None
+    data["created_at"] = datetime.fromisoformat(data["created_at"])
+    return AuditRecord(**data)
+
+
+def read_segment(path: Path) -> tuple[list[AuditRecord], int]:
+    """Read every intact record of a segment. Returns (records, corrupt frames).
+
+    Reading stops at the first torn or corrupt frame; anything after it in
+    the segment cannot be re-synchronized.
+    """
+    records = []
+    data = path.read_bytes()
+    offset = 0
+    while offset < len(data):
+        if offset + _HEADER.size > len(data):
+            return records, 1
+        length, checksum = _HEADER.unpack_from(data, offset)
+        start = offset + _HEADER.size
+        payload = data[start:start + length]
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            return records, 1
+        try:
+            records.append(decode_record(payload))
+        except (ValueError, TypeError, KeyError):
+            return records, 1
+        offset = start + length
+    return records, 0
+
+
+class AuditSpool:
+    """Append-only segment files holding audit records for later replay.
+
+    ``append`` writes a whole batch and fsyncs once, so durability costs one
+    fsync per batch rather than per record. The active segment is rotated
+    at ``segment_max_bytes``; closed segments are replayed oldest first and
+    deleted once their records are committed. Total size is capped at
+    ``max_bytes``; batches that do not fit are dropped and counted.
+    Records the database keeps rejecting are moved to a quarantine file
+    (same frame format, outside the cap) so they cannot block replay.
+    File I/O runs in a worker thread to keep the event loop responsive.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, segment_max_bytes: int):
+        self._directory = Path(directory)
+        self._max_bytes = max_bytes
+        self._segment_max_bytes = segment_max_bytes
+        self._lock = asyncio.Lock()
+        self._initialized = False
+        self._active: Optional[Path] = None
+        self._active_bytes = 0
+        self._next_seq = 1
+        self._bytes = 0
+
+        # Counters
+        self._appended = 0
+        self._replayed = 0
+        self._dropped = 0
+        self._corrupt = 0
+        self._quarantined = 0
+        self._fsyncs = 0
+
+    def _segment_path(self, seq: int) -> Path:
+        return self._directory / f"{SEGMENT_PREFIX}{seq:012d}{SEGMENT_SUFFIX}"
+
+    def _scan(self) -> list[Path]:
+        """Return existing segments in sequence order."""
+        return sorted(self._directory.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"))
+
+    def _ensure_initialized(self) -> None:
+        """Create the directory and pick up segments left by a previous process."""
+        if self._initialized:
+            return
+        self._directory.mkdir(parents=True, exist_ok=True)
+        segments = self._scan()
+        self._bytes = sum(path.stat().st_size for path in segments)
+        if segments:
+            last = segments[-1].name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]
+            self._next_seq = int(last) + 1
+        self._initialized = True
+
+    def _rotate(self) -> None:
+        """Close the active segment; the next append starts a new one."""
+        self._active = None
+        self._active_bytes = 0
+
+    def _write(self, frames: bytes) -> None:
+        """Append frames to the active segment and fsync (blocking)."""
+        if self._active is None or self._active_bytes >= self._segment_max_bytes:
+            self._active = self._segment_path(self._next_seq)
+            self._active_bytes = 0
+            self._next_seq += 1
+        with open(self._active, "ab") as f:
+            f.write(frames)
+            f.flush()
+            os.fsync(f.fileno())
+        self._active_bytes += len(frames)
+        self._bytes += len(frames)
+        self._fsyncs += 1
+
+    async def append(self, records: Sequence[AuditRecord]) -> bool:
+        """Durably append a batch. Returns False if the spool is full."""
+        if not records:
+            return True
+        frames = b"".join(encode_record(record) for record in records)
+        async with self._lock:
+            await asyncio.to_thread(self._ensure_initialized)
+            if self._bytes + len(frames) > self._max_bytes:
+                self._dropped += len(records)
+                logger.error(
+                    f"Audit spool full ({self._bytes} bytes), dropping {len(records)} records"
+                )
+                return False
+            await asyncio.to_thread(self._write, frames)
+        self._appended += len(records)
+        return True
+
+    async def pending(self) -> bool:
+        """Whether any spooled records are waiting to be replayed."""
+        async with self._lock:
+            await asyncio.to_thread(self._ensure_initialized)
+            return self._bytes > 0
+
+    async def next_segment(self) -> Optional[tuple[Path, list[AuditRecord]]]:
+        """Close the active segment if needed and load the oldest segment.
+
+        Returns None when the spool is empty. The segment stays on disk until
+        ``commit_segment`` is called, so a failed replay is retried later.
+        """
+        async with self._lock:
+            await asyncio.to_thread(self._ensure_initialized)
+            segments = await asyncio.to_thread(self._scan)
+            if not segments:
+                return None
+            if segments[0] == self._active:
+                self._rotate()
+            path = segments[0]
+            records, corrupt = await asyncio.to_thread(read_segment, path)
+        if corrupt:
+            self._corrupt += corrupt
+            logger.error(f"Audit spool segment {path.name} is truncated or corrupt")
+        return path, records
+
+    async def commit_segment(self, path: Path, replayed: int) -> None:
+        """Delete a segment whose records have been written to the database."""
+        async with self._lock:
+            size = (await asyncio.to_thread(path.stat)).st_size
+            await asyncio.to_thread(path.unlink)
+            self._bytes = max(self._bytes - size, 0)
+        self._replayed += replayed
+
+    async def quarantine(self, records: Sequence[AuditRecord]) -> None:
+        """Durably append records that cannot be written to the quarantine file."""
+        if not records:
+            return
+        frames = b"".join(encode_record(record) for record in records)
+        async with self._lock:
+            await asyncio.to_thread(self._ensure_initialized)
+            await asyncio.to_thread(self._append_quarantine, frames)
+        self._quarantined += len(records)
+        logger.error(f"Quarantined {len(records)} audit records in {QUARANTINE_NAME}")
+
+    def _append_quarantine(self, frames: bytes) -> None:
+        with open(self._directory / QUARANTINE_NAME, "ab") as f:
+            f.write(frames)
+            f.flush()
+            os.fsync(f.fileno())
+        self._fsyncs += 1
+
+    def stats(self) -> dict:
+        """Return spool counters for monitoring."""
+        return {
+            "directory": str(self._directory),
+            "bytes": self._bytes,
+            "capacity_bytes": self._max_bytes,
+            "appended": self._appended,
+            "replayed": self._replayed,
+            "dropped": self._dropped,
+            "corrupt_segments": self._corrupt,
+            "quarantined": self._quarantined,
+            "fsyncs": self._fsyncs,
+        }
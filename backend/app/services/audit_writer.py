@@ -0,0 +1,337 @@
+"""Background audit log writer."""
+
+import asyncio
+import logging
+import time
+from typing import Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.session import audit_session_maker
+from app.services.audit_service import AuditRecord, audit_service
+from app.services.audit_spool import AuditSpool
+
+logger = logging.getLogger(__name__)
+
+
+class AuditWriter:
+    """In-process audit queue drained by a background task.
+
+    The request path only enqueues an ``AuditRecord``; the writer task
+    collects up to ``batch_size`` records (or whatever arrived within
+    ``flush_interval`` seconds) and writes them in one statement (multi-row
+    INSERT or COPY, see ``AUDIT_INGEST_ENGINE``). When the queue is full new
+    records are dropped and counted rather than slowing down the request.
+
+    If a write fails or exceeds ``write_timeout``, the batch goes to the disk
+    ``spool`` and later batches follow it there until ``replay_spool`` has
+    drained the spool back into the database.
+
+    Users passed to ``forget_user`` have their id cleared from every record
+    this writer still writes, spools or replays.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = audit_session_maker,
+        max_queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        write_timeout: Optional[float] = None,
+        spool: Optional[AuditSpool] = None,
+    ):
+        self._session_factory = session_factory
+        self._max_queue_size = max_queue_size or settings.AUDIT_QUEUE_MAX_SIZE
+        self._batch_size = batch_size or settings.AUDIT_BATCH_MAX_SIZE
+        self._flush_interval = (
+            flush_interval if flush_interval is not None else settings.AUDIT_FLUSH_INTERVAL_SECONDS
+        )
+        self._write_timeout = write_timeout or settings.AUDIT_WRITE_TIMEOUT_SECONDS
+        self._spool = spool
+        self._spooling = False
+        self._queue: asyncio.Queue[AuditRecord] = asyncio.Queue(maxsize=self._max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        # Batch the writer task is collecting or flushing, so stop() never loses it
+        self._batch: list[AuditRecord] = []
+        self._flushing = False
+        self._flush_done = asyncio.Event()
+        self._stopping = False
+        # Erased users whose ids must not reach audit_logs again
+        self._forgotten: set[UUID] = set()
+
+        # Counters
+        self._enqueued = 0
+        self._dropped = 0
+        self._written = 0
+        self._failed = 0
+        self._spooled = 0
+        self._flushes = 0
+        self._flush_ms_total = 0.0
+        self._flush_ms_last = 0.0
+        self._flush_ms_max = 0.0
+
+    @property
+    def running(self) -> bool:
+        """Whether the background task is running."""
+        return self._task is not None and not self._task.done()
+
+    def enqueue(self, record: AuditRecord) -> bool:
+        """Queue a record for writing. Returns False if it was dropped."""
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self._dropped += 1
+            return False
+        self._enqueued += 1
+        return True
+
+    async def forget_user(self, user_id: UUID) -> None:
+        """Clear ``user_id`` from records not yet written (GDPR erasure).
+
+        Waits for a flush already in progress, since its rows may carry the
+        id; anonymizing ``audit_logs`` after this returns catches those.
+        """
+        self._forgotten.add(user_id)
+        if self._flushing:
+            try:
+                await asyncio.wait_for(self._flush_done.wait(), self._write_timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self) -> None:
+        """Start the background writer task."""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run(), name="audit-writer")
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the background task and write everything still queued.
+
+        A flush already in progress gets up to ``timeout`` seconds (the write
+        timeout by default) to finish. If it is still running after that, it
+        is cancelled and its batch spooled, since it may not have committed.
+        """
+        if self._task is not None:
+            self._stopping = True
+            if self._flushing:
+                try:
+                    await asyncio.wait_for(
+                        self._flush_done.wait(),
+                        self._write_timeout if timeout is None else timeout,
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning("Audit flush still running at shutdown; spooling its batch")
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._stopping = False
+
+        # Records the task had taken off the queue but not written
+        leftover, self._batch = self._batch, []
+        if self._flushing:
+            self._flushing = False
+            await self._spool_batch(leftover)
+            leftover = []
+
+        while leftover or not self._queue.empty():
+            batch, leftover = leftover[: self._batch_size], leftover[self._batch_size:]
+            while len(batch) < self._batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await self._flush(batch)
+
+    def stats(self) -> dict:
+        """Return writer counters for monitoring."""
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._max_queue_size,
+            "enqueued": self._enqueued,
+            "dropped": self._dropped,
+            "written": self._written,
+            "failed": self._failed,
+            "spooled": self._spooled,
+            "spooling": self._spooling,
+            "flushes": self._flushes,
+            "flush_ms_last": round(self._flush_ms_last, 3),
+            "flush_ms_max": round(self._flush_ms_max, 3),
+            "flush_ms_avg": (
+                round(self._flush_ms_total / self._flushes, 3) if self._flushes else 0.0
+            ),
+        }
+
+    async def _run(self) -> None:
+        """Drain the queue until cancelled or stopping."""
+        while True:
+            self._batch = batch = []
+            await self._collect_batch(batch)
+            if self._stopping:
+                # stop() writes this batch along with the rest of the queue
+                return
+            self._flushing = True
+            self._flush_done.clear()
+            await self._flush(batch)
+            self._flushing = False
+            self._flush_done.set()
+            self._batch = []
+
+    async def _collect_batch(self, batch: list[AuditRecord]) -> None:
+        """Wait for the first record, then gather more until the batch is full or times out."""
+        loop = asyncio.get_running_loop()
+        batch.append(await self._queue.get())
+        deadline = loop.time() + self._flush_interval
+
+        while len(batch) < self._batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+    async def _flush(self, batch: list[AuditRecord]) -> None:
+        """Write a batch of records in a single transaction, or spool it."""
+        if not batch:
+            return
+
+        self._scrub(batch)
+        if self._spooling:
+            await self._spool_batch(batch)
+            return
+
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._write(batch), self._write_timeout)
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} audit records: {e!r}")
+            await self._spool_batch(batch)
+            return
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._written += len(batch)
+        self._flushes += 1
+        self._flush_ms_total += elapsed_ms
+        self._flush_ms_last = elapsed_ms
+        self._flush_ms_max = max(self._flush_ms_max, elapsed_ms)
+
+    async def _write(self, batch: Sequence[AuditRecord]) -> None:
+        """Insert records and commit in a fresh session."""
+        async with self._session_factory() as db:
+            await audit_service.write_batch(db, batch)
+            await db.commit()
+
+    def _scrub(self, records: Sequence[AuditRecord]) -> None:
+        """Clear the ids of forgotten users."""
+        if not self._forgotten:
+            return
+        for record in records:
+            if record.user_id in self._forgotten:
+                record.user_id = None
+
+    async def _spool_batch(self, batch: list[AuditRecord]) -> None:
+        """Divert a batch to the disk spool (counted as failed without one)."""
+        self._scrub(batch)
+        if self._spool is None:
+            self._failed += len(batch)
+            return
+        try:
+            spooled = await self._spool.append(batch)
+        except OSError as e:
+            logger.error(f"Failed to spool {len(batch)} audit records: {e!r}")
+            spooled = False
+        if not spooled:
+            self._failed += len(batch)
+            return
+        self._spooling = True
+        self._spooled += len(batch)
+
+    async def replay_spool(self) -> int:
+        """Write spooled segments back to the database, oldest first.
+
+        Each segment is committed in one transaction and deleted afterwards,
+        so a crash in between replays it again (at-least-once). If a segment
+        fails while the database is reachable, it is written row by row and
+        the rows still rejected are quarantined, so one bad record cannot
+        block the spool. Direct writes resume once the spool is empty.
+        Returns the number of records replayed.
+        """
+        if self._spool is None:
+            return 0
+
+        replayed = 0
+        while True:
+            segment = await self._spool.next_segment()
+            if segment is None:
+                break
+            path, records = segment
+            self._scrub(records)
+            # A segment holds many batches; allow a batch's timeout for each
+            timeout = self._write_timeout * max(1, len(records) // self._batch_size)
+            try:
+                if records:
+                    await asyncio.wait_for(self._write(records), timeout)
+            except Exception as e:
+                if not await self._database_available():
+                    logger.warning(f"Audit spool replay deferred: {e!r}")
+                    return replayed
+                logger.warning(f"Audit spool segment {path.name} rejected, retrying per row: {e!r}")
+                rejected = await self._write_rows(records)
+                await self._spool.quarantine(rejected)
+                written = len(records) - len(rejected)
+            else:
+                written = len(records)
+            await self._spool.commit_segment(path, written)
+            replayed += written
+
+        if replayed:
+            logger.info(f"Replayed {replayed} spooled audit records")
+        self._spooling = False
+        return replayed
+
+    async def _database_available(self) -> bool:
+        """Whether the audit database answers a trivial query."""
+        try:
+            async with self._session_factory() as db:
+                await asyncio.wait_for(db.execute(text("SELECT 1")), self._write_timeout)
+        except Exception:
+            return False
+        return True
+
+    async def _write_rows(self, records: Sequence[AuditRecord]) -> list[AuditRecord]:
+        """Write records one per transaction. Returns the records that failed."""
+        rejected = []
+        for record in records:
+            try:
+                await asyncio.wait_for(self._write([record]), self._write_timeout)
+            except Exception as e:
+                logger.error(f"Audit record {record.request_id} rejected: {e!r}")
+                rejected.append(record)
+        return rejected
+
+    def spool_stats(self) -> Optional[dict]:
+        """Return spool counters, or None when spooling is disabled."""
+        return self._spool.stats() if self._spool else None
+
+
+def _default_spool() -> Optional[AuditSpool]:
+    if not settings.AUDIT_SPOOL_DIR:
+        return None
+    return AuditSpool(
+        settings.AUDIT_SPOOL_DIR,
+        max_bytes=settings.AUDIT_SPOOL_MAX_BYTES,
+        segment_max_bytes=settings.AUDIT_SPOOL_SEGMENT_BYTES,
+    )
+
+
+audit_writer = AuditWriter(spool=_default_spool())
@@ -1,21 +1,47 @@
 """Authentication service."""
 
+import asyncio
+import logging
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import func, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.security import get_password_hash, verify_password
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.security import (
+    create_access_token,
+    decode_access_token,
+    get_password_hash_async,
+    hash_refresh_token,
+    needs_rehash,
+    password_hasher,
+    verify_password_async,
+)
+from app.db.session import async_session_maker
 from app.models.refresh_token import RefreshToken
 from app.models.user import User
+from app.services.audit_service import audit_service
+from app.services.audit_writer import audit_writer
+from app.services.principal_cache import Principal, principal_cache
+from app.services.token_epoch_service import token_epoch_service
+
+logger = logging.getLogger(__name__)
 
 
 class AuthService:
     """Service for authentication operations."""
 
+    def __init__(self):
+        # Background rehash tasks, keyed by user
+        self._rehashing: dict[UUID, asyncio.Task] = {}
+
+        # Counters
+        self._rehashed = 0
+        self._rehash_failures = 0
+
     async def authenticate(
         self, db: AsyncSession, email: str, password: str
     ) -> Optional[User]:
@@ -27,13 +53,67 @@ class AuthService:
             return None
         if not user.password_hash:
             return None
-        if not verify_password(password, user.password_hash):
+        if not await verify_password_async(password, user.password_hash):
             return None
         if not user.is_active:
             return None
 
+        if needs_rehash(user.password_hash):
+            self._schedule_rehash(user.id, password, user.password_hash)
         return user
 
+    def _schedule_rehash(self, user_id: UUID, password: str, old_hash: str) -> None:
+        """Upgrade a hash to the current ``BCRYPT_ROUNDS`` without delaying the login."""
+        if user_id in self._rehashing:
+            return
+        task = asyncio.create_task(self._rehash_password(user_id, password, old_hash))
+        self._rehashing[user_id] = task
+        task.add_done_callback(lambda _: self._rehashing.pop(user_id, None))
+
+    async def _rehash_password(self, user_id: UUID, password: str, old_hash: str) -> None:
+        """Replace ``old_hash``, unless the password changed in the meantime."""
+        try:
+            new_hash = await password_hasher.hash(password)
+            async with async_session_maker() as db:
+                result = await db.execute(
+                    update(User)
+                    .where(User.id == user_id, User.password_hash == old_hash)
+                    .values(password_hash=new_hash)
+                )
+                await db.commit()
+            if result.rowcount:
+                self._rehashed += 1
+                logger.info(
+                    f"Rehashed password for user {user_id} at cost {settings.BCRYPT_ROUNDS}"
+                )
+        except Exception as e:
+            self._rehash_failures += 1
+            logger.warning(f"Failed to rehash password for user {user_id}: {e}")
+
+    def rehash_stats(self) -> dict:
+        """Return rehash-on-login counters for monitoring."""
+        return {
+            "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+            "in_progress": len(self._rehashing),
+            "rehashed": self._rehashed,
+            "failures": self._rehash_failures,
+        }
+
+    async def issue_access_token(self, db: AsyncSession, user: User) -> str:
+        """Create an access token for a user.
+
+        With ``STATELESS_ACCESS_TOKENS`` the token embeds is_admin, is_active
+        and the user's current token epoch.
+        """
+        if not settings.STATELESS_ACCESS_TOKENS:
+            return create_access_token(user.id)
+        claims = {
+            "is_admin": user.is_admin,
+            "is_active": user.is_active,
+            "token_epoch": await token_epoch_service.current(db, user.id),
+        }
+        return create_access_token(user.id, claims=claims)
+
     async def get_user_by_email(
         self, db: AsyncSession, email: str
     ) -> Optional[User]:
@@ -48,13 +128,64 @@ class AuthService:
         result = await db.execute(select(User).where(User.id == user_id))
         return result.scalar_one_or_none()
 
+    async def introspect_tokens(self, db: AsyncSession, tokens: list[str]) -> list[dict]:
+        """Check access tokens for other services. Returns one result per token.
+
+        Each token is verified with ``decode_access_token``; the distinct
+        users not in the principal cache are then loaded with a single
+        ``WHERE id IN (...)`` query. A token is active if it verifies, has
+        not been revoked by a token epoch and belongs to an active user.
+        """
+        payloads: list[Optional[dict]] = []
+        principals: dict[UUID, Optional[Principal]] = {}
+        for token in tokens:
+            payload = decode_access_token(token)
+            try:
+                user_id = UUID(payload["sub"]) if payload else None
+            except (KeyError, TypeError, ValueError):
+                user_id = None
+            if user_id is None or (
+                "token_epoch" in payload
+                and token_epoch_service.ready
+                and not token_epoch_service.is_current(user_id, payload["token_epoch"])
+            ):
+                payloads.append(None)
+                continue
+            payloads.append(payload)
+            if user_id not in principals:
+                principals[user_id] = principal_cache.get(user_id)
+
+        missing = [user_id for user_id, principal in principals.items() if principal is None]
+        if missing:
+            result = await db.execute(select(User).where(User.id.in_(missing)))
+            for user in result.scalars():
+                principal = Principal.from_user(user)
+                principal_cache.put(principal)
+                principals[user.id] = principal
+
+        results = []
+        for payload in payloads:
+            principal = principals.get(UUID(payload["sub"])) if payload else None
+            if principal is None or not principal.is_active:
+                results.append({"active": False})
+                continue
+            results.append(
+                {
+                    "active": True,
+                    "sub": payload["sub"],
+                    "is_admin": principal.is_admin,
+                    "exp": payload.get("exp"),
+                }
+            )
+        return results
+
     async def create_user(
         self, db: AsyncSession, email: str, password: str, is_admin: bool = False
     ) -> User:
         """Create a new user."""
         user = User(
             email=email,
-            password_hash=get_password_hash(password),
+            password_hash=await get_password_hash_async(password),
             is_admin=is_admin,
         )
         db.add(user)
@@ -72,11 +203,13 @@ class AuthService:
             if not existing.is_admin:
                 existing.is_admin = True
                 await db.flush()
+                await token_epoch_service.bump(db, existing.id)
+                principal_cache.invalidate(existing.id)
             return existing
 
         user = User(
             email=email,
-            password_hash=get_password_hash(password),
+            password_hash=await get_password_hash_async(password),
             is_admin=True,
         )
         db.add(user)
@@ -85,40 +218,62 @@ class AuthService:
         return user
 
     async def update_user(
-        self, db: AsyncSession, user_id: UUID, is_active: Optional[bool] = None, is_admin: Optional[bool] = None
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        is_active: Optional[bool] = None,
+        is_admin: Optional[bool] = None,
     ) -> Optional[User]:
         """Update user attributes."""
         user = await self.get_user_by_id(db, user_id)
         if not user:
             return None
 
+        # Deactivation and role changes revoke stateless access tokens
+        revoke = (is_active is False and user.is_active) or (
+            is_admin is not None and is_admin != user.is_admin
+        )
         if is_active is not None:
             user.is_active = is_active
         if is_admin is not None:
             user.is_admin = is_admin
 
         await db.flush()
+        if revoke:
+            await token_epoch_service.bump(db, user_id)
+        principal_cache.invalidate(user_id)
         await db.refresh(user)
         return user
 
     async def get_all_users(
-        self, db: AsyncSession, page: int = 1, limit: int = 50
-    ) -> tuple[list[User], int]:
-        """Get all users with pagination."""
-        from sqlalchemy import func
+        self, db: AsyncSession, page: int = 1, limit: int = 50, cursor: Optional[str] = None
+    ) -> tuple[list[User], int, Optional[str]]:
+        """Get all users with page or cursor (keyset) pagination.
 
+        Returns (users, total, next_cursor).
+        """
         # Count total
         count_result = await db.execute(select(func.count(User.id)))
         total = count_result.scalar() or 0
 
-        # Get users
-        offset = (page - 1) * limit
-        result = await db.execute(
-            select(User).order_by(User.created_at.desc()).offset(offset).limit(limit)
-        )
+        # Get users (one extra row to detect a next page)
+        query = select(User).order_by(User.created_at.desc(), User.id.desc())
+        if cursor:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+            query = query.where(
+                tuple_(User.created_at, User.id) < tuple_(cursor_created_at, cursor_id)
+            )
+        else:
+            query = query.offset((page - 1) * limit)
+        result = await db.execute(query.limit(limit + 1))
         users = list(result.scalars().all())
 
-        return users, total
+        next_cursor = None
+        if len(users) > limit:
+            users = users[:limit]
+            next_cursor = encode_cursor(users[-1].created_at, users[-1].id)
+
+        return users, total, next_cursor
 
     async def create_user_oauth(
         self, db: AsyncSession, email: str
@@ -142,7 +297,7 @@ class AuthService:
         )
         refresh_token = RefreshToken(
             user_id=user_id,
-            token=token,
+            token_digest=hash_refresh_token(token),
             expires_at=expires_at,
         )
         db.add(refresh_token)
@@ -154,7 +309,7 @@ class AuthService:
     ) -> Optional[RefreshToken]:
         """Get refresh token by token string."""
         result = await db.execute(
-            select(RefreshToken).where(RefreshToken.token == token)
+            select(RefreshToken).where(RefreshToken.token_digest == hash_refresh_token(token))
         )
         return result.scalar_one_or_none()
 
@@ -179,10 +334,7 @@ class AuthService:
         self, db: AsyncSession, token: str
     ) -> None:
         """Revoke (delete) a refresh token."""
-        result = await db.execute(
-            select(RefreshToken).where(RefreshToken.token == token)
-        )
-        refresh_token = result.scalar_one_or_none()
+        refresh_token = await self.get_refresh_token(db, token)
         if refresh_token:
             await db.delete(refresh_token)
             await db.flush()
@@ -198,29 +350,27 @@ class AuthService:
         for token in tokens:
             await db.delete(token)
         await db.flush()
+        await token_epoch_service.bump(db, user_id)
+        principal_cache.invalidate(user_id)
 
-    async def delete_user(self, db: AsyncSession, user_id: UUID) -> None:
-        """Delete a user and all associated data (GDPR compliance)."""
-        from app.models.audit_log import AuditLog
+    async def delete_user(self, db: AsyncSession, user_id: UUID, audit_db: AsyncSession) -> None:
+        """Delete a user and all associated data (GDPR compliance).
+
+        Audit logs are kept but anonymized, through ``audit_db`` since they
+        may live in a separate database (``AUDIT_DATABASE_URL``). Records
+        still queued or spooled by the audit writer are anonymized too.
+        """
         from app.models.auth_code import AuthCode
         from app.models.demo_item import DemoItem
 
-        # Delete audit logs (anonymize instead of delete if needed for compliance)
-        await db.execute(
-            select(AuditLog).where(AuditLog.user_id == user_id)
-        )
-        # Option: anonymize instead of delete
-        # For now, we set user_id to NULL to anonymize
-        from sqlalchemy import update
-        await db.execute(
-            update(AuditLog).where(AuditLog.user_id == user_id).values(user_id=None)
-        )
+        # No foreign key ties audit rows to users; this is what detaches them.
+        # Forget first so nothing written afterwards re-attaches the id.
+        await audit_writer.forget_user(user_id)
+        await audit_service.anonymize_user(audit_db, user_id)
 
         # Delete auth codes
         result = await db.execute(
-            select(AuthCode).where(AuthCode.email == (
-                select(User.email).where(User.id == user_id).scalar_subquery()
-            ))
+            select(AuthCode).where(AuthCode.user_id == user_id)
         )
         codes = result.scalars().all()
         for code in codes:
@@ -239,10 +389,17 @@ class AuthService:
         if user:
             await db.delete(user)
             await db.flush()
+        # The epoch row outlives the user and keeps its tokens revoked
+        await token_epoch_service.bump(db, user_id)
+        principal_cache.invalidate(user_id)
 
-    async def export_user_data(self, db: AsyncSession, user_id: UUID) -> dict:
-        """Export all user data (GDPR data portability)."""
-        from app.models.audit_log import AuditLog
+    async def export_user_data(
+        self, db: AsyncSession, user_id: UUID, audit_db: AsyncSession
+    ) -> dict:
+        """Export all user data (GDPR data portability).
+
+        Activity logs are read through ``audit_db`` (see ``delete_user``).
+        """
         from app.models.demo_item import DemoItem
 
         user = await self.get_user_by_id(db, user_id)
@@ -256,10 +413,7 @@ class AuthService:
         items = result.scalars().all()
 
         # Get user's audit logs
-        result = await db.execute(
-            select(AuditLog).where(AuditLog.user_id == user_id).order_by(AuditLog.created_at.desc()).limit(1000)
-        )
-        logs = result.scalars().all()
+        logs = await audit_service.user_activity(audit_db, user_id)
 
         return {
             "user": {
@@ -0,0 +1,127 @@
+"""In-process cache of authenticated principals."""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.models.user import User
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Immutable snapshot of the user fields needed to authorize a request.
+
+    Principals built from stateless token claims carry no profile fields
+    (``email`` and ``created_at`` are None).
+    """
+
+    id: UUID
+    is_active: bool
+    is_admin: bool
+    email: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        """Snapshot a loaded user."""
+        return cls(
+            id=user.id,
+            email=user.email,
+            is_active=user.is_active,
+            is_admin=user.is_admin,
+            created_at=user.created_at,
+        )
+
+    @classmethod
+    def from_claims(cls, user_id: UUID, payload: dict) -> "Principal":
+        """Build a principal from verified stateless access-token claims."""
+        return cls(
+            id=user_id,
+            is_active=bool(payload.get("is_active")),
+            is_admin=bool(payload.get("is_admin")),
+        )
+
+
+class PrincipalCache:
+    """LRU cache of principals with a TTL, keyed by user ID.
+
+    Saves the ``users`` lookup on authenticated requests. Changes made
+    through ``AuthService`` invalidate the entry in this process; other
+    workers see a deactivation or role change after at most ``ttl``
+    seconds (``PRINCIPAL_CACHE_TTL_SECONDS``, 0 disables the cache).
+    Only active users are cached.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self._max_size = max_size
+        self._ttl = ttl
+        # user_id -> (expires_at monotonic, principal), least recently used first
+        self._entries: OrderedDict[UUID, tuple[float, Principal]] = OrderedDict()
+
+        # Counters
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether entries are cached at all."""
+        return self._ttl > 0 and self._max_size > 0
+
+    def get(self, user_id: UUID) -> Optional[Principal]:
+        """Return the cached principal, or None if missing or expired."""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self._misses += 1
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[user_id]
+            self._misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self._hits += 1
+        return entry[1]
+
+    def put(self, principal: Principal) -> None:
+        """Cache an active principal, evicting the least recently used entry if full."""
+        if not self.enabled or not principal.is_active:
+            return
+        self._entries[principal.id] = (time.monotonic() + self._ttl, principal)
+        self._entries.move_to_end(principal.id)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def invalidate(self, user_id: UUID) -> None:
+        """Drop a user's entry after a change to the user."""
+        if self._entries.pop(user_id, None) is not None:
+            self._invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return cache counters for monitoring."""
+        lookups = self._hits + self._misses
+        return {
+            "size": len(self._entries),
+            "max_size": self._max_size,
+            "ttl_seconds": self._ttl,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+            "evictions": self._evictions,
+            "invalidations": self._invalidations,
+        }
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,199 @@
+"""Batched retention purges for audit logs, auth codes and refresh tokens."""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import delete, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import async_session_maker, audit_session_maker
+from app.models.audit_log import AuditLog
+from app.models.auth_code import AuthCode
+from app.models.refresh_token import RefreshToken
+from app.services.audit_partition_service import audit_partition_service
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """What to purge from one table.
+
+    ``condition(now)`` selects expired rows, or returns None when retention
+    is disabled. ``keyset`` is the indexed column walked in batches; the
+    table's ``id`` breaks ties. ``audit_db`` tables live in the audit database.
+    ``partitioned`` tables are skipped when PostgreSQL partitions them, since
+    dropping whole partitions enforces their retention.
+    """
+
+    name: str
+    model: type
+    keyset: object
+    condition: Callable[[datetime], Optional[object]]
+    audit_db: bool = False
+    partitioned: bool = False
+
+
+@dataclass
+class RetentionResult:
+    """Outcome of purging one table."""
+
+    table: str
+    dry_run: bool
+    rows: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+    enabled: bool = True
+    partitioned: bool = False
+
+
+def _audit_condition(now: datetime):
+    if settings.AUDIT_RETENTION_DAYS <= 0:
+        return None
+    return AuditLog.created_at < now - timedelta(days=settings.AUDIT_RETENTION_DAYS)
+
+
+def _auth_code_condition(now: datetime):
+    # Codes live for minutes; keep used or expired ones for a short grace period
+    cutoff = now - timedelta(days=settings.AUTH_CODE_RETENTION_DAYS)
+    return (AuthCode.created_at < cutoff) & or_(
+        AuthCode.is_used.is_(True), AuthCode.expires_at < now
+    )
+
+
+def _refresh_token_condition(now: datetime):
+    return RefreshToken.expires_at < now - timedelta(days=settings.REFRESH_TOKEN_RETENTION_DAYS)
+
+
+RETENTION_POLICIES = {
+    "audit_logs": RetentionPolicy(
+        "audit_logs",
+        AuditLog,
+        AuditLog.created_at,
+        _audit_condition,
+        audit_db=True,
+        partitioned=True,
+    ),
+    "auth_codes": RetentionPolicy(
+        "auth_codes", AuthCode, AuthCode.created_at, _auth_code_condition
+    ),
+    "refresh_tokens": RetentionPolicy(
+        "refresh_tokens", RefreshToken, RefreshToken.expires_at, _refresh_token_condition
+    ),
+}
+
+
+class RetentionService:
+    """Deletes expired rows in small keyset-driven batches.
+
+    Each batch selects the next ``batch_size`` expired keys after the last
+    one seen (an index range scan, no OFFSET), deletes them in its own short
+    transaction and then sleeps, so no long locks are held and replicas can
+    keep up. With ``dry_run`` the same walk only counts rows.
+
+    A partitioned audit_logs is left to ``AuditPartitionService``, which
+    drops expired partitions (the legacy one included) instead of deleting
+    row by row; the batched delete only runs on unpartitioned databases.
+    """
+
+    async def purge(
+        self,
+        db: AsyncSession,
+        policy: RetentionPolicy,
+        now: Optional[datetime] = None,
+        dry_run: bool = False,
+        batch_size: Optional[int] = None,
+        sleep_seconds: Optional[float] = None,
+        progress: Optional[Callable[[RetentionResult], None]] = None,
+    ) -> RetentionResult:
+        """Purge one table. Commits after every batch unless ``dry_run``."""
+        now = now or datetime.now(timezone.utc)
+        batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+        sleep_seconds = (
+            settings.RETENTION_BATCH_SLEEP_SECONDS if sleep_seconds is None else sleep_seconds
+        )
+        result = RetentionResult(table=policy.name, dry_run=dry_run)
+
+        condition = policy.condition(now)
+        if condition is None:
+            result.enabled = False
+            return result
+        if policy.partitioned and await audit_partition_service.is_partitioned(db):
+            result.partitioned = True
+            return result
+
+        id_column = policy.model.id
+        start = time.perf_counter()
+        last: Optional[tuple] = None
+        while True:
+            query = (
+                select(policy.keyset, id_column)
+                .where(condition)
+                .order_by(policy.keyset, id_column)
+                .limit(batch_size)
+            )
+            if last is not None:
+                query = query.where(tuple_(policy.keyset, id_column) > tuple_(*last))
+            rows = (await db.execute(query)).all()
+            if not rows:
+                break
+
+            if not dry_run:
+                # The keyset bound lets PostgreSQL prune audit_logs partitions
+                await db.execute(
+                    delete(policy.model)
+                    .where(id_column.in_([row[1] for row in rows]))
+                    .where(policy.keyset <= rows[-1][0])
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+
+            last = tuple(rows[-1])
+            result.rows += len(rows)
+            result.batches += 1
+            result.elapsed_seconds = time.perf_counter() - start
+            if progress:
+                progress(result)
+
+            if len(rows) < batch_size:
+                break
+            if sleep_seconds:
+                await asyncio.sleep(sleep_seconds)
+
+        if dry_run:
+            await db.rollback()
+        result.elapsed_seconds = time.perf_counter() - start
+        return result
+
+    async def run(
+        self,
+        tables: Optional[list[str]] = None,
+        dry_run: bool = False,
+        progress: Optional[Callable[[RetentionResult], None]] = None,
+        **options,
+    ) -> list[RetentionResult]:
+        """Purge the given tables (all by default), one session per table."""
+        results = []
+        for name in tables or RETENTION_POLICIES:
+            policy = RETENTION_POLICIES[name]
+            session_factory = audit_session_maker if policy.audit_db else async_session_maker
+            async with session_factory() as db:
+                result = await self.purge(
+                    db, policy, dry_run=dry_run, progress=progress, **options
+                )
+            if result.rows:
+                action = "Would delete" if dry_run else "Deleted"
+                logger.info(
+                    f"{action} {result.rows} rows from {name} in {result.batches} batches "
+                    f"({result.elapsed_seconds:.1f}s)"
+                )
+            results.append(result)
+        return results
+
+
+retention_service = RetentionService()
@@ -0,0 +1,123 @@
+"""Revocation epochs for stateless access tokens."""
+
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import async_session_maker
+from app.models.token_epoch import UserTokenEpoch
+
+logger = logging.getLogger(__name__)
+
+# Rows changed this long before the last seen change are re-read on every
+# refresh, covering commit order and clock skew between workers
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+_INSERT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+class TokenEpochService:
+    """In-memory map of user -> token epoch, refreshed from user_token_epochs.
+
+    A stateless access token is valid only while its ``token_epoch`` claim
+    is at least the user's current epoch. Bumps made in this process apply
+    immediately; other workers pick them up on their next ``refresh``
+    (every ``TOKEN_EPOCH_REFRESH_SECONDS``), which reads only rows changed
+    since the previous one.
+    """
+
+    def __init__(self):
+        self._epochs: dict[UUID, int] = {}
+        self._watermark: Optional[datetime] = None
+        self._loaded = False
+
+        # Counters
+        self._refreshes = 0
+        self._bumps = 0
+        self._last_refresh: Optional[float] = None  # monotonic
+
+    @property
+    def ready(self) -> bool:
+        """Whether the map has been loaded at least once."""
+        return self._loaded
+
+    def _apply(self, user_id: UUID, epoch: int) -> None:
+        # Epochs only move forward
+        if epoch > self._epochs.get(user_id, 0):
+            self._epochs[user_id] = epoch
+
+    def is_current(self, user_id: UUID, token_epoch: int) -> bool:
+        """Whether a token issued at ``token_epoch`` has not been revoked."""
+        return token_epoch >= self._epochs.get(user_id, 0)
+
+    async def load(self, db: AsyncSession) -> int:
+        """Merge epochs changed since the last load. Returns rows read."""
+        query = select(UserTokenEpoch.user_id, UserTokenEpoch.epoch, UserTokenEpoch.updated_at)
+        if self._watermark is not None:
+            query = query.where(UserTokenEpoch.updated_at >= self._watermark - REFRESH_OVERLAP)
+        rows = (await db.execute(query)).all()
+
+        for user_id, epoch, updated_at in rows:
+            self._apply(user_id, epoch)
+            if self._watermark is None or updated_at > self._watermark:
+                self._watermark = updated_at
+        self._loaded = True
+        self._refreshes += 1
+        self._last_refresh = time.monotonic()
+        return len(rows)
+
+    async def refresh(self) -> int:
+        """Periodic task: reload changed epochs in a session of its own."""
+        async with async_session_maker() as db:
+            return await self.load(db)
+
+    async def current(self, db: AsyncSession, user_id: UUID) -> int:
+        """Return the epoch to embed in a newly issued token."""
+        epoch = await db.scalar(
+            select(UserTokenEpoch.epoch).where(UserTokenEpoch.user_id == user_id)
+        )
+        if epoch:
+            self._apply(user_id, epoch)
+        return self._epochs.get(user_id, 0)
+
+    async def bump(self, db: AsyncSession, user_id: UUID) -> int:
+        """Revoke every token issued so far for a user. Returns the new epoch.
+
+        The local map is updated right away; should the transaction roll
+        back, this process merely keeps rejecting tokens it would have accepted.
+        """
+        insert = _INSERT[db.get_bind().dialect.name]
+        table = UserTokenEpoch.__table__
+        now = datetime.now(timezone.utc)
+        stmt = insert(table).values(user_id=user_id, epoch=1, updated_at=now)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={"epoch": table.c.epoch + 1, "updated_at": now},
+        ).returning(table.c.epoch)
+        epoch = (await db.execute(stmt)).scalar_one()
+        self._apply(user_id, epoch)
+        self._bumps += 1
+        return epoch
+
+    def stats(self) -> dict:
+        """Return epoch map counters for monitoring."""
+        return {
+            "ready": self._loaded,
+            "users": len(self._epochs),
+            "refreshes": self._refreshes,
+            "bumps": self._bumps,
+            "seconds_since_refresh": (
+                round(time.monotonic() - self._last_refresh, 1)
+                if self._last_refresh is not None
+                else None
+            ),
+        }
+
+
+token_epoch_service = TokenEpochService()
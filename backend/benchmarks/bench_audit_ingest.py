@@ -0,0 +1,75 @@
+"""Audit ingestion throughput: ORM db.add vs. multi-row INSERT vs. COPY.
+
+Usage (from backend/):
+    python -m benchmarks.bench_audit_ingest [--url URL] [--rows 50000] [--batch 500]
+
+Defaults to DATABASE_URL. Rows are written with request_id "bench-*" and
+deleted afterwards. On databases other than PostgreSQL + asyncpg the "copy"
+engine runs its executemany INSERT fallback.
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.db.base import Base
+from app.models import AuditLog
+from app.services.audit_service import AuditRecord, audit_service
+
+ENGINES = ("orm", "insert", "copy")
+
+
+def make_records(count: int, engine: str) -> list[AuditRecord]:
+    return [
+        AuditRecord(
+            request_id=f"bench-{engine}",
+            user_id=None,
+            method="GET",
+            path=f"/api/v1/demo/items/{i}",
+            status_code=200,
+            duration_ms=i % 250,
+            ip="10.0.0.1",
+            user_agent="bench",
+        )
+        for i in range(count)
+    ]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=settings.DATABASE_URL)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.url)
+    if engine.dialect.name == "sqlite":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    for name in ENGINES:
+        records = make_records(args.rows, name)
+        start = time.perf_counter()
+        for offset in range(0, len(records), args.batch):
+            async with session_factory() as db:
+                await audit_service.write_batch(
+                    db, records[offset : offset + args.batch], engine=name
+                )
+                await db.commit()
+        elapsed = time.perf_counter() - start
+        print(f"{name:<8} rows/s={args.rows / elapsed:10.0f}  total={elapsed:7.2f}s")
+
+        async with session_factory() as db:
+            await db.execute(delete(AuditLog).where(AuditLog.request_id == f"bench-{name}"))
+            await db.commit()
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
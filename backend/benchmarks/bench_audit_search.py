@@ -0,0 +1,90 @@
+"""Substring search on audit paths: sequential scan vs. pg_trgm GIN index.
+
+Usage (from backend/):
+    python -m benchmarks.bench_audit_search [--url URL] [--rows 3000000]
+
+PostgreSQL only. Builds a scratch table with synthetic paths (left in place
+between runs unless --drop is given), times ILIKE '%...%' queries with and
+without a trigram index and prints the speedup. audit_logs is not touched.
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+
+TABLE = "bench_audit_search"
+QUERIES = ("items/4242", "settings", "export?format=csv", "zz9")
+
+
+async def timed(conn, term: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await conn.execute(
+            text(f"SELECT count(*) FROM {TABLE} WHERE path ILIKE :pattern"),
+            {"pattern": f"%{term}%"},
+        )
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=settings.DATABASE_URL)
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--drop", action="store_true", help="drop the scratch table afterwards")
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.url)
+    async with engine.connect() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        await conn.execute(text(f"CREATE TABLE {TABLE} (id bigint PRIMARY KEY, path text)"))
+        start = time.perf_counter()
+        await conn.execute(
+            text(
+                f"INSERT INTO {TABLE} "
+                "SELECT g, (ARRAY['/api/v1/demo/items/', '/api/v1/admin/users/', "
+                "'/api/v1/auth/settings/', '/api/v1/admin/audit-logs/export?format=csv&page='])"
+                "[1 + g % 4] || (g % 100000)::text || '/' || md5(g::text) "
+                "FROM generate_series(1, :rows) AS g"
+            ),
+            {"rows": args.rows},
+        )
+        await conn.execute(text(f"ANALYZE {TABLE}"))
+        await conn.commit()
+        print(f"loaded {args.rows} rows in {time.perf_counter() - start:.1f}s")
+
+        before = {term: await timed(conn, term, args.repeat) for term in QUERIES}
+
+        start = time.perf_counter()
+        await conn.execute(
+            text(f"CREATE INDEX {TABLE}_path_trgm ON {TABLE} USING gin (path gin_trgm_ops)")
+        )
+        await conn.execute(text(f"ANALYZE {TABLE}"))
+        await conn.commit()
+        print(f"built trigram index in {time.perf_counter() - start:.1f}s")
+
+        after = {term: await timed(conn, term, args.repeat) for term in QUERIES}
+
+        for term in QUERIES:
+            print(
+                f"{term!r:<22} seq={before[term]:9.1f}ms  trgm={after[term]:9.1f}ms  "
+                f"speedup={before[term] / after[term]:6.1f}x"
+            )
+
+        if args.drop:
+            await conn.execute(text(f"DROP TABLE {TABLE}"))
+            await conn.commit()
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,122 @@
+"""Request latency: BaseHTTPMiddleware stack vs. pure ASGI audit middleware.
+
+Usage (from backend/):
+    python -m benchmarks.bench_middleware [--requests 5000] [--concurrency 50]
+
+Both variants run in-process over httpx's ASGI transport against a trivial
+endpoint, so the numbers isolate middleware overhead. Audit records go to
+a private in-memory writer queue; nothing touches the database.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+
+import app.middleware.audit as audit_module
+from app.middleware.audit import AuditMiddleware
+from app.services.audit_service import AuditRecord
+from app.services.audit_writer import AuditWriter
+
+
+class LegacyRequestIdMiddleware(BaseHTTPMiddleware):
+    """The previous BaseHTTPMiddleware request ID implementation."""
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        request_id = str(uuid.uuid4())
+        request.state.request_id = request_id
+        response = await call_next(request)
+        response.headers["X-Request-Id"] = request_id
+        return response
+
+
+class LegacyAuditMiddleware(BaseHTTPMiddleware):
+    """The previous BaseHTTPMiddleware audit implementation (enqueueing)."""
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        start_time = time.time()
+        response = await call_next(request)
+        audit_module.audit_writer.enqueue(
+            AuditRecord(
+                request_id=getattr(request.state, "request_id", "unknown"),
+                user_id=getattr(request.state, "user_id", None),
+                method=request.method,
+                path=str(request.url.path),
+                status_code=response.status_code,
+                duration_ms=int((time.time() - start_time) * 1000),
+                ip=request.client.host if request.client else None,
+                user_agent=request.headers.get("user-agent"),
+            )
+        )
+        return response
+
+
+def build_app(legacy: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    if legacy:
+        app.add_middleware(LegacyAuditMiddleware)
+        app.add_middleware(LegacyRequestIdMiddleware)
+    else:
+        app.add_middleware(AuditMiddleware)
+    return app
+
+
+async def run(app: FastAPI, requests: int, concurrency: int) -> list[float]:
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        # Warm up
+        for _ in range(100):
+            await client.get("/ping")
+
+        async def one() -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get("/ping")
+                latencies.append((time.perf_counter() - start) * 1000)
+                assert response.headers["X-Request-Id"]
+
+        await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies
+
+
+def report(label: str, latencies: list[float], elapsed: float) -> None:
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{label:<10} req/s={len(latencies) / elapsed:9.0f}  "
+        f"mean={statistics.fmean(latencies):7.3f}ms  "
+        f"p50={statistics.median(latencies):7.3f}ms  p99={p99:7.3f}ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    # Keep records in memory; the queue is large enough to never drop
+    audit_module.audit_writer = AuditWriter(max_queue_size=args.requests * 4)
+
+    for label, legacy in (("before", True), ("after", False)):
+        start = time.perf_counter()
+        latencies = await run(build_app(legacy), args.requests, args.concurrency)
+        report(label, latencies, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
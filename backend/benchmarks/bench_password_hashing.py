@@ -0,0 +1,119 @@
+"""/auth/me latency under concurrent login load: inline bcrypt vs. worker pool.
+
+Usage (from backend/):
+    python -m benchmarks.bench_password_hashing [--concurrency 4] [--me-requests 100]
+
+Runs the real app in-process over httpx's ASGI transport against a scratch
+SQLite database. ``--concurrency`` clients keep submitting logins (with a
+wrong password, so each one costs a full bcrypt check but issues no
+tokens) while /auth/me is requested every 10ms with a valid token and its
+latency recorded. "before" verifies passwords inline on the event loop (the
+previous behaviour), "after" uses the worker pool.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import app.middleware.audit as audit_module
+from app.core.security import get_password_hash, verify_password, verify_password_async
+from app.db.base import Base
+from app.db.session import get_db
+from app.main import app
+from app.models import User
+from app.services.audit_writer import AuditWriter
+
+EMAIL = "bench@example.com"
+PASSWORD = "benchpass123"
+ME_INTERVAL = 0.01  # seconds between scheduled /auth/me requests
+
+
+async def inline_verify(plain_password: str, hashed_password: str) -> bool:
+    return verify_password(plain_password, hashed_password)
+
+
+async def run(client: AsyncClient, concurrency: int, me_requests: int) -> tuple[list[float], int]:
+    response = await client.post("/api/v1/auth/login", json={"email": EMAIL, "password": PASSWORD})
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    await client.get("/api/v1/auth/me", headers=headers)
+
+    done = asyncio.Event()
+    logins = 0
+    latencies: list[float] = []
+
+    async def login_load() -> None:
+        nonlocal logins
+        while not done.is_set():
+            await client.post("/api/v1/auth/login", json={"email": EMAIL, "password": "wrong"})
+            logins += 1
+
+    async def poll_me() -> None:
+        # Latency is measured from each request's scheduled send time, so time
+        # spent waiting for a blocked event loop counts (as it would for a client)
+        start = time.perf_counter()
+        for i in range(me_requests):
+            scheduled = start + i * ME_INTERVAL
+            await asyncio.sleep(max(scheduled - time.perf_counter(), 0))
+            response = await client.get("/api/v1/auth/me", headers=headers)
+            latencies.append((time.perf_counter() - scheduled) * 1000)
+            assert response.status_code == 200
+        done.set()
+
+    await asyncio.gather(poll_me(), *(login_load() for _ in range(concurrency)))
+    return latencies, logins
+
+
+def report(label: str, latencies: list[float], logins: int, elapsed: float) -> None:
+    latencies.sort()
+    p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)]
+    print(
+        f"{label:<7} /auth/me n={len(latencies)}  "
+        f"p50={statistics.median(latencies):8.2f}ms  p99={p99:8.2f}ms  "
+        f"max={latencies[-1]:8.2f}ms  logins={logins / elapsed:6.1f}/s"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--me-requests", type=int, default=100)
+    args = parser.parse_args()
+
+    audit_module.audit_writer = AuditWriter(max_queue_size=100_000)
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(directory) / 'bench.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with session_maker() as db:
+            db.add(User(email=EMAIL, password_hash=get_password_hash(PASSWORD)))
+            await db.commit()
+
+        async def override_get_db():
+            async with session_maker() as session:
+                yield session
+                await session.commit()
+
+        app.dependency_overrides[get_db] = override_get_db
+        # app.services re-exports the singleton under the module's name
+        auth_service_module = sys.modules["app.services.auth_service"]
+        transport = ASGITransport(app=app)
+        for label, verify in (("before", inline_verify), ("after", verify_password_async)):
+            auth_service_module.verify_password_async = verify
+            async with AsyncClient(transport=transport, base_url="http://bench") as client:
+                start = time.perf_counter()
+                latencies, logins = await run(client, args.concurrency, args.me_requests)
+                report(label, latencies, logins, time.perf_counter() - start)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,7 +1,9 @@
 """Test configuration and fixtures."""
 
 import asyncio
-from typing import AsyncGenerator, Generator
+from datetime import datetime
+from typing import AsyncGenerator, Awaitable, Callable, Generator, Optional
+from uuid import UUID
 
 import pytest
 import pytest_asyncio
@@ -12,10 +14,11 @@ from sqlalchemy.pool import StaticPool
 
 from app.core.config import settings
 from app.db.base import Base
-from app.db.session import get_db
+from app.db.session import get_audit_db, get_db
 from app.main import app
 from app.models import User
 from app.core.security import get_password_hash
+from app.services.audit_service import AuditRecord
 
 
 # Use SQLite for testing
@@ -70,6 +73,7 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_audit_db] = override_get_db
 
     async with AsyncClient(
         transport=ASGITransport(app=app),
@@ -80,6 +84,50 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def login(client: AsyncClient) -> Callable[[str, str], Awaitable[str]]:
+    """Log in through /api/v1/auth/login and return the access token."""
+
+    async def _login(email: str, password: str) -> str:
+        response = await client.post(
+            "/api/v1/auth/login", json={"email": email, "password": password}
+        )
+        assert response.status_code == 200
+        return response.json()["access_token"]
+
+    return _login
+
+
+@pytest.fixture
+def make_record() -> Callable[..., AuditRecord]:
+    """Build audit records with test defaults."""
+
+    def _make_record(
+        path: str = "/api/v1/demo/items",
+        user_id: Optional[UUID] = None,
+        route: Optional[str] = None,
+        status_code: int = 200,
+        duration_ms: int = 3,
+        created_at: Optional[datetime] = None,
+    ) -> AuditRecord:
+        record = AuditRecord(
+            request_id="req-1",
+            user_id=user_id,
+            method="GET",
+            path=path,
+            route=route,
+            status_code=status_code,
+            duration_ms=duration_ms,
+            ip="127.0.0.1",
+            user_agent="pytest",
+        )
+        if created_at is not None:
+            record.created_at = created_at
+        return record
+
+    return _make_record
+
+
 @pytest_asyncio.fixture
 async def test_user(db_session: AsyncSession) -> User:
     """Create a test user."""
@@ -0,0 +1,54 @@
+"""Audit partition maintenance tests."""
+
+from datetime import datetime, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.audit_partition_service import (
+    AuditPartition,
+    audit_partition_service,
+    next_period,
+    partition_name,
+    period_start,
+)
+
+
+class TestPartitionPeriods:
+    """Tests for partition period arithmetic."""
+
+    def test_monthly_periods(self):
+        """Test month periods roll over the year boundary."""
+        start = period_start(datetime(2026, 12, 15, 10, 30, tzinfo=timezone.utc), "month")
+        assert start == datetime(2026, 12, 1, tzinfo=timezone.utc)
+        assert next_period(start, "month") == datetime(2027, 1, 1, tzinfo=timezone.utc)
+        assert partition_name(start, "month") == "audit_logs_p202612"
+
+    def test_daily_periods(self):
+        """Test day periods and names."""
+        start = period_start(datetime(2026, 2, 28, 23, 59, tzinfo=timezone.utc), "day")
+        assert next_period(start, "day") == datetime(2026, 3, 1, tzinfo=timezone.utc)
+        assert partition_name(start, "day") == "audit_logs_p20260228"
+
+    def test_overlap(self):
+        """Test overlap detection including the open-ended legacy partition."""
+        legacy = AuditPartition(
+            "audit_logs_legacy", None, datetime(2026, 11, 1, tzinfo=timezone.utc)
+        )
+        assert legacy.overlaps(
+            datetime(2026, 10, 1, tzinfo=timezone.utc), datetime(2026, 11, 1, tzinfo=timezone.utc)
+        )
+        assert not legacy.overlaps(
+            datetime(2026, 11, 1, tzinfo=timezone.utc), datetime(2026, 12, 1, tzinfo=timezone.utc)
+        )
+
+
+class TestPartitionMaintenance:
+    """Tests for maintenance on databases without partitioning."""
+
+    async def test_noop_without_partitioning(self, db_session: AsyncSession):
+        """Test maintenance does nothing on SQLite."""
+        assert await audit_partition_service.create_future_partitions(db_session) == []
+        assert (
+            await audit_partition_service.drop_expired_partitions(db_session, retention_days=1)
+            == []
+        )
@@ -0,0 +1,65 @@
+"""Audit policy tests."""
+
+import pytest
+
+from app.middleware.audit_policy import (
+    BODY,
+    DEFAULT_AUDIT_POLICY,
+    METADATA,
+    SKIP,
+    AuditPolicy,
+)
+
+
+class TestAuditPolicy:
+    """Tests for the compiled audit policy."""
+
+    def test_default_policy(self):
+        """Test the built-in rules skip docs/health and capture admin writes."""
+        policy = AuditPolicy.from_config(DEFAULT_AUDIT_POLICY)
+        assert policy.decide("GET", "/health", "/health", 200) == SKIP
+        assert policy.decide("GET", "/docs/oauth2-redirect", None, 200) == SKIP
+        assert policy.decide("GET", "/healthz", None, 404) == METADATA
+        assert policy.decide("PATCH", "/api/v1/admin/users/1", None, 200) == BODY
+        assert policy.decide("GET", "/api/v1/admin/users", None, 200) == METADATA
+
+    def test_precedence(self):
+        """Test route rules beat prefix rules and longer prefixes beat shorter ones."""
+        policy = AuditPolicy.from_config(
+            [
+                {"prefix": "/api", "action": "skip"},
+                {"prefix": "/api/v1/auth", "action": "body"},
+                {"route": "/api/v1/auth/me", "methods": ["GET"], "action": "metadata"},
+            ]
+        )
+        assert policy.decide("GET", "/api/v1/auth/me", "/api/v1/auth/me", 200) == METADATA
+        assert policy.decide("POST", "/api/v1/auth/me", "/api/v1/auth/me", 200) == BODY
+        assert policy.decide("GET", "/api/v1/demo/items", None, 200) == SKIP
+        assert policy.decide("GET", "/other", None, 200) == METADATA
+
+    def test_status_filter_and_sampling(self):
+        """Test status-class filters and the sample rate bounds."""
+        policy = AuditPolicy.from_config(
+            [
+                {"prefix": "/poll", "status_classes": [2], "action": "sample", "rate": 0.0},
+                {"prefix": "/always", "action": "sample", "rate": 1.0},
+            ]
+        )
+        assert policy.decide("GET", "/poll", None, 200) == SKIP
+        assert policy.decide("GET", "/poll", None, 500) == METADATA
+        assert policy.decide("GET", "/always/x", None, 200) == METADATA
+
+    @pytest.mark.parametrize(
+        "rule",
+        [
+            {"prefix": "/x", "action": "drop"},
+            {"action": "skip"},
+            {"prefix": "/x", "route": "/x", "action": "skip"},
+            {"prefix": "/x", "action": "sample", "rate": 2},
+            {"prefix": "/x", "action": "skip", "method": "GET"},
+        ],
+    )
+    def test_invalid_rules(self, rule: dict):
+        """Test malformed rules are rejected at compile time."""
+        with pytest.raises(ValueError):
+            AuditPolicy.from_config([rule])
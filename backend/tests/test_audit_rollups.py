@@ -0,0 +1,108 @@
+"""Audit rollup tests."""
+
+from datetime import datetime, timedelta, timezone
+
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import User
+from app.services.audit_rollup_service import UNMATCHED_ROUTE, audit_rollup_service
+from app.services.audit_service import audit_service
+
+BASE_TIME = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+ITEM_ROUTE = "/items/{item_id}"
+
+
+def at(seconds: int) -> datetime:
+    return BASE_TIME + timedelta(seconds=seconds)
+
+
+class TestAuditRollups:
+    """Tests for per-minute rollups."""
+
+    def test_unmatched_requests_share_one_key(self, make_record):
+        """Test requests without a matched route do not add a row per path."""
+        rows = audit_rollup_service.aggregate(
+            [
+                make_record(f"/wp-admin/{i}.php", status_code=404, created_at=at(i))
+                for i in range(20)
+            ]
+            + [make_record("/items/1", route=ITEM_ROUTE, created_at=at(0))]
+        )
+        assert sorted((row["route"], row["count"]) for row in rows) == [
+            (ITEM_ROUTE, 1),
+            (UNMATCHED_ROUTE, 20),
+        ]
+
+    async def test_batches_merge_into_minute_buckets(self, db_session: AsyncSession, make_record):
+        """Test separate batches accumulate into the same rollup rows."""
+        await audit_service.write_batch(
+            db_session,
+            [
+                make_record("/items/1", route=ITEM_ROUTE, duration_ms=3, created_at=at(0)),
+                make_record("/items/2", route=ITEM_ROUTE, duration_ms=40, created_at=at(10)),
+            ],
+        )
+        await audit_service.write_batch(
+            db_session,
+            [
+                make_record("/items/3", route=ITEM_ROUTE, duration_ms=3000, created_at=at(20)),
+                make_record(
+                    "/items/3", route=ITEM_ROUTE, status_code=500, duration_ms=7, created_at=at(70)
+                ),
+            ],
+        )
+        await db_session.commit()
+
+        points = await audit_rollup_service.get_series(
+            db_session, BASE_TIME, BASE_TIME + timedelta(minutes=5)
+        )
+        assert [(p["route"], p["status_class"], p["count"]) for p in points] == [
+            (ITEM_ROUTE, 2, 3),
+            (ITEM_ROUTE, 5, 1),
+        ]
+        ok = points[0]
+        assert (ok["duration_min"], ok["duration_max"]) == (3, 3000)
+        assert ok["histogram"] == [1, 0, 0, 1, 0, 0, 0, 0, 0, 1]
+        assert ok["p50"] == 50
+        assert ok["p99"] == 3000
+
+        totals = await audit_rollup_service.get_series(
+            db_session, BASE_TIME, BASE_TIME + timedelta(minutes=5), interval_minutes=5, group_by=()
+        )
+        assert len(totals) == 1
+        assert totals[0]["count"] == 4
+        assert totals[0]["bucket_start"].replace(tzinfo=timezone.utc) == BASE_TIME
+
+    async def test_rollup_endpoint(
+        self, client: AsyncClient, test_admin: User, db_session: AsyncSession, make_record
+    ):
+        """Test the admin rollup endpoint and group_by validation."""
+        login = await client.post(
+            "/api/v1/auth/login",
+            json={"email": "admin@example.com", "password": "adminpass123"},
+        )
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        record = make_record(
+            "/items/1", route=ITEM_ROUTE, status_code=404, duration_ms=12, created_at=at(0)
+        )
+        await audit_service.write_batch(db_session, [record])
+        await db_session.commit()
+
+        params = {"from": BASE_TIME.isoformat(), "to": (BASE_TIME + timedelta(hours=1)).isoformat()}
+        response = await client.get(
+            "/api/v1/admin/audit-rollups",
+            params={**params, "group_by": "status_class"},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["items"][0]["status_class"] == 4
+        assert data["items"][0]["route"] is None
+
+        response = await client.get(
+            "/api/v1/admin/audit-rollups",
+            params={**params, "group_by": "user"},
+            headers=headers,
+        )
+        assert response.status_code == 400
@@ -0,0 +1,264 @@
+"""Audit log search and export tests."""
+
+import csv
+import gzip
+import io
+import json
+import sys
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import asyncpg
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.exceptions import ValidationException
+from app.db.session import get_audit_db
+from app.main import app
+from app.models import AuditLog, AuditRollup, User
+from app.schemas.audit import AuditLogFilter
+from app.services.audit_service import audit_service
+from app.services.audit_writer import audit_writer
+
+
+class TestAuditLogSearch:
+    """Tests for substring filters on audit logs."""
+
+    async def test_filter_by_user_email(
+        self, db_session: AsyncSession, test_user: User, make_record
+    ):
+        """Test the email filter matches through the user semi-join."""
+        await audit_service.write_batch(
+            db_session, [make_record("/a", test_user.id), make_record("/b")]
+        )
+        await db_session.commit()
+
+        result = await audit_service.get_audit_logs(
+            db_session, AuditLogFilter(user_email="TEST@example")
+        )
+        assert result.total == 1
+        assert result.items[0].path == "/a"
+        assert result.items[0].user_email == test_user.email
+
+    async def test_path_wildcards_are_literal(self, db_session: AsyncSession, make_record):
+        """Test % and _ in the path filter are matched literally."""
+        await audit_service.write_batch(
+            db_session, [make_record("/api/v1/demo_items"), make_record("/api/v1/demoXitems")]
+        )
+        await db_session.commit()
+
+        result = await audit_service.get_audit_logs(db_session, AuditLogFilter(path="demo_"))
+        assert [item.path for item in result.items] == ["/api/v1/demo_items"]
+
+        result = await audit_service.get_audit_logs(db_session, AuditLogFilter(path="%"))
+        assert result.total == 0
+
+    async def test_filter_by_route(self, db_session: AsyncSession, make_record):
+        """Test the route filter matches the template exactly."""
+        await audit_service.write_batch(
+            db_session,
+            [
+                make_record("/api/v1/demo/items/1", route="/api/v1/demo/items/{item_id}"),
+                make_record("/api/v1/demo/items", route="/api/v1/demo/items"),
+            ],
+        )
+        await db_session.commit()
+
+        result = await audit_service.get_audit_logs(
+            db_session, AuditLogFilter(route="/api/v1/demo/items/{item_id}")
+        )
+        assert [item.path for item in result.items] == ["/api/v1/demo/items/1"]
+        assert result.items[0].route == "/api/v1/demo/items/{item_id}"
+
+
+class TestAuditLogExport:
+    """Tests for streaming audit log export."""
+
+    async def collect(self, db_session: AsyncSession, **kwargs) -> bytes:
+        conditions = await audit_service.filter_conditions(db_session, AuditLogFilter())
+        chunks = [
+            chunk
+            async for chunk in audit_service.export_audit_logs(db_session, conditions, **kwargs)
+        ]
+        return b"".join(chunks)
+
+    async def test_export_ndjson(self, db_session: AsyncSession, make_record):
+        """Test NDJSON export emits one JSON object per row."""
+        await audit_service.write_batch(db_session, [make_record("/a"), make_record("/b")])
+        await db_session.commit()
+
+        lines = (await self.collect(db_session)).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        assert sorted(row["path"] for row in rows) == ["/a", "/b"]
+        assert rows[0]["user_email"] is None
+
+    async def test_export_csv_gzip(self, db_session: AsyncSession, make_record):
+        """Test gzip-compressed CSV export has a header and all rows."""
+        await audit_service.write_batch(db_session, [make_record("/a"), make_record("/b")])
+        await db_session.commit()
+
+        data = gzip.decompress(await self.collect(db_session, fmt="csv", compress=True))
+        rows = list(csv.DictReader(io.StringIO(data.decode())))
+        assert sorted(row["path"] for row in rows) == ["/a", "/b"]
+
+
+@pytest_asyncio.fixture
+async def users_db(tmp_path):
+    """Session on a separate users database, as with AUDIT_DATABASE_URL set."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'users.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(User.__table__.create)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def audit_db(tmp_path, db_engine):
+    """Session on a separate audit database, as with AUDIT_DATABASE_URL set.
+
+    audit_logs is dropped from the main test database, so anything still
+    going through the users session fails.
+    """
+    async with db_engine.begin() as conn:
+        await conn.run_sync(AuditLog.__table__.drop)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'audit.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(AuditLog.__table__.create)
+        await conn.run_sync(AuditRollup.__table__.create)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+class TestSeparateAuditDatabase:
+    """Tests for audit reads when users live in another database."""
+
+    async def add_user(self, users_db: AsyncSession, email: str) -> User:
+        user = User(email=email, password_hash="x")
+        users_db.add(user)
+        await users_db.commit()
+        return user
+
+    async def test_email_filter_and_lookup(
+        self, db_session: AsyncSession, users_db: AsyncSession, make_record
+    ):
+        """Test emails are filtered and resolved through the users session."""
+        user = await self.add_user(users_db, "remote@example.com")
+        await audit_service.write_batch(
+            db_session, [make_record("/a", user.id), make_record("/b")]
+        )
+        await db_session.commit()
+
+        result = await audit_service.get_audit_logs(
+            db_session, AuditLogFilter(user_email="remote@"), users_db
+        )
+        assert [item.path for item in result.items] == ["/a"]
+        assert result.items[0].user_email == "remote@example.com"
+
+        result = await audit_service.get_audit_logs(
+            db_session, AuditLogFilter(user_email="nobody@"), users_db
+        )
+        assert result.total == 0
+
+        conditions = await audit_service.filter_conditions(db_session, AuditLogFilter(), users_db)
+        chunks = [
+            chunk
+            async for chunk in audit_service.export_audit_logs(
+                db_session, conditions, users_db=users_db
+            )
+        ]
+        rows = {row["path"]: row for row in map(json.loads, b"".join(chunks).splitlines())}
+        assert rows["/a"]["user_email"] == "remote@example.com"
+        assert rows["/b"]["user_email"] is None
+
+    async def test_email_filter_matching_too_many_users(
+        self, db_session: AsyncSession, users_db: AsyncSession, monkeypatch
+    ):
+        """Test an overly broad email filter is rejected."""
+        # app.services re-exports the singleton under the module's name
+        module = sys.modules["app.services.audit_service"]
+        monkeypatch.setattr(module, "EMAIL_FILTER_MAX_USERS", 1)
+        await self.add_user(users_db, "a@example.com")
+        await self.add_user(users_db, "b@example.com")
+
+        with pytest.raises(ValidationException):
+            await audit_service.get_audit_logs(
+                db_session, AuditLogFilter(user_email="example"), users_db
+            )
+
+    async def test_export_rejects_broad_email_filter_before_streaming(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        test_admin: User,
+        audit_db: AsyncSession,
+        login,
+        monkeypatch,
+    ):
+        """Test an overly broad email filter fails the export with 400, not a cut-off 200."""
+
+        async def override_get_audit_db():
+            yield audit_db
+
+        app.dependency_overrides[get_audit_db] = override_get_audit_db
+        monkeypatch.setattr(sys.modules["app.services.audit_service"], "EMAIL_FILTER_MAX_USERS", 1)
+        token = await login("admin@example.com", "adminpass123")
+
+        response = await client.get(
+            "/api/v1/admin/audit-logs/export",
+            params={"user_email": "@example.com"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert response.status_code == 400
+
+    async def test_estimated_count_with_email_filter(
+        self, db_session: AsyncSession, users_db: AsyncSession
+    ):
+        """Test the EXPLAIN for estimated counts expands the email filter's ID list."""
+        users = [await self.add_user(users_db, f"u{i}@example.com") for i in range(2)]
+        conditions = await audit_service.filter_conditions(
+            db_session, AuditLogFilter(user_email="@example.com", method="get"), users_db
+        )
+
+        statement, params = audit_service._explain_statement(
+            select(AuditLog.id).where(*conditions), asyncpg.dialect()
+        )
+        assert "POSTCOMPILE" not in statement
+        assert statement.count("$") == len(params) == 3
+        assert set(params) == {"GET", users[0].id, users[1].id}
+
+    async def test_export_and_delete_account(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        audit_db: AsyncSession,
+        make_record,
+        monkeypatch,
+    ):
+        """Test account export and deletion use the audit database for audit rows."""
+
+        async def override_get_audit_db():
+            yield audit_db
+            await audit_db.commit()
+
+        app.dependency_overrides[get_audit_db] = override_get_audit_db
+        await audit_service.write_batch(audit_db, [make_record("/a", test_user.id)])
+        await audit_db.commit()
+        response = await client.post(
+            "/api/v1/auth/login", json={"email": "test@example.com", "password": "password123"}
+        )
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        response = await client.get("/api/v1/auth/me/export", headers=headers)
+        assert response.status_code == 200
+        assert [log["path"] for log in response.json()["activity_logs"]] == ["/a"]
+
+        enqueued = []
+        monkeypatch.setattr(audit_writer, "enqueue", enqueued.append)
+        response = await client.delete("/api/v1/auth/me", headers=headers)
+        assert response.status_code == 204
+        user_ids = (await audit_db.execute(select(AuditLog.user_id))).scalars().all()
+        assert user_ids == [None]
+        assert [(record.method, record.user_id) for record in enqueued] == [("DELETE", None)]
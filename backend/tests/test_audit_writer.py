@@ -0,0 +1,253 @@
+"""Audit writer tests."""
+
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models import AuditLog
+from app.services.audit_service import AuditRecord, audit_service
+from app.services.audit_spool import QUARANTINE_NAME, AuditSpool, encode_record, read_segment
+from app.services.audit_writer import AuditWriter
+
+
+class TestAuditWriter:
+    """Tests for the batched background audit writer."""
+
+    async def test_flushes_queued_records_in_batches(self, db_engine, make_record):
+        """Test queued records are written when the writer stops."""
+        session_factory = async_sessionmaker(db_engine, class_=AsyncSession)
+        writer = AuditWriter(session_factory=session_factory, batch_size=2, flush_interval=0.01)
+
+        await writer.start()
+        for i in range(5):
+            assert writer.enqueue(make_record(f"/items/{i}"))
+        await writer.stop()
+
+        async with session_factory() as db:
+            total = (await db.execute(select(func.count(AuditLog.id)))).scalar()
+        assert total == 5
+
+        stats = writer.stats()
+        assert stats["written"] == 5
+        assert stats["queue_depth"] == 0
+        assert stats["flushes"] >= 3
+
+    async def test_stop_keeps_partially_collected_batch(self, db_engine, make_record):
+        """Test records taken off the queue for a batch still in collection are written."""
+        session_factory = async_sessionmaker(db_engine, class_=AsyncSession)
+        writer = AuditWriter(session_factory=session_factory, batch_size=10, flush_interval=5)
+
+        await writer.start()
+        for i in range(3):
+            writer.enqueue(make_record(f"/items/{i}"))
+        await asyncio.sleep(0.01)
+        assert writer.stats()["queue_depth"] == 0
+        await writer.stop()
+
+        assert writer.stats()["written"] == 3
+
+    async def test_stop_waits_for_running_flush(self, db_engine, make_record):
+        """Test stop lets a flush in progress commit instead of cancelling it."""
+        session_factory = async_sessionmaker(db_engine, class_=AsyncSession)
+        writer = AuditWriter(session_factory=session_factory, batch_size=2, flush_interval=0)
+        write = writer._write
+
+        async def slow_write(batch):
+            await asyncio.sleep(0.05)
+            await write(batch)
+
+        writer._write = slow_write
+        await writer.start()
+        writer.enqueue(make_record("/items/0"))
+        writer.enqueue(make_record("/items/1"))
+        await asyncio.sleep(0.01)
+        assert writer._flushing
+        await writer.stop()
+
+        stats = writer.stats()
+        assert stats["written"] == 2
+        assert stats["spooled"] == stats["failed"] == 0
+
+    async def test_stop_spools_flush_past_timeout(self, db_engine, tmp_path, make_record):
+        """Test a flush still running at the stop timeout has its batch spooled."""
+        spool = AuditSpool(str(tmp_path), max_bytes=1024 * 1024, segment_max_bytes=4096)
+        writer = AuditWriter(
+            session_factory=async_sessionmaker(db_engine, class_=AsyncSession),
+            batch_size=2,
+            flush_interval=0,
+            write_timeout=60,
+            spool=spool,
+        )
+
+        async def hung_write(batch):
+            await asyncio.sleep(60)
+
+        writer._write = hung_write
+        await writer.start()
+        writer.enqueue(make_record("/items/0"))
+        writer.enqueue(make_record("/items/1"))
+        await asyncio.sleep(0.01)
+        await writer.stop(timeout=0.05)
+
+        assert writer.stats()["spooled"] == 2
+        assert await spool.pending()
+
+    async def test_forget_user(self, db_engine, tmp_path, make_record):
+        """Test queued and spooled records of a forgotten user are written without the id."""
+        session_factory = async_sessionmaker(db_engine, class_=AsyncSession)
+        spool = AuditSpool(str(tmp_path), max_bytes=1024 * 1024, segment_max_bytes=1024 * 1024)
+        writer = AuditWriter(session_factory=session_factory, spool=spool)
+        erased, kept = uuid.uuid4(), uuid.uuid4()
+        await spool.append([make_record("/spooled", erased)])
+        writer.enqueue(make_record("/queued", erased))
+        writer.enqueue(make_record("/other", kept))
+
+        await writer.forget_user(erased)
+        await writer.stop()
+        await writer.replay_spool()
+
+        async with session_factory() as db:
+            rows = (await db.execute(select(AuditLog.path, AuditLog.user_id))).all()
+        assert sorted(rows) == [("/other", kept), ("/queued", None), ("/spooled", None)]
+
+    async def test_drops_records_when_queue_is_full(self, db_engine, make_record):
+        """Test a full queue drops records instead of blocking."""
+        session_factory = async_sessionmaker(db_engine, class_=AsyncSession)
+        writer = AuditWriter(session_factory=session_factory, max_queue_size=1)
+
+        assert writer.enqueue(make_record())
+        assert not writer.enqueue(make_record())
+
+        stats = writer.stats()
+        assert stats["dropped"] == 1
+        assert stats["queue_depth"] == 1
+
+
+class TestAuditIngestEngines:
+    """Tests for the audit ingestion engines."""
+
+    @pytest.mark.parametrize("engine", ["orm", "insert", "copy"])
+    async def test_write_batch(self, db_session: AsyncSession, engine: str, make_record):
+        """Test every engine writes the batch (copy falls back on SQLite)."""
+        records = [make_record(f"/items/{i}") for i in range(3)]
+        records[0].ip = None
+
+        written = await audit_service.write_batch(db_session, records, engine=engine)
+        await db_session.commit()
+
+        assert written == 3
+        total = (await db_session.execute(select(func.count(AuditLog.id)))).scalar()
+        assert total == 3
+
+    def test_long_fields_truncated_to_columns(self):
+        """Test over-long request values are cut to their column length."""
+        record = AuditRecord(
+            request_id="r" * 100,
+            user_id=None,
+            method="X" * 20,
+            path="/" + "a" * 5000,
+            status_code=200,
+            duration_ms=1,
+            ip=None,
+            user_agent="u" * 1000,
+        )
+        assert len(record.request_id) == 36
+        assert len(record.method) == 10
+        assert len(record.path) == 2048
+        assert len(record.user_agent) == 512
+
+
+class TestAuditSpool:
+    """Tests for the disk spool fallback."""
+
+    async def test_spools_on_failure_and_replays(self, db_engine, tmp_path, make_record):
+        """Test failed batches are spooled and replayed once the DB is back."""
+        session_factory = async_sessionmaker(db_engine, class_=AsyncSession)
+        spool = AuditSpool(str(tmp_path), max_bytes=1024 * 1024, segment_max_bytes=512)
+
+        def broken_session():
+            raise ConnectionRefusedError("database is down")
+
+        writer = AuditWriter(session_factory=broken_session, batch_size=2, spool=spool)
+        for i in range(5):
+            writer.enqueue(make_record(f"/items/{i}"))
+        await writer.stop()
+
+        stats = writer.stats()
+        assert stats["spooled"] == 5
+        assert stats["spooling"]
+        assert await spool.pending()
+
+        writer._session_factory = session_factory
+        assert await writer.replay_spool() == 5
+        assert not writer.stats()["spooling"]
+        assert not await spool.pending()
+        assert spool.stats()["replayed"] == 5
+
+        async with session_factory() as db:
+            paths = (await db.execute(select(AuditLog.path))).scalars().all()
+        assert sorted(paths) == [f"/items/{i}" for i in range(5)]
+
+    async def test_rejected_record_quarantined(self, db_engine, tmp_path, make_record):
+        """Test a record the database rejects is quarantined instead of blocking replay."""
+        session_factory = async_sessionmaker(db_engine, class_=AsyncSession)
+        spool = AuditSpool(str(tmp_path), max_bytes=1024 * 1024, segment_max_bytes=1024 * 1024)
+        writer = AuditWriter(session_factory=session_factory, spool=spool)
+        write = writer._write
+
+        async def rejecting_write(batch):
+            if any(record.path == "/poison" for record in batch):
+                raise ValueError("value too long")
+            await write(batch)
+
+        writer._write = rejecting_write
+        await writer._flush([make_record("/a"), make_record("/poison"), make_record("/b")])
+        assert writer.stats()["spooling"]
+
+        assert await writer.replay_spool() == 2
+        assert not writer.stats()["spooling"]
+        assert not await spool.pending()
+        assert spool.stats()["quarantined"] == 1
+        records, corrupt = read_segment(tmp_path / QUARANTINE_NAME)
+        assert [record.path for record in records] == ["/poison"]
+        assert corrupt == 0
+
+        async with session_factory() as db:
+            paths = (await db.execute(select(AuditLog.path))).scalars().all()
+        assert sorted(paths) == ["/a", "/b"]
+
+    async def test_replay_deferred_while_database_down(self, tmp_path, make_record):
+        """Test nothing is quarantined when the database itself is unreachable."""
+        spool = AuditSpool(str(tmp_path), max_bytes=1024 * 1024, segment_max_bytes=1024 * 1024)
+
+        def broken_session():
+            raise ConnectionRefusedError("database is down")
+
+        writer = AuditWriter(session_factory=broken_session, spool=spool)
+        await writer._flush([make_record("/a")])
+
+        assert await writer.replay_spool() == 0
+        assert await spool.pending()
+        assert spool.stats()["quarantined"] == 0
+
+    async def test_torn_segment_tail(self, tmp_path, make_record):
+        """Test records before a torn frame survive and the tail is reported."""
+        spool = AuditSpool(str(tmp_path), max_bytes=1024 * 1024, segment_max_bytes=1024 * 1024)
+        assert await spool.append([make_record("/a"), make_record("/b")])
+
+        segment = next(tmp_path.iterdir())
+        with open(segment, "ab") as f:
+            f.write(encode_record(make_record("/c"))[:-3])
+
+        records, corrupt = read_segment(segment)
+        assert [record.path for record in records] == ["/a", "/b"]
+        assert corrupt == 1
+
+    async def test_full_spool_drops(self, tmp_path, make_record):
+        """Test the spool refuses batches beyond its size cap."""
+        spool = AuditSpool(str(tmp_path), max_bytes=10, segment_max_bytes=10)
+        assert not await spool.append([make_record()])
+        assert spool.stats()["dropped"] == 1
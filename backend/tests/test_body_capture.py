@@ -0,0 +1,105 @@
+"""Request body capture tests."""
+
+import json
+
+from httpx import ASGITransport, AsyncClient
+
+import app.middleware.audit as audit_module
+from app.core.config import settings
+from app.middleware.audit import AuditMiddleware
+from app.middleware.audit_policy import AuditPolicy
+from app.middleware.body_capture import BodyCapture, JsonMasker
+from app.services.audit_writer import AuditWriter
+
+MASK_KEYS = ["password", "code", "token"]
+
+
+def mask(document: bytes, chunk_size: int = 0) -> str:
+    masker = JsonMasker(MASK_KEYS)
+    step = chunk_size or len(document)
+    for i in range(0, len(document), step):
+        masker.feed(document[i:i + step])
+    return masker.getvalue().decode()
+
+
+class TestJsonMasker:
+    """Tests for the incremental JSON masker."""
+
+    def test_escaped_keys_are_decoded(self):
+        """Test keys spelled with JSON escapes are still recognized as sensitive."""
+        document = rb'{"pass\u0077ord": "hunter2", "\u0054OKEN": 1, "a\"b": "kept"}'
+        for chunk_size in (0, 1, 3):
+            masked = mask(document, chunk_size)
+            assert json.loads(masked) == {"password": "***", "TOKEN": "***", 'a"b': "kept"}
+
+    def test_masks_sensitive_values(self):
+        """Test string, scalar and nested values of sensitive keys are masked."""
+        document = json.dumps(
+            {
+                "email": "a@example.com",
+                "password": 'p"a\\ss',
+                "code": 123456,
+                "refresh_token": {"value": "x", "list": [1, "]"]},
+                "note": "password: not a key",
+                "items": [{"Token": None}],
+            }
+        ).encode()
+
+        masked = json.loads(mask(document))
+        assert masked == {
+            "email": "a@example.com",
+            "password": "***",
+            "code": "***",
+            "refresh_token": "***",
+            "note": "password: not a key",
+            "items": [{"Token": "***"}],
+        }
+
+    def test_chunk_boundaries(self):
+        """Test splitting the input at any byte gives the same output."""
+        document = b'{"user": {"password" : "s3cr\\"et", "n": 1}, "code":42}'
+        expected = mask(document)
+        for size in range(1, len(document)):
+            assert mask(document, size) == expected
+        assert "s3cr" not in expected and "42" not in expected
+
+
+class TestBodyCapture:
+    """Tests for the bounded receive tee."""
+
+    def test_truncates_at_cap(self):
+        """Test only the first max_bytes are kept and the result is marked."""
+        capture = BodyCapture(max_bytes=16, mask_keys=MASK_KEYS)
+        capture.feed(b'{"password": "secret", "padding": "')
+        capture.feed(b"x" * 100_000 + b'"}')
+
+        result = capture.result()
+        assert result == '{"password": "***"...[truncated]'
+        assert capture.received_bytes == 100_037
+
+    async def test_middleware_stores_masked_body(self, monkeypatch):
+        """Test the middleware passes the body through and records it masked."""
+        writer = AuditWriter(max_queue_size=10)
+        monkeypatch.setattr(audit_module, "audit_writer", writer)
+        monkeypatch.setattr(settings, "AUDIT_BODY_CAPTURE_ENABLED", True)
+
+        received = []
+
+        async def echo_app(scope, receive, send):
+            message = await receive()
+            received.append(message["body"])
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        policy = AuditPolicy.from_config([{"prefix": "/login", "action": "body"}])
+        app = AuditMiddleware(echo_app, policy=policy)
+        body = {"email": "a@example.com", "password": "secret"}
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            await client.post("/login", json=body)
+            await client.post("/other", json=body)
+
+        assert json.loads(received[0]) == body
+        login, other = [writer._queue.get_nowait() for _ in range(2)]
+        assert json.loads(login.request_body) == {"email": "a@example.com", "password": "***"}
+        assert other.request_body is None
@@ -0,0 +1,77 @@
+"""Batch token introspection tests."""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.middleware.audit as audit_module
+from app.core.config import settings
+from app.models import User
+
+SERVICE_TOKEN = "service-secret"
+URL = "/api/v1/auth/introspect/batch"
+
+
+@pytest.fixture(autouse=True)
+def service_tokens(monkeypatch):
+    monkeypatch.setattr(settings, "INTROSPECTION_SERVICE_TOKENS", ["old-secret", SERVICE_TOKEN])
+
+
+class TestIntrospectBatch:
+    """Tests for POST /auth/introspect/batch."""
+
+    async def test_requires_service_token(self, client: AsyncClient):
+        """Test the endpoint rejects missing or wrong service credentials."""
+        for headers in ({}, {"X-Service-Token": "wrong"}):
+            response = await client.post(URL, json={"tokens": ["x"]}, headers=headers)
+            assert response.status_code == 401
+
+    async def test_batch_results_with_one_query(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_user: User,
+        test_admin: User,
+        monkeypatch,
+        login,
+    ):
+        """Test per-token results in order, resolving users with a single query."""
+        user_token = await login("test@example.com", "password123")
+        admin_token = await login("admin@example.com", "adminpass123")
+
+        monkeypatch.setattr(audit_module.settings, "SERVER_TIMING_ENABLED", True)
+        response = await client.post(
+            URL,
+            json={"tokens": [user_token, "garbage", admin_token, user_token]},
+            headers={"X-Service-Token": SERVICE_TOKEN},
+        )
+        assert response.status_code == 200
+        assert '"1 queries"' in response.headers["Server-Timing"]
+
+        results = response.json()["results"]
+        assert [result["active"] for result in results] == [True, False, True, True]
+        assert results[0]["sub"] == str(test_user.id)
+        assert results[0]["is_admin"] is False
+        assert results[2]["is_admin"] is True
+        assert results[1] == {"active": False}
+
+    async def test_inactive_user(
+        self, client: AsyncClient, db_session: AsyncSession, test_user: User, login
+    ):
+        """Test tokens of deactivated users are reported inactive."""
+        token = await login("test@example.com", "password123")
+        test_user.is_active = False
+        await db_session.commit()
+
+        response = await client.post(
+            URL, json={"tokens": [token]}, headers={"X-Service-Token": SERVICE_TOKEN}
+        )
+        assert response.json()["results"] == [{"active": False}]
+
+    async def test_batch_size_limit(self, client: AsyncClient, monkeypatch):
+        """Test batches over INTROSPECTION_BATCH_MAX_TOKENS are rejected."""
+        monkeypatch.setattr(settings, "INTROSPECTION_BATCH_MAX_TOKENS", 2)
+        response = await client.post(
+            URL, json={"tokens": ["a", "b", "c"]}, headers={"X-Service-Token": SERVICE_TOKEN}
+        )
+        assert response.status_code == 400
@@ -0,0 +1,87 @@
+"""Asymmetric signing and JWKS tests."""
+
+import pytest
+from httpx import AsyncClient
+from jose import jwk, jwt
+
+from app.core import security
+from app.core.keys import KeyRing, generate_private_key
+from app.core.security import create_access_token, decode_access_token
+
+
+@pytest.fixture
+def es256_keys(tmp_path, monkeypatch) -> KeyRing:
+    """Sign with ES256 using two keys, the newer one active."""
+    generate_private_key(str(tmp_path), "2026-01", "ES256")
+    generate_private_key(str(tmp_path), "2026-02", "ES256")
+    key_ring = KeyRing.from_directory(str(tmp_path), "ES256", active_kid="2026-02")
+    monkeypatch.setattr(security, "key_ring", key_ring)
+    return key_ring
+
+
+class TestAsymmetricSigning:
+    """Tests for kid-based signing and verification."""
+
+    def test_sign_and_verify_with_kid(self, es256_keys: KeyRing):
+        """Test tokens carry the active kid and verify against the public key."""
+        token = create_access_token("7b0c2d4e-0000-4000-8000-000000000001")
+        assert jwt.get_unverified_header(token)["kid"] == "2026-02"
+        assert decode_access_token(token)["sub"] == "7b0c2d4e-0000-4000-8000-000000000001"
+
+    def test_rotation_overlap(self, es256_keys: KeyRing, tmp_path, monkeypatch):
+        """Test tokens signed by a published, non-active key still verify."""
+        old_ring = KeyRing.from_directory(str(tmp_path), "ES256", active_kid="2026-01")
+        monkeypatch.setattr(security, "key_ring", old_ring)
+        token = create_access_token("7b0c2d4e-0000-4000-8000-000000000002")
+
+        monkeypatch.setattr(security, "key_ring", es256_keys)
+        assert decode_access_token(token) is not None
+
+    def test_active_kid_required_with_several_keys(self, tmp_path):
+        """Test a newly added key never starts signing without JWT_ACTIVE_KID."""
+        generate_private_key(str(tmp_path), "2026-01", "ES256")
+        key_ring = KeyRing.from_directory(str(tmp_path), "ES256", active_kid="")
+        assert key_ring.signing_key()[1] == {"kid": "2026-01"}
+
+        generate_private_key(str(tmp_path), "2026-02", "ES256")
+        with pytest.raises(ValueError, match="JWT_ACTIVE_KID"):
+            KeyRing.from_directory(str(tmp_path), "ES256", active_kid="")
+
+    def test_unknown_kid_rejected(self, es256_keys: KeyRing, tmp_path, monkeypatch):
+        """Test a token whose kid is not in the ring is rejected."""
+        other_dir = tmp_path / "other"
+        generate_private_key(str(other_dir), "rogue", "ES256")
+        monkeypatch.setattr(
+            security, "key_ring", KeyRing.from_directory(str(other_dir), "ES256", "rogue")
+        )
+        token = create_access_token("7b0c2d4e-0000-4000-8000-000000000003")
+
+        monkeypatch.setattr(security, "key_ring", es256_keys)
+        assert decode_access_token(token) is None
+
+
+class TestJwksEndpoint:
+    """Tests for /.well-known/jwks.json."""
+
+    async def test_jwks_publishes_public_keys(self, client: AsyncClient, es256_keys: KeyRing):
+        """Test the JWKS lists every key and verifies tokens locally."""
+        response = await client.get("/.well-known/jwks.json")
+        assert response.status_code == 200
+        assert "max-age=" in response.headers["Cache-Control"]
+        keys = {key["kid"]: key for key in response.json()["keys"]}
+        assert set(keys) == {"2026-01", "2026-02"}
+        assert all("d" not in key for key in keys.values())
+
+        token = create_access_token("7b0c2d4e-0000-4000-8000-000000000004")
+        public_key = jwk.construct(keys[jwt.get_unverified_header(token)["kid"]])
+        assert jwt.decode(token, public_key, algorithms=["ES256"])["type"] == "access"
+
+        cached = await client.get(
+            "/.well-known/jwks.json", headers={"If-None-Match": response.headers["ETag"]}
+        )
+        assert cached.status_code == 304
+
+    async def test_jwks_empty_for_hmac(self, client: AsyncClient):
+        """Test the shared HS256 secret is never published."""
+        response = await client.get("/.well-known/jwks.json")
+        assert response.json() == {"keys": []}
@@ -0,0 +1,90 @@
+"""Middleware tests."""
+
+import pytest
+from httpx import AsyncClient
+
+import app.middleware.audit as audit_module
+from app.models import User
+from app.services.audit_writer import AuditWriter
+
+
+@pytest.fixture
+def audit_queue(monkeypatch) -> AuditWriter:
+    """Capture audit records in a private writer."""
+    writer = AuditWriter(max_queue_size=100)
+    monkeypatch.setattr(audit_module, "audit_writer", writer)
+    return writer
+
+
+class TestAuditMiddleware:
+    """Tests for the ASGI audit middleware."""
+
+    async def test_request_id_header(self, client: AsyncClient, audit_queue: AuditWriter):
+        """Test excluded paths get a request ID but no audit record."""
+        response = await client.get("/health")
+        assert response.status_code == 200
+        assert len(response.headers["X-Request-Id"]) == 36
+        assert audit_queue.stats()["enqueued"] == 0
+
+    async def test_records_request(self, client: AsyncClient, audit_queue: AuditWriter):
+        """Test an API request is recorded with its status and request ID."""
+        response = await client.get("/api/v1/auth/me", headers={"User-Agent": "pytest"})
+        assert response.status_code == 401
+
+        record = audit_queue._queue.get_nowait()
+        assert record.request_id == response.headers["X-Request-Id"]
+        assert record.method == "GET"
+        assert record.path == "/api/v1/auth/me"
+        assert record.route == "/api/v1/auth/me"
+        assert record.status_code == 401
+        assert record.user_agent == "pytest"
+        assert record.user_id is None
+
+    async def test_records_authenticated_user(
+        self, client: AsyncClient, test_user: User, audit_queue: AuditWriter
+    ):
+        """Test the user ID set by the auth dependency is recorded."""
+        login = await client.post(
+            "/api/v1/auth/login",
+            json={"email": "test@example.com", "password": "password123"},
+        )
+        token = login.json()["access_token"]
+
+        response = await client.get(
+            "/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 200
+
+        records = [audit_queue._queue.get_nowait() for _ in range(2)]
+        assert records[0].user_id is None
+        assert records[1].user_id == test_user.id
+
+    async def test_records_route_template(self, client: AsyncClient, audit_queue: AuditWriter):
+        """Test the matched route template is recorded alongside the raw path."""
+        item_id = "8c8e1e0e-3f5a-4d8e-9a65-0f3c1d2b4a5e"
+        await client.get(f"/api/v1/demo/items/{item_id}")
+        await client.get("/api/v1/no-such-route")
+
+        matched, unmatched = [audit_queue._queue.get_nowait() for _ in range(2)]
+        assert matched.path == f"/api/v1/demo/items/{item_id}"
+        assert matched.route == "/api/v1/demo/items/{item_id}"
+        assert unmatched.route is None
+
+    async def test_records_timings(
+        self, client: AsyncClient, test_user: User, audit_queue: AuditWriter, monkeypatch
+    ):
+        """Test the per-stage breakdown is recorded and sent as Server-Timing."""
+        monkeypatch.setattr(audit_module.settings, "SERVER_TIMING_ENABLED", True)
+        response = await client.post(
+            "/api/v1/auth/login",
+            json={"email": "test@example.com", "password": "password123"},
+        )
+        assert response.status_code == 200
+        assert "db;dur=" in response.headers["Server-Timing"]
+        assert "auth;dur=" in response.headers["Server-Timing"]
+
+        timings = audit_queue._queue.get_nowait().timings
+        assert timings["db_queries"] >= 1
+        assert timings["auth_ms"] > 0
+        stages = timings["db_ms"] + timings["auth_ms"] + timings["handler_ms"]
+        assert stages == pytest.approx(timings["total_ms"], abs=0.01)
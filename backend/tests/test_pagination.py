@@ -0,0 +1,117 @@
+"""Keyset pagination tests."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import ValidationException
+from app.models import User
+from app.schemas.audit import AuditLogFilter
+from app.services.audit_service import AuditRecord, audit_service
+from app.services.auth_service import auth_service
+
+BASE_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class TestAuditLogCursor:
+    """Tests for cursor pagination of audit logs."""
+
+    async def test_cursor_walks_all_pages(self, db_session: AsyncSession):
+        """Test following next_cursor returns every row once, newest first."""
+        records = [
+            AuditRecord(
+                request_id=f"req-{i}",
+                user_id=None,
+                method="GET",
+                path=f"/items/{i}",
+                status_code=200,
+                duration_ms=1,
+                ip=None,
+                user_agent=None,
+                created_at=BASE_TIME + timedelta(seconds=i),
+            )
+            for i in range(5)
+        ]
+        await audit_service.write_batch(db_session, records)
+        await db_session.commit()
+
+        seen = []
+        first = await audit_service.get_audit_logs(db_session, AuditLogFilter(limit=2))
+        seen += [item.request_id for item in first.items]
+        cursor = first.next_cursor
+        while cursor:
+            page = await audit_service.get_audit_logs(
+                db_session, AuditLogFilter(limit=2, cursor=cursor)
+            )
+            seen += [item.request_id for item in page.items]
+            cursor = page.next_cursor
+
+        assert seen == [f"req-{i}" for i in reversed(range(5))]
+
+    async def test_invalid_cursor(self, db_session: AsyncSession):
+        """Test a malformed cursor is rejected."""
+        with pytest.raises(ValidationException):
+            await audit_service.get_audit_logs(db_session, AuditLogFilter(cursor="not-a-cursor"))
+
+
+class TestUserCursor:
+    """Tests for cursor pagination of users."""
+
+    async def test_cursor_walks_all_pages(self, db_session: AsyncSession):
+        """Test page and cursor modes agree on the first page."""
+        for i in range(3):
+            db_session.add(
+                User(email=f"user{i}@example.com", created_at=BASE_TIME + timedelta(seconds=i))
+            )
+        await db_session.commit()
+
+        users, total, cursor = await auth_service.get_all_users(db_session, page=1, limit=2)
+        assert total == 3
+        assert [u.email for u in users] == ["user2@example.com", "user1@example.com"]
+
+        users, _, cursor = await auth_service.get_all_users(db_session, limit=2, cursor=cursor)
+        assert [u.email for u in users] == ["user0@example.com"]
+        assert cursor is None
+
+
+class TestAuditLogCount:
+    """Tests for audit log count strategies."""
+
+    async def test_cached_count(self, db_session: AsyncSession):
+        """Test the cached strategy reuses the count for the same filter."""
+        audit_service._count_cache.clear()
+        record = AuditRecord(
+            request_id="req-1",
+            user_id=None,
+            method="GET",
+            path="/items",
+            status_code=200,
+            duration_ms=1,
+            ip=None,
+            user_agent=None,
+        )
+        await audit_service.write_batch(db_session, [record])
+        await db_session.commit()
+
+        first = await audit_service.get_audit_logs(
+            db_session, AuditLogFilter(method="GET", count_strategy="cached")
+        )
+        assert first.total == 1
+        assert not first.total_is_estimate
+
+        await audit_service.write_batch(db_session, [record])
+        await db_session.commit()
+
+        second = await audit_service.get_audit_logs(
+            db_session, AuditLogFilter(method="get", count_strategy="cached")
+        )
+        assert second.total == 1
+        assert second.total_is_estimate
+
+        exact = await audit_service.get_audit_logs(
+            db_session, AuditLogFilter(method="GET", count_strategy="estimated")
+        )
+        # Estimates need PostgreSQL statistics; SQLite falls back to exact
+        assert exact.total == 2
+        assert not exact.total_is_estimate
@@ -0,0 +1,79 @@
+"""Password rehash-on-login tests."""
+
+import asyncio
+import sys
+
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.security import bcrypt_rounds, verify_password
+from app.models import User
+from app.services.auth_service import auth_service
+
+
+@pytest_asyncio.fixture
+async def rehash_db(monkeypatch, db_engine):
+    """Run background rehashes against the test database."""
+    # app.services re-exports the singleton under the module's name
+    module = sys.modules["app.services.auth_service"]
+    session_maker = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(module, "async_session_maker", session_maker)
+    return session_maker
+
+
+async def wait_for_rehashes() -> None:
+    await asyncio.gather(*list(auth_service._rehashing.values()))
+
+
+async def stored_hash(session_maker, email: str) -> str:
+    async with session_maker() as db:
+        return await db.scalar(select(User.password_hash).where(User.email == email))
+
+
+class TestRehashOnLogin:
+    """Tests for upgrading hashes made with an outdated cost."""
+
+    async def test_outdated_hash_rehashed(
+        self, client: AsyncClient, test_user: User, rehash_db, monkeypatch, login
+    ):
+        """Test a successful login rehashes at the configured cost."""
+        old_hash = await stored_hash(rehash_db, "test@example.com")
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", bcrypt_rounds(old_hash) - 2)
+        rehashed = auth_service.rehash_stats()["rehashed"]
+
+        await login("test@example.com", "password123")
+        await wait_for_rehashes()
+
+        new_hash = await stored_hash(rehash_db, "test@example.com")
+        assert bcrypt_rounds(new_hash) == settings.BCRYPT_ROUNDS
+        assert verify_password("password123", new_hash)
+        assert auth_service.rehash_stats()["rehashed"] == rehashed + 1
+
+    async def test_current_hash_left_alone(
+        self, client: AsyncClient, test_user: User, rehash_db, monkeypatch, login
+    ):
+        """Test hashes at the configured cost are not rewritten."""
+        old_hash = await stored_hash(rehash_db, "test@example.com")
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", bcrypt_rounds(old_hash))
+
+        await login("test@example.com", "password123")
+        assert not auth_service._rehashing
+        assert await stored_hash(rehash_db, "test@example.com") == old_hash
+
+    async def test_failed_login_not_rehashed(
+        self, client: AsyncClient, test_user: User, rehash_db, monkeypatch
+    ):
+        """Test a wrong password never triggers a rehash."""
+        old_hash = await stored_hash(rehash_db, "test@example.com")
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", bcrypt_rounds(old_hash) - 2)
+
+        response = await client.post(
+            "/api/v1/auth/login",
+            json={"email": "test@example.com", "password": "wrong-password"},
+        )
+        assert response.status_code == 401
+        assert not auth_service._rehashing
+        assert await stored_hash(rehash_db, "test@example.com") == old_hash
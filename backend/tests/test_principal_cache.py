@@ -0,0 +1,87 @@
+"""Principal cache tests."""
+
+import time
+import uuid
+from datetime import datetime, timezone
+
+from httpx import AsyncClient
+
+from app.models import User
+from app.services.principal_cache import Principal, PrincipalCache, principal_cache
+
+
+def make_principal(is_active: bool = True) -> Principal:
+    return Principal(
+        id=uuid.uuid4(),
+        email="p@example.com",
+        is_active=is_active,
+        is_admin=False,
+        created_at=datetime.now(timezone.utc),
+    )
+
+
+class TestPrincipalCache:
+    """Tests for the LRU/TTL behaviour."""
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted when full."""
+        cache = PrincipalCache(max_size=2, ttl=60)
+        a, b, c = make_principal(), make_principal(), make_principal()
+        cache.put(a)
+        cache.put(b)
+        assert cache.get(a.id) is a
+        cache.put(c)
+
+        assert cache.get(b.id) is None
+        assert cache.get(a.id) is a
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self, monkeypatch):
+        """Test entries expire after the TTL."""
+        cache = PrincipalCache(max_size=10, ttl=30)
+        principal = make_principal()
+        cache.put(principal)
+
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now + 31)
+        assert cache.get(principal.id) is None
+
+    def test_inactive_and_disabled_not_cached(self):
+        """Test inactive users and a zero TTL are never cached."""
+        cache = PrincipalCache(max_size=10, ttl=30)
+        inactive = make_principal(is_active=False)
+        cache.put(inactive)
+        assert cache.get(inactive.id) is None
+
+        disabled = PrincipalCache(max_size=10, ttl=0)
+        principal = make_principal()
+        disabled.put(principal)
+        assert disabled.get(principal.id) is None
+
+
+class TestPrincipalCacheInvalidation:
+    """Tests for the cache on authenticated requests."""
+
+    async def test_cached_lookup_and_deactivation(
+        self, client: AsyncClient, test_user: User, test_admin: User, login
+    ):
+        """Test repeat requests hit the cache and deactivation takes effect at once."""
+        user_token = await login("test@example.com", "password123")
+        admin_token = await login("admin@example.com", "adminpass123")
+        user_headers = {"Authorization": f"Bearer {user_token}"}
+        admin_headers = {"Authorization": f"Bearer {admin_token}"}
+
+        hits = principal_cache.stats()["hits"]
+        assert (await client.get("/api/v1/auth/me", headers=user_headers)).status_code == 200
+        assert (await client.get("/api/v1/auth/me", headers=user_headers)).status_code == 200
+        assert principal_cache.stats()["hits"] > hits
+
+        response = await client.patch(
+            f"/api/v1/admin/users/{test_user.id}",
+            json={"is_active": False},
+            headers=admin_headers,
+        )
+        assert response.status_code == 200
+
+        response = await client.get("/api/v1/auth/me", headers=user_headers)
+        assert response.status_code == 401
@@ -0,0 +1,60 @@
+"""Refresh token storage tests."""
+
+from httpx import AsyncClient, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import hash_refresh_token
+from app.models import RefreshToken, User
+from app.services.auth_service import auth_service
+
+
+def refresh_cookie(response: Response) -> str:
+    # The cookie is Secure, so the plain-HTTP test client would not send it back
+    header = response.headers["set-cookie"]
+    return header.split("refresh_token=", 1)[1].split(";", 1)[0]
+
+
+async def stored_digests(db: AsyncSession) -> list[bytes]:
+    return (await db.execute(select(RefreshToken.token_digest))).scalars().all()
+
+
+class TestRefreshTokenDigest:
+    """Tests for storing refresh tokens by SHA-256 digest."""
+
+    async def test_login_stores_digest_only(
+        self, client: AsyncClient, test_user: User, db_session: AsyncSession
+    ):
+        """Test the database holds the token's digest, never the token."""
+        response = await client.post(
+            "/api/v1/auth/login", json={"email": "test@example.com", "password": "password123"}
+        )
+        token = refresh_cookie(response)
+
+        digests = await stored_digests(db_session)
+        assert digests == [hash_refresh_token(token)]
+        assert len(digests[0]) == 32
+        assert not hasattr(RefreshToken, "token")
+
+    async def test_lookup_and_logout(
+        self, client: AsyncClient, test_user: User, db_session: AsyncSession
+    ):
+        """Test a token is found by its digest and revoked on logout."""
+        response = await client.post(
+            "/api/v1/auth/login", json={"email": "test@example.com", "password": "password123"}
+        )
+        token = refresh_cookie(response)
+
+        stored = await auth_service.get_refresh_token(db_session, token)
+        assert stored is not None and stored.user_id == test_user.id
+        assert await auth_service.get_refresh_token(db_session, token + "x") is None
+
+        response = await client.post(
+            "/api/v1/auth/logout",
+            headers={
+                "Authorization": f"Bearer {response.json()['access_token']}",
+                "Cookie": f"refresh_token={token}",
+            },
+        )
+        assert response.status_code == 200
+        assert await stored_digests(db_session) == []
@@ -0,0 +1,127 @@
+"""Retention purge tests."""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.security import hash_refresh_token
+from app.models import AuditLog, AuthCode, RefreshToken, User
+from app.services.audit_partition_service import audit_partition_service
+from app.services.audit_service import AuditRecord, audit_service
+from app.services.retention_service import RETENTION_POLICIES, retention_service
+
+NOW = datetime(2026, 6, 1, tzinfo=timezone.utc)
+
+
+async def count(db: AsyncSession, model) -> int:
+    return (await db.execute(select(func.count()).select_from(model))).scalar()
+
+
+class TestRetention:
+    """Tests for the batched retention purge."""
+
+    async def test_refresh_tokens_batched(self, db_session: AsyncSession, test_user: User):
+        """Test expired tokens are deleted in batches and live ones are kept."""
+        for i in range(5):
+            db_session.add(
+                RefreshToken(
+                    user_id=test_user.id,
+                    token_digest=hash_refresh_token(f"expired-{i}"),
+                    expires_at=NOW - timedelta(hours=i + 1),
+                )
+            )
+        db_session.add(
+            RefreshToken(
+                user_id=test_user.id,
+                token_digest=hash_refresh_token("live"),
+                expires_at=NOW + timedelta(days=1),
+            )
+        )
+        await db_session.commit()
+
+        policy = RETENTION_POLICIES["refresh_tokens"]
+        options = {"now": NOW, "batch_size": 2, "sleep_seconds": 0}
+        dry = await retention_service.purge(db_session, policy, dry_run=True, **options)
+        assert (dry.rows, dry.batches) == (5, 3)
+        assert await count(db_session, RefreshToken) == 6
+
+        progress = []
+        result = await retention_service.purge(
+            db_session, policy, progress=lambda r: progress.append(r.rows), **options
+        )
+        assert result.rows == 5
+        assert progress == [2, 4, 5]
+        digests = (await db_session.execute(select(RefreshToken.token_digest))).scalars().all()
+        assert digests == [hash_refresh_token("live")]
+
+    async def test_auth_codes(self, db_session: AsyncSession, test_user: User):
+        """Test only used or expired codes past the grace period are deleted."""
+        old = NOW - timedelta(days=settings.AUTH_CODE_RETENTION_DAYS, hours=1)
+        db_session.add_all(
+            [
+                AuthCode(user_id=test_user.id, code="1", expires_at=old, created_at=old),
+                AuthCode(
+                    user_id=test_user.id, code="2", expires_at=NOW, created_at=old, is_used=True
+                ),
+                AuthCode(user_id=test_user.id, code="3", expires_at=NOW, created_at=NOW),
+            ]
+        )
+        await db_session.commit()
+
+        result = await retention_service.purge(
+            db_session, RETENTION_POLICIES["auth_codes"], now=NOW, sleep_seconds=0
+        )
+        assert result.rows == 2
+        codes = (await db_session.execute(select(AuthCode.code))).scalars().all()
+        assert codes == ["3"]
+
+    async def test_audit_logs(self, db_session: AsyncSession, monkeypatch):
+        """Test audit retention is disabled by default and honours AUDIT_RETENTION_DAYS."""
+        records = [
+            AuditRecord(
+                request_id=f"req-{days}",
+                user_id=None,
+                method="GET",
+                path="/items",
+                status_code=200,
+                duration_ms=1,
+                ip=None,
+                user_agent=None,
+                created_at=NOW - timedelta(days=days),
+            )
+            for days in (1, 500)
+        ]
+        await audit_service.write_batch(db_session, records)
+        await db_session.commit()
+
+        policy = RETENTION_POLICIES["audit_logs"]
+        result = await retention_service.purge(db_session, policy, now=NOW)
+        assert not result.enabled
+
+        monkeypatch.setattr(settings, "AUDIT_RETENTION_DAYS", 400)
+        result = await retention_service.purge(db_session, policy, now=NOW, sleep_seconds=0)
+        assert result.rows == 1
+        assert await count(db_session, AuditLog) == 1
+
+    async def test_partitioned_audit_logs_skipped(
+        self, db_session: AsyncSession, monkeypatch, make_record
+    ):
+        """Test a partitioned audit_logs is left to partition drops."""
+        await audit_service.write_batch(
+            db_session, [make_record(created_at=NOW - timedelta(days=500))]
+        )
+        await db_session.commit()
+        monkeypatch.setattr(settings, "AUDIT_RETENTION_DAYS", 400)
+
+        async def is_partitioned(db):
+            return True
+
+        monkeypatch.setattr(audit_partition_service, "is_partitioned", is_partitioned)
+        policy = RETENTION_POLICIES["audit_logs"]
+        result = await retention_service.purge(db_session, policy, now=NOW, sleep_seconds=0)
+
+        assert result.enabled and result.partitioned
+        assert result.rows == 0
+        assert await count(db_session, AuditLog) == 1
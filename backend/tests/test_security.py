@@ -0,0 +1,209 @@
+"""Security utility tests."""
+
+import asyncio
+import time
+import uuid
+from datetime import timedelta
+
+import pytest
+
+from httpx import AsyncClient
+
+from app.core import security
+from app.core.exceptions import ServiceUnavailableException
+from app.core.security import (
+    MIN_BCRYPT_ROUNDS,
+    PasswordHasher,
+    VerifiedTokenCache,
+    bcrypt_rounds,
+    calibrate_bcrypt_rounds,
+    create_access_token,
+    create_refresh_token,
+    decode_access_token,
+    get_password_hash,
+    verified_token_cache,
+    verify_password,
+)
+
+
+class TestVerifiedTokenCache:
+    """Tests for the verified access-token cache."""
+
+    def test_hit_after_verification(self):
+        """Test a verified token is served from the cache afterwards."""
+        token = create_access_token(uuid.uuid4())
+        hits = verified_token_cache.stats()["hits"]
+
+        first = decode_access_token(token)
+        second = decode_access_token(token)
+        assert first == second
+        assert verified_token_cache.stats()["hits"] == hits + 1
+
+    def test_failures_not_cached(self):
+        """Test invalid tokens and refresh tokens are rejected every time."""
+        refresh = create_refresh_token(uuid.uuid4())
+        size = verified_token_cache.stats()["size"]
+        for token in ("not-a-jwt", refresh, refresh):
+            assert decode_access_token(token) is None
+        assert verified_token_cache.stats()["size"] == size
+
+    def test_expired_entry_dropped(self, monkeypatch):
+        """Test a cached payload is not returned past its exp."""
+        cache = VerifiedTokenCache(max_size=10)
+        cache.put("token", {"sub": "x", "exp": time.time() + 60})
+        assert cache.get("token") is not None
+
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now + 61)
+        assert cache.get("token") is None
+        assert cache.stats()["size"] == 0
+
+    def test_lru_bound(self):
+        """Test the cache evicts the least recently used token."""
+        cache = VerifiedTokenCache(max_size=2)
+        exp = time.time() + 60
+        for token in ("a", "b"):
+            cache.put(token, {"exp": exp})
+        cache.get("a")
+        cache.put("c", {"exp": exp})
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.stats()["size"] == 2
+
+    def test_expired_token_rejected(self):
+        """Test an already expired token is neither accepted nor cached."""
+        token = create_access_token(uuid.uuid4(), expires_delta=timedelta(seconds=-1))
+        assert decode_access_token(token) is None
+        assert verified_token_cache.get(token) is None
+
+
+class TestPasswordHasher:
+    """Tests for bcrypt on the worker pool."""
+
+    async def test_hash_and_verify(self):
+        """Test pool hashes interoperate with the synchronous helpers."""
+        hasher = PasswordHasher("thread", workers=2, max_pending=4, max_queue=8, max_wait=5)
+        try:
+            hashed = await hasher.hash("secret-password")
+            assert verify_password("secret-password", hashed)
+            assert await hasher.verify("secret-password", get_password_hash("secret-password"))
+            assert not await hasher.verify("wrong-password", hashed)
+            assert hasher.stats()["completed"] == 3
+            assert hasher.stats()["pending"] == 0
+        finally:
+            hasher.shutdown()
+
+    async def test_event_loop_stays_responsive(self):
+        """Test the event loop keeps running while passwords are verified."""
+        hasher = PasswordHasher("thread", workers=2, max_pending=4, max_queue=8, max_wait=5)
+        hashed = get_password_hash("secret-password")
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        try:
+            await asyncio.gather(*(hasher.verify("secret-password", hashed) for _ in range(4)))
+        finally:
+            task.cancel()
+            hasher.shutdown()
+        assert ticks > 5
+
+    def test_max_pending_at_least_workers(self):
+        """Test the pending bound never starves the pool."""
+        hasher = PasswordHasher("thread", workers=4, max_pending=1, max_queue=8, max_wait=5)
+        assert hasher.stats()["max_pending"] == 4
+
+
+class TestBcryptCalibration:
+    """Tests for picking the bcrypt cost factor."""
+
+    def test_bcrypt_rounds(self):
+        """Test the cost factor is read from a hash."""
+        assert bcrypt_rounds("$2b$12$" + "a" * 53) == 12
+        assert bcrypt_rounds("$2a$10$" + "a" * 53) == 10
+        assert bcrypt_rounds("not-a-bcrypt-hash") is None
+
+    def test_picks_highest_cost_within_target(self, monkeypatch):
+        """Test calibration picks the most expensive cost under the target."""
+        monkeypatch.setattr(
+            security, "measure_bcrypt_ms", lambda rounds, samples=3: 10.0 * 2 ** (rounds - 10)
+        )
+        assert calibrate_bcrypt_rounds(45) == (12, 40.0)
+        assert calibrate_bcrypt_rounds(80) == (13, 80.0)
+
+    def test_never_below_minimum(self, monkeypatch):
+        """Test slow hardware still gets the minimum cost."""
+        monkeypatch.setattr(security, "measure_bcrypt_ms", lambda rounds, samples=3: 500.0)
+        assert calibrate_bcrypt_rounds(50) == (MIN_BCRYPT_ROUNDS, 500.0)
+
+
+class TestPasswordHashAdmission:
+    """Tests for admission control on the password pool."""
+
+    async def test_waits_for_free_slot(self):
+        """Test a caller queues briefly and is admitted when a slot frees up."""
+        hasher = PasswordHasher("thread", workers=1, max_pending=1, max_queue=1, max_wait=5)
+        try:
+            await asyncio.gather(hasher._run(time.sleep, 0.05), hasher._run(time.sleep, 0))
+            stats = hasher.stats()
+            assert stats["queued"] == 1
+            assert stats["wait_ms_max"] > 0
+            assert stats["rejected_queue_full"] == stats["rejected_timeout"] == 0
+        finally:
+            hasher.shutdown()
+
+    async def test_rejects_when_queue_full(self):
+        """Test callers beyond the queue limit get a 503 without waiting."""
+        hasher = PasswordHasher("thread", workers=1, max_pending=1, max_queue=0, max_wait=5)
+        hashed = get_password_hash("password")
+        busy = asyncio.create_task(hasher._run(time.sleep, 0.2))
+        await asyncio.sleep(0)
+        try:
+            start = time.perf_counter()
+            with pytest.raises(ServiceUnavailableException) as exc_info:
+                await hasher.verify("password", hashed)
+            assert time.perf_counter() - start < 0.1
+            assert exc_info.value.status_code == 503
+            assert int(exc_info.value.headers["Retry-After"]) >= 1
+            assert hasher.stats()["rejected_queue_full"] == 1
+        finally:
+            await busy
+            hasher.shutdown()
+
+    async def test_rejects_after_max_wait(self):
+        """Test a queued caller gives up after the maximum wait."""
+        hasher = PasswordHasher("thread", workers=1, max_pending=1, max_queue=4, max_wait=0.05)
+        busy = asyncio.create_task(hasher._run(time.sleep, 0.3))
+        await asyncio.sleep(0)
+        try:
+            with pytest.raises(ServiceUnavailableException):
+                await hasher._run(time.sleep, 0)
+            stats = hasher.stats()
+            assert stats["rejected_timeout"] == 1
+            assert stats["waiting"] == 0
+        finally:
+            await busy
+            hasher.shutdown()
+
+    async def test_register_returns_503_when_saturated(self, client: AsyncClient, monkeypatch):
+        """Test /auth/register answers 503 with Retry-After instead of queueing."""
+        hasher = PasswordHasher("thread", workers=1, max_pending=1, max_queue=0, max_wait=0)
+        monkeypatch.setattr(security, "password_hasher", hasher)
+        busy = asyncio.create_task(hasher._run(time.sleep, 0.3))
+        await asyncio.sleep(0)
+        try:
+            response = await client.post(
+                "/api/v1/auth/register",
+                json={"email": "burst@example.com", "password": "password123"},
+            )
+            assert response.status_code == 503
+            assert "Retry-After" in response.headers
+        finally:
+            await busy
+            hasher.shutdown()
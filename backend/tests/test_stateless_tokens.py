@@ -0,0 +1,77 @@
+"""Stateless access token tests."""
+
+import pytest_asyncio
+from httpx import AsyncClient
+from jose import jwt
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import User
+from app.services.auth_service import auth_service
+from app.services.token_epoch_service import TokenEpochService, token_epoch_service
+
+
+@pytest_asyncio.fixture
+async def stateless(monkeypatch, db_session: AsyncSession):
+    """Enable stateless access tokens with a loaded epoch map."""
+    monkeypatch.setattr(settings, "STATELESS_ACCESS_TOKENS", True)
+    await token_epoch_service.load(db_session)
+
+
+class TestStatelessAccessTokens:
+    """Tests for claim-based authorization and epoch revocation."""
+
+    async def test_authorizes_from_claims(
+        self, client: AsyncClient, test_user: User, stateless, monkeypatch, login
+    ):
+        """Test a stateless token is authorized without loading the user."""
+        token = await login("test@example.com", "password123")
+        claims = jwt.get_unverified_claims(token)
+        assert claims["is_admin"] is False
+        assert claims["token_epoch"] == 0
+
+        async def no_lookup(*args, **kwargs):
+            raise AssertionError("users table queried")
+
+        monkeypatch.setattr(auth_service, "get_user_by_id", no_lookup)
+        response = await client.get(
+            "/api/v1/demo/items", headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 200
+
+    async def test_deactivation_revokes(
+        self, client: AsyncClient, test_user: User, test_admin: User, stateless, login
+    ):
+        """Test deactivating a user revokes their outstanding tokens."""
+        token = await login("test@example.com", "password123")
+        admin_token = await login("admin@example.com", "adminpass123")
+        headers = {"Authorization": f"Bearer {token}"}
+        assert (await client.get("/api/v1/auth/me", headers=headers)).status_code == 200
+
+        response = await client.patch(
+            f"/api/v1/admin/users/{test_user.id}",
+            json={"is_active": False},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert response.status_code == 200
+
+        response = await client.get("/api/v1/auth/me", headers=headers)
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Token has been revoked"
+
+    async def test_refresh_picks_up_other_workers(
+        self, db_session: AsyncSession, test_user: User
+    ):
+        """Test a bump made elsewhere is seen after the next load."""
+        worker_a, worker_b = TokenEpochService(), TokenEpochService()
+        await worker_b.load(db_session)
+        assert worker_b.is_current(test_user.id, 0)
+
+        assert await worker_a.bump(db_session, test_user.id) == 1
+        assert await worker_a.bump(db_session, test_user.id) == 2
+        await db_session.commit()
+
+        await worker_b.load(db_session)
+        assert not worker_b.is_current(test_user.id, 1)
+        assert worker_b.is_current(test_user.id, 2)
+        assert await worker_b.current(db_session, test_user.id) == 2
@@ -0,0 +1,50 @@
+"""Request timing context tests."""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.timing import (
+    current_timings,
+    end_request_timings,
+    stage,
+    start_request_timings,
+)
+
+
+class TestRequestTimings:
+    """Tests for stage and DB timing attribution."""
+
+    def test_nested_stage_counted_once(self):
+        """Test a stage nested in itself is only timed by the outer block."""
+        timings, token = start_request_timings()
+        try:
+            with stage("auth"):
+                with stage("auth"):
+                    pass
+        finally:
+            end_request_timings(token)
+
+        assert list(timings.stages) == ["auth"]
+        assert current_timings() is None
+
+    def test_stage_outside_request(self):
+        """Test stages are a no-op without a request context."""
+        with stage("auth"):
+            pass
+        assert current_timings() is None
+
+    async def test_db_time_excluded_from_stage(self, db_session: AsyncSession):
+        """Test queries are counted and their time is not attributed to the stage."""
+        timings, token = start_request_timings()
+        try:
+            with stage("auth"):
+                await db_session.execute(text("SELECT 1"))
+            await db_session.execute(text("SELECT 2"))
+        finally:
+            end_request_timings(token)
+
+        assert timings.db_queries == 2
+        assert timings.db_ns > 0
+        breakdown = timings.breakdown()
+        assert set(breakdown) == {"total_ms", "db_ms", "db_queries", "auth_ms", "handler_ms"}
+        assert breakdown["db_ms"] + breakdown["auth_ms"] <= breakdown["total_ms"]